@@ -1,5 +1,7 @@
 import frappe
 from frappe import _
+from frappe.rate_limiter import rate_limit
+from umt.verification import verify, get_rate_limit
 
 @frappe.whitelist()
 def get_member_details(member_id):
@@ -18,3 +20,9 @@ def update_member_status(member_id, status):
     doc = frappe.get_doc("Member", member_id)
     doc.status = status
     doc.save()
+
+@frappe.whitelist(allow_guest=True, methods=["GET"])
+@rate_limit(limit=get_rate_limit, seconds=60)
+def verify_card(token):
+    """Verify a scanned membership card token; returns only validity, status and expiry"""
+    return verify(token)
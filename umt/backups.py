@@ -0,0 +1,249 @@
+import frappe
+from frappe import _
+from frappe.utils import cint, flt, now_datetime
+from frappe.utils.backups import backup
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import gzip
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+from umt.doctype.backup_file.backup_file import get_backup_dir, register_backup
+
+# One backup per site at a time. The lock expires with the job timeout, and is
+# taken over earlier when the RQ job holding it is no longer queued or running
+# (failed, timed out or lost with its worker).
+BACKUP_LOCK_KEY = "umt_backup_lock"
+BACKUP_JOB_KEY = "umt_backup_rq_job"
+BACKUP_STATUS_KEY = "umt_backup_status"
+BACKUP_TIMEOUT = 6 * 3600
+
+PROGRESS_EVENT = "umt_backup_progress"
+
+# Parallel mode: the dump is cut into blocks compressed as independent gzip
+# members, which concatenate into a regular .sql.gz file
+BLOCK_SIZE = 8 * 1024 * 1024
+COMPRESS_LEVEL = 6
+
+def start_backup(compression_mode="Standard", with_files=False):
+    """Queue a backup job unless one is already running for this site"""
+    if compression_mode not in ("Standard", "Parallel"):
+        frappe.throw(_("نمط الضغط غير صالح"))
+
+    cache = frappe.cache()
+    job_id = frappe.generate_hash(length=10)
+
+    if not acquire_lock(job_id):
+        frappe.throw(_("توجد نسخة احتياطية قيد الإنشاء، يرجى الانتظار حتى تكتمل"))
+
+    set_status(job_id, "Queued", 0, _("النسخة الاحتياطية في قائمة الانتظار"))
+    try:
+        job = frappe.enqueue(
+            "umt.backups.run_backup",
+            queue="long",
+            timeout=BACKUP_TIMEOUT,
+            backup_id=job_id,
+            compression_mode=compression_mode,
+            with_files=cint(with_files),
+            user=frappe.session.user
+        )
+    except Exception:
+        release_lock(job_id)
+        set_status(job_id, "Failed", 0, _("فشل إنشاء النسخة الاحتياطية"))
+        raise
+
+    cache.set(cache.make_key(BACKUP_JOB_KEY), job.id, ex=BACKUP_TIMEOUT)
+    return job_id
+
+def run_backup(backup_id, compression_mode="Standard", with_files=False, user=None):
+    """Background job: take a backup, catalog it with its throughput metrics.
+
+    `backup_id` is the id returned by start_backup; `job_id` is reserved by
+    frappe.enqueue for the RQ job itself.
+    """
+    start = time.monotonic()
+
+    try:
+        set_status(backup_id, "Running", 0, _("جاري تفريغ قاعدة البيانات"), user)
+
+        if compression_mode == "Parallel":
+            workers = get_workers()
+            path, uncompressed_size = dump_database(
+                workers,
+                lambda progress: set_status(backup_id, "Running", progress, _("جاري ضغط قاعدة البيانات"), user)
+            )
+            other_paths = []
+        else:
+            workers, uncompressed_size = 1, None
+            backup_manager = backup(ignore_files=not cint(with_files), force=True)
+            path = backup_manager.backup_path_db
+            other_paths = [
+                backup_manager.backup_path_files,
+                backup_manager.backup_path_private_files,
+                backup_manager.backup_path_conf
+            ]
+
+        duration = time.monotonic() - start
+        file_size = os.path.getsize(path)
+        register_backup(path, {
+            "compression_mode": compression_mode,
+            "workers": workers,
+            "duration": flt(duration, 2),
+            "uncompressed_size": uncompressed_size,
+            "throughput": flt((uncompressed_size or file_size) / 1024 / 1024 / duration, 2) if duration else 0
+        })
+
+        for other_path in other_paths:
+            register_backup(other_path)
+
+        frappe.db.commit()
+        set_status(backup_id, "Completed", 100, _("تم إنشاء النسخة الاحتياطية بنجاح"), user)
+    except Exception:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), _("خطأ في إنشاء النسخة الاحتياطية"))
+        set_status(backup_id, "Failed", 0, _("فشل إنشاء النسخة الاحتياطية"), user)
+    finally:
+        release_lock(backup_id)
+
+def get_workers():
+    return cint(frappe.conf.get("umt_backup_workers")) or os.cpu_count() or 1
+
+def dump_database(workers, on_progress=None):
+    """Dump the site database into a gzip file compressed on `workers` threads.
+
+    mysqldump output is read in BLOCK_SIZE blocks, each block is compressed as
+    a separate gzip member on the thread pool (zlib releases the GIL), and the
+    members are written back in order. At most two blocks per worker are held
+    in memory. Returns the backup path and the uncompressed dump size.
+    """
+    conf = frappe.conf
+    dump_exc = shutil.which("mariadb-dump") or shutil.which("mysqldump")
+    if not dump_exc:
+        frappe.throw(_("أداة mysqldump غير متوفرة على الخادم"))
+
+    command = [
+        dump_exc, "--single-transaction", "--quick", "--lock-tables=false",
+        "-u", conf.db_user or conf.db_name, "-h", conf.db_host or "localhost", conf.db_name
+    ]
+    if conf.db_port:
+        command[-1:-1] = ["-P", str(conf.db_port)]
+
+    site = frappe.local.site.replace(".", "_")
+    path = os.path.join(get_backup_dir(), f"{now_datetime():%Y%m%d_%H%M%S}-{site}-database.sql.gz")
+    temp_path = path + ".part"
+
+    estimated_size = get_database_size()
+    uncompressed_size = 0
+    reported_progress = -1
+    pending = deque()
+
+    try:
+        with tempfile.TemporaryFile() as stderr, open(temp_path, "wb") as output:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr,
+                env=dict(os.environ, MYSQL_PWD=conf.db_password or ""))
+
+            try:
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    while True:
+                        block = process.stdout.read(BLOCK_SIZE)
+                        if not block:
+                            break
+
+                        uncompressed_size += len(block)
+                        pending.append(pool.submit(gzip.compress, block, COMPRESS_LEVEL))
+
+                        while len(pending) >= workers * 2:
+                            output.write(pending.popleft().result())
+
+                        progress = min(95, cint(uncompressed_size * 100 / estimated_size)) if estimated_size else 0
+                        if on_progress and progress != reported_progress:
+                            on_progress(progress)
+                            reported_progress = progress
+
+                    while pending:
+                        output.write(pending.popleft().result())
+            finally:
+                process.stdout.close()
+                returncode = process.wait()
+
+            if returncode:
+                stderr.seek(0)
+                frappe.throw(_("فشل تفريغ قاعدة البيانات: {0}").format(stderr.read().decode(errors="replace")))
+
+        os.rename(temp_path, path)
+    finally:
+        # Failed dumps, raised errors included, leave no partial file behind
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    return path, uncompressed_size
+
+def get_database_size():
+    """Approximate dump size from the table statistics, used for progress only"""
+    return cint(frappe.db.sql("""
+        SELECT SUM(data_length) FROM information_schema.tables
+        WHERE table_schema = %s
+    """, (frappe.conf.db_name,))[0][0])
+
+def set_status(job_id, status, progress, message=None, user=None):
+    """Store the job status for polling and push it to the user's browser"""
+    data = {"job_id": job_id, "status": status, "progress": progress, "message": message}
+    cache = frappe.cache()
+    cache.set(cache.make_key(BACKUP_STATUS_KEY), frappe.as_json(data), ex=BACKUP_TIMEOUT)
+
+    if user:
+        frappe.publish_realtime(PROGRESS_EVENT, data, user=user)
+
+def get_status():
+    """Get the status of the running or last backup job"""
+    cache = frappe.cache()
+    status = cache.get(cache.make_key(BACKUP_STATUS_KEY))
+    status = frappe.parse_json(status) if status else None
+
+    # A job that died without reaching its `finally` leaves "Queued" or "Running" behind
+    if status and status.get("status") in ("Queued", "Running") and not is_job_alive():
+        status.update(status="Failed", message=_("فشل إنشاء النسخة الاحتياطية"))
+    return status
+
+def acquire_lock(job_id):
+    """Take the backup lock, replacing a lock left behind by a dead job"""
+    cache = frappe.cache()
+    key = cache.make_key(BACKUP_LOCK_KEY)
+    if cache.set(key, job_id, nx=True, ex=BACKUP_TIMEOUT):
+        return True
+
+    if is_job_alive():
+        return False
+
+    holder = frappe.safe_decode(cache.get(key) or b"")
+    set_status(holder, "Failed", 0, _("فشل إنشاء النسخة الاحتياطية"))
+    release_lock(holder)
+    return bool(cache.set(key, job_id, nx=True, ex=BACKUP_TIMEOUT))
+
+def is_job_alive():
+    """Check whether the RQ job of the last queued backup is still queued or running"""
+    from rq.exceptions import NoSuchJobError
+    from rq.job import Job
+    from frappe.utils.background_jobs import get_redis_conn
+
+    cache = frappe.cache()
+    rq_job_id = frappe.safe_decode(cache.get(cache.make_key(BACKUP_JOB_KEY)) or b"")
+    if not rq_job_id:
+        # Lock taken, job not enqueued yet
+        return bool(cache.get(cache.make_key(BACKUP_LOCK_KEY)))
+
+    try:
+        job = Job.fetch(rq_job_id, connection=get_redis_conn())
+    except NoSuchJobError:
+        return False
+
+    return job.get_status() in ("queued", "started", "deferred", "scheduled")
+
+def release_lock(job_id):
+    cache = frappe.cache()
+    key = cache.make_key(BACKUP_LOCK_KEY)
+    if frappe.safe_decode(cache.get(key) or b"") == job_id:
+        cache.delete(key, cache.make_key(BACKUP_JOB_KEY))
@@ -0,0 +1,16 @@
+"""
+Benchmarks for UMT workloads.
+
+Each module exposes a `run` function meant to be executed against a bench test site:
+
+    bench --site test.local execute umt.benchmarks.bulk_income.run --kwargs "{'rows': 10000}"
+
+`datagen` builds synthetic datasets at a given scale and `runner` times the
+app's entry points against them, writing JSON results for comparing runs:
+
+    bench --site test.local execute umt.benchmarks.datagen.generate --kwargs "{'scale': '100k'}"
+    bench --site test.local execute umt.benchmarks.runner.run --kwargs "{'repeat': 10}"
+
+`loadtest` drives the pages and whitelisted methods over HTTP with concurrent
+virtual users following a ramp profile.
+"""
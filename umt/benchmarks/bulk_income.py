@@ -0,0 +1,87 @@
+import json
+import time
+
+import frappe
+from frappe.utils import today, flt
+
+from umt.bulk_income import post_income_entries, CARD_ENTRY_TYPE
+
+OTHER_INCOME_TYPE = "مداخيل أخرى"
+
+def run(rows=10000, chunk_size=500, baseline_rows=200, with_members=False):
+    """Compare bulk posting throughput with the one-by-one save and submit path.
+
+    Entries created by the benchmark are deleted afterwards. With `with_members`,
+    rows are spread over existing members as card fees, which also exercises the
+    bulk card update (card payment statuses are left updated).
+    """
+    rows, baseline_rows = int(rows), int(baseline_rows)
+    batch = make_rows(rows, with_members)
+    entry_type = CARD_ENTRY_TYPE if with_members else OTHER_INCOME_TYPE
+
+    start = time.perf_counter()
+    results = post_income_entries(batch, entry_type=entry_type, chunk_size=chunk_size)
+    bulk_seconds = time.perf_counter() - start
+    created = [r["name"] for r in results if r["success"]]
+
+    start = time.perf_counter()
+    created += post_one_by_one(batch[:baseline_rows], entry_type)
+    baseline_seconds = time.perf_counter() - start
+
+    cleanup(created)
+
+    report = {
+        "rows": rows,
+        "chunk_size": chunk_size,
+        "posted": sum(1 for r in results if r["success"]),
+        "bulk_seconds": round(bulk_seconds, 3),
+        "bulk_rows_per_second": round(rows / bulk_seconds, 1) if bulk_seconds else None,
+        "baseline_rows": baseline_rows,
+        "baseline_seconds": round(baseline_seconds, 3),
+        "baseline_rows_per_second": round(baseline_rows / baseline_seconds, 1) if baseline_seconds else None
+    }
+    print(json.dumps(report, indent=2))
+    return report
+
+def make_rows(count, with_members=False):
+    """Build synthetic posting rows"""
+    members = frappe.get_all("Member", pluck="name", limit=count) if with_members else []
+    if with_members and not members:
+        frappe.throw("No members found to post card fees against")
+
+    return [
+        {
+            "member": members[idx % len(members)] if members else None,
+            "amount": flt(100 + idx % 50),
+            "payment_method": "نقدا",
+            "reference_number": f"BENCH-{idx:06d}"
+        }
+        for idx in range(count)
+    ]
+
+def post_one_by_one(rows, entry_type):
+    """Post rows through the regular document path, as finance.save_transaction does"""
+    names = []
+    for row in rows:
+        doc = frappe.get_doc({
+            "doctype": "Income_Entry",
+            "posting_date": today(),
+            "payment_date": today(),
+            "academic_year": frappe.db.get_default("current_academic_year"),
+            "entry_type": entry_type,
+            "status": "Submitted",
+            "currency": "MAD",
+            "collected_by": frappe.session.user,
+            **row
+        })
+        doc.insert()
+        doc.submit()
+        names.append(doc.name)
+    frappe.db.commit()
+    return names
+
+def cleanup(names):
+    """Remove entries created by the benchmark"""
+    for start in range(0, len(names), 1000):
+        frappe.db.delete("Income_Entry", {"name": ["in", names[start:start + 1000]]})
+    frappe.db.commit()
@@ -0,0 +1,36 @@
+import json
+import os
+import shutil
+
+import frappe
+
+from umt.cards import get_cards, render_cards
+
+# Card printing throughput by process pool size, on the site's cards
+# (e.g. the datagen dataset):
+#
+#   bench --site test.local execute umt.benchmarks.card_export.run --kwargs "{'workers': '1,2,4,8', 'limit': 2000}"
+
+def run(workers=None, limit=2000, chunk_size=None, output_format="pdf", filters=None):
+    """Render the same cards with each pool size and print cards per second"""
+    filters = json.loads(filters) if isinstance(filters, str) else (filters or {})
+    if workers is None:
+        workers = sorted({1, 2, 4, os.cpu_count() or 1})
+    elif isinstance(workers, str):
+        workers = [int(w) for w in workers.split(",") if w.strip()]
+    elif isinstance(workers, int):
+        workers = [workers]
+
+    cards = get_cards(filters)[:int(limit)]
+    if not cards:
+        frappe.throw("No cards to render, run umt.benchmarks.datagen.generate first")
+
+    report = {"cards": len(cards), "output_format": output_format, "cpu_count": os.cpu_count(), "runs": []}
+    for count in workers:
+        result = render_cards(cards, output_format, count, chunk_size)
+        result["size"] = os.path.getsize(result["path"])
+        shutil.rmtree(os.path.dirname(result.pop("path")), ignore_errors=True)
+        report["runs"].append(result)
+
+    print(json.dumps(report, indent=2))
+    return report
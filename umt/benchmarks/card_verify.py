@@ -0,0 +1,89 @@
+import json
+import random
+import time
+
+import frappe
+
+from umt.benchmarks.member_search import percentile
+from umt.verification import verify, get_card_token, rebuild_card_cache, VERIFY_CACHE_KEY
+
+# Card verifications per second from a single process, on the site's cards
+# (e.g. the datagen dataset):
+#
+#   bench --site test.local execute umt.benchmarks.card_verify.run --kwargs "{'lookups': 50000}"
+#
+# "cold" reads every card through the card_number index, "hot" from the redis
+# cache, and "endpoint" goes through the whitelisted method and its per-IP
+# rate limiter with lookups spread over `ips` client addresses.
+
+def run(lookups=20000, cards=10000, ips=1000, seed=42):
+    lookups, ips = int(lookups), int(ips)
+    rng = random.Random(seed)
+
+    card_numbers = frappe.db.sql("""
+        SELECT DISTINCT card_number FROM `tabMembership_Card`
+        WHERE card_number IS NOT NULL LIMIT %s
+    """, (int(cards),), pluck=True)
+    if not card_numbers:
+        frappe.throw("No cards to verify, run umt.benchmarks.datagen.generate first")
+
+    tokens = [get_card_token(rng.choice(card_numbers)) for _idx in range(lookups)]
+    report = {"lookups": lookups, "cards": len(card_numbers)}
+
+    frappe.cache().delete_key(VERIFY_CACHE_KEY)
+    report["cold"] = time_lookups(tokens[:len(card_numbers)], lambda token: verify(token))
+
+    start = time.perf_counter()
+    rebuild_card_cache()
+    report["rebuild_seconds"] = round(time.perf_counter() - start, 2)
+    report["hot"] = time_lookups(tokens, lambda token: verify(token))
+
+    from umt.api import verify_card
+    limit = frappe.conf.get("umt_verify_rate_limit")
+    request = getattr(frappe.local, "request", None)
+    frappe.local.conf.umt_verify_rate_limit = lookups
+    try:
+        def call(token):
+            ip = rng.randrange(ips)
+            frappe.local.request_ip = f"10.{ip >> 16 & 255}.{ip >> 8 & 255}.{ip & 255}"
+            # rate_limit only checks requests, bench execute has none
+            frappe.local.request = get_request(token, frappe.local.request_ip)
+            frappe.local.form_dict = frappe._dict(cmd="umt.api.verify_card", token=token)
+            return verify_card(token=token)
+        report["endpoint"] = time_lookups(tokens, call)
+    finally:
+        frappe.local.conf.umt_verify_rate_limit = limit
+        frappe.local.request = request
+
+    print(json.dumps(report, indent=2))
+    return report
+
+def get_request(token, ip):
+    """A GET request to the verification endpoint from `ip`"""
+    from werkzeug.test import EnvironBuilder
+    from werkzeug.wrappers import Request
+
+    return Request(EnvironBuilder(
+        path="/api/method/umt.api.verify_card",
+        method="GET",
+        query_string={"token": token},
+        environ_base={"REMOTE_ADDR": ip}
+    ).get_environ())
+
+def time_lookups(tokens, call):
+    samples = []
+    start = time.perf_counter()
+    for token in tokens:
+        # a fresh request-local cache each time, as in separate requests
+        frappe.local.cache = {}
+        lookup_start = time.perf_counter()
+        call(token)
+        samples.append((time.perf_counter() - lookup_start) * 1000)
+    elapsed = time.perf_counter() - start
+
+    samples.sort()
+    return {
+        "per_second": round(len(tokens) / elapsed, 1),
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p99_ms": round(percentile(samples, 99), 3)
+    }
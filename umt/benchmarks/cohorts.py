@@ -0,0 +1,62 @@
+import json
+import time
+
+import frappe
+
+from umt import cohorts
+from umt.report.renewal_cohort_report.renewal_cohort_report import execute
+
+# Renewal cohort build times on the site's cards (e.g. the datagen dataset):
+#
+#   bench --site test.local execute umt.benchmarks.cohorts.run
+#
+# For each academic year, "cold" loads the cards and builds the matrices,
+# "cached" reads them back from redis and "report" runs the whole report on
+# the cached matrices. A card saved in the last year is then simulated to show
+# that the earlier years stay cached.
+
+def run(chunk_size=cohorts.CHUNK_SIZE):
+    years = frappe.get_all("Academic Year", fields=["name"], order_by="start_date", pluck="name")
+    if not years:
+        frappe.throw("No academic years, run umt.benchmarks.datagen.generate first")
+
+    cards = frappe.db.count("Membership_Card", {"payment_status": cohorts.PAID_STATUS})
+    report = {"paid_cards": cards, "chunk_size": int(chunk_size), "runs": []}
+
+    for year in years:
+        academic_years = cohorts.get_academic_years(year)
+
+        start = time.perf_counter()
+        result = cohorts.build_cohorts(academic_years, int(chunk_size))
+        cold_ms = (time.perf_counter() - start) * 1000
+
+        cohorts.bump_cohort_versions()
+        cohorts.get_cohorts(year)
+        start = time.perf_counter()
+        cohorts.get_cohorts(year)
+        cached_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        execute({"academic_year": year})
+        report_ms = (time.perf_counter() - start) * 1000
+
+        report["runs"].append({
+            "academic_year": year,
+            "years": len(academic_years),
+            "members": int(result["matrices"][cohorts.ALL_PROVINCES]["cohorts"].trace()) if result["matrices"] else 0,
+            "cold_ms": round(cold_ms, 2),
+            "cached_ms": round(cached_ms, 2),
+            "report_ms": round(report_ms, 2)
+        })
+
+    # A card change in the last year only invalidates that year's cohorts
+    cache = frappe.cache()
+    cache.incr(cache.make_key(cohorts.COHORT_VERSION_KEY.format(years[-1])))
+    report["still_cached"] = [
+        year for year in years
+        if (cohorts.load_entry(cache.make_key(cohorts.COHORT_KEY.format(year))) or {}).get("versions")
+            == cohorts.get_cohort_versions([y.name for y in cohorts.get_academic_years(year)])
+    ]
+
+    print(json.dumps(report, indent=2))
+    return report
@@ -0,0 +1,318 @@
+import json
+import random
+import time
+from datetime import date, timedelta
+
+import frappe
+from frappe.utils import now
+
+from umt.benchmarks.member_search import FIRST_NAMES, LAST_NAMES, INSTITUTIONS
+from umt.bulk_income import CARD_ENTRY_TYPE, PAID_STATUS
+from umt.cache import bump_doctype_version
+from umt.cohorts import bump_cohort_versions
+from umt.doctype.gl_entry.gl_entry import get_income_gl_map, get_expense_gl_map, make_gl_entries, update_account_balances
+from umt.report.member_status_report.member_status_report import UNPAID
+
+# Synthetic datasets for the benchmark runner. Every generated row is named
+# with the `BENCH-` prefix (academic years included), so a dataset can live
+# next to real data and be removed with cleanup().
+
+BENCH_PREFIX = "BENCH-"
+
+SCALES = {"1k": 1000, "10k": 10000, "100k": 100000, "1m": 1000000}
+
+PROVINCES = ["عمالة طنجة", "عمالة تطوان", "إقليم الفحص أنجرة"]
+GENDERS = ["ذكر", "أنثى"]
+MEMBER_STATUSES = [("Active", 0.7), ("Inactive", 0.2), ("Expired", 0.1)]
+PAYMENT_METHODS = ["نقدا", "شيك", "تحويل بنكي"]
+OTHER_INCOME_TYPE = "مداخيل أخرى"
+EXPENSE_TYPES = ["مصاريف إدارية", "مصاريف الأنشطة", "مصاريف التجهيزات", "مصاريف الصيانة", "مصاريف أخرى"]
+UNEM_POSITIONS = ["المكتب التنفيذي", "المكاتب الجهوية", "المكاتب الإقليمية", "المكاتب المحلية"]
+UNEM_ROLES = ["الكاتب الوطني", "نائب الكاتب الوطني", "الكاتب العام", "أمين المال", "مستشار"]
+MUTUAL_POSITIONS = ["المكتب التنفيذي", "المجلس الإداري", "لجنة المراقبة"]
+MUTUAL_ROLES = ["الرئيس", "نائب الرئيس", "الكاتب العام", "أمين المال", "مستشار"]
+
+CARD_FEE = 100
+BATCH_SIZE = 10000
+
+# Tables cleared by cleanup(), children before the rows they link to
+BENCH_DOCTYPES = [
+    "Income_Entry", "Expense_Entry", "Membership_Card",
+    "UNEM_Structure", "Mutual_Structure", "Member", "Academic Year"
+]
+
+def generate(scale="10k", years=3, seed=42, expenses_per_year=None, batch_size=BATCH_SIZE):
+    """Insert a synthetic dataset and return its row counts.
+
+    `scale` is a member count or one of the SCALES labels. Each member gets one
+    card per academic year since joining and an income entry per paid card;
+    expenses are spread over the years and structures over the provinces. GL
+    entries and budget counters are posted for the generated vouchers so the
+    ledger stays balanced.
+    """
+    members = SCALES.get(str(scale).lower()) or int(scale)
+    years, batch_size = int(years), int(batch_size)
+    expenses_per_year = int(expenses_per_year or max(50, members // 100))
+    rng = random.Random(int(seed))
+    start = time.perf_counter()
+
+    academic_years = insert_academic_years(years)
+    counts = {"Academic Year": len(academic_years)}
+
+    for doctype, count in insert_members(members, academic_years, rng, batch_size).items():
+        counts[doctype] = counts.get(doctype, 0) + count
+
+    counts["Expense_Entry"] = insert_expenses(expenses_per_year, academic_years, rng, batch_size)
+    counts["UNEM_Structure"], counts["Mutual_Structure"] = insert_structures(members, rng)
+
+    from umt.doctype.budget_line.budget_line import reconcile_budgets
+    from umt.doctype.membership_card.membership_card import backfill_current_cards
+    reconcile_budgets()
+    backfill_current_cards()
+
+    frappe.db.commit()
+    bump_doctype_version(*BENCH_DOCTYPES)
+    bump_cohort_versions()
+
+    report = {
+        "members": members,
+        "academic_years": [year["name"] for year in academic_years],
+        "rows": counts,
+        "seconds": round(time.perf_counter() - start, 2)
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return report
+
+def get_dataset():
+    """Row counts and academic years of the synthetic dataset currently on the site"""
+    like = BENCH_PREFIX + "%"
+    return {
+        "academic_years": frappe.get_all("Academic Year", filters={"name": ["like", like]},
+            order_by="start_date", pluck="name"),
+        "rows": {
+            doctype: frappe.db.sql(f"SELECT COUNT(*) FROM `tab{doctype}` WHERE name LIKE %s", (like,))[0][0]
+            for doctype in BENCH_DOCTYPES
+        }
+    }
+
+def cleanup(batch_size=BATCH_SIZE):
+    """Remove the synthetic dataset, its GL entries and its budget lines"""
+    like = BENCH_PREFIX + "%"
+    batch_size = int(batch_size)
+
+    # take the generated postings back out of the running balances first
+    deltas = {
+        row.account: [-row.amount, -row.entry_count]
+        for row in frappe.db.sql("""
+            SELECT account, SUM(debit - credit) as amount, COUNT(*) as entry_count
+            FROM `tabGL_Entry`
+            WHERE voucher_no LIKE %s
+            GROUP BY account
+        """, (like,), as_dict=1)
+    }
+    if deltas:
+        update_account_balances(deltas)
+    delete_in_batches("GL_Entry", "voucher_no", like, batch_size)
+    delete_in_batches("Budget_Line", "academic_year", like, batch_size)
+
+    for doctype in BENCH_DOCTYPES:
+        delete_in_batches(doctype, "name", like, batch_size)
+
+    frappe.db.commit()
+    bump_doctype_version(*BENCH_DOCTYPES)
+    bump_cohort_versions()
+
+def delete_in_batches(doctype, column, like, batch_size):
+    while True:
+        names = frappe.db.sql(f"SELECT name FROM `tab{doctype}` WHERE `{column}` LIKE %s LIMIT %s",
+            (like, batch_size), pluck=True)
+        if not names:
+            break
+        frappe.db.sql(f"DELETE FROM `tab{doctype}` WHERE name IN %s", (tuple(names),))
+        frappe.db.commit()
+
+def insert_academic_years(years):
+    """The last `years` academic years, the current one last and active"""
+    today = date.today()
+    current = today.year if today.month >= 9 else today.year - 1
+    academic_years = []
+
+    for year in range(current - years + 1, current + 1):
+        name = f"{BENCH_PREFIX}{year}-{year + 1}"
+        academic_years.append({
+            "name": name,
+            "year_name": name,
+            "start_date": date(year, 9, 1),
+            "end_date": date(year + 1, 8, 31),
+            "is_active": int(year == current),
+            "description": None
+        })
+
+    bulk_insert("Academic Year", academic_years, ignore_duplicates=True)
+    return academic_years
+
+def insert_members(count, academic_years, rng, batch_size):
+    """Members with their cards and card fee income entries, `batch_size` members at a time"""
+    counts = {"Member": 0, "Membership_Card": 0, "Income_Entry": 0}
+    income_seq = 0
+
+    for batch_start in range(0, count, batch_size):
+        members, cards, incomes = [], [], []
+
+        for idx in range(batch_start, min(batch_start + batch_size, count)):
+            joined = rng.randrange(len(academic_years))
+            member = make_member(idx, academic_years[joined], rng)
+            members.append(member)
+
+            for year_idx in range(joined, len(academic_years)):
+                year = academic_years[year_idx]
+                is_current = year_idx == len(academic_years) - 1
+                paid = not is_current or rng.random() < 0.6
+                cards.append(make_card(member, year, len(cards) + counts["Membership_Card"], is_current, paid))
+
+                if paid:
+                    income_seq += 1
+                    incomes.append(make_income(income_seq, member, year, CARD_ENTRY_TYPE, CARD_FEE, rng))
+
+            if rng.random() < 0.05:
+                income_seq += 1
+                incomes.append(make_income(income_seq, member, rng.choice(academic_years),
+                    OTHER_INCOME_TYPE, rng.choice([50, 200, 500]), rng))
+
+        bulk_insert("Member", members)
+        bulk_insert("Membership_Card", cards)
+        bulk_insert("Income_Entry", incomes)
+        make_gl_entries([row for entry in incomes for row in get_income_gl_map(entry)])
+        frappe.db.commit()
+
+        counts["Member"] += len(members)
+        counts["Membership_Card"] += len(cards)
+        counts["Income_Entry"] += len(incomes)
+
+    return counts
+
+def insert_expenses(per_year, academic_years, rng, batch_size):
+    seq = 0
+    for year in academic_years:
+        for batch_start in range(0, per_year, batch_size):
+            expenses = []
+            for _idx in range(batch_start, min(batch_start + batch_size, per_year)):
+                seq += 1
+                posting_date = random_date(year["start_date"], year["end_date"], rng)
+                expenses.append(base_row(f"{BENCH_PREFIX}EXP-{seq:08d}", docstatus=1,
+                    posting_date=posting_date,
+                    academic_year=year["name"],
+                    expense_type=rng.choice(EXPENSE_TYPES),
+                    status="Submitted",
+                    description=f"مصروف تجريبي {seq}",
+                    amount=rng.choice([150, 300, 750, 1200, 2500, 5000]),
+                    currency="MAD",
+                    payment_method=rng.choice(PAYMENT_METHODS),
+                    payment_date=posting_date,
+                    paid_by=frappe.session.user))
+
+            bulk_insert("Expense_Entry", expenses)
+            make_gl_entries([row for entry in expenses for row in get_expense_gl_map(entry)])
+            frappe.db.commit()
+    return seq
+
+def insert_structures(members, rng):
+    """Offices per province, held by randomly picked synthetic members"""
+    member_count = max(members, 1)
+    unem, mutual = [], []
+
+    for province in PROVINCES:
+        for position in UNEM_POSITIONS:
+            for role in UNEM_ROLES:
+                member = f"{BENCH_PREFIX}MEM-{rng.randrange(member_count):07d}"
+                unem.append(base_row(f"{BENCH_PREFIX}UNEM-{len(unem) + 1:05d}",
+                    member=member, member_name=None,
+                    position_type=position, role=role,
+                    region="جهة طنجة تطوان الحسيمة", province=province,
+                    start_date=date.today() - timedelta(days=rng.randrange(1500)),
+                    end_date=None, is_active=1, notes=None))
+
+        for position in MUTUAL_POSITIONS:
+            for role in MUTUAL_ROLES:
+                member = f"{BENCH_PREFIX}MEM-{rng.randrange(member_count):07d}"
+                start = date.today() - timedelta(days=rng.randrange(1500))
+                mutual.append(base_row(f"{BENCH_PREFIX}MUT-{len(mutual) + 1:05d}",
+                    member=member, member_name=None,
+                    position_type=position, role=role,
+                    mandate_number=f"{len(mutual) + 1}/{start.year}",
+                    mandate_start_date=start, mandate_end_date=start + timedelta(days=4 * 365),
+                    is_active=1, notes=None))
+
+    bulk_insert("UNEM_Structure", unem)
+    bulk_insert("Mutual_Structure", mutual)
+    frappe.db.commit()
+    return len(unem), len(mutual)
+
+def make_member(idx, academic_year, rng):
+    status = rng.choices([s for s, _w in MEMBER_STATUSES], [w for _s, w in MEMBER_STATUSES])[0]
+    return base_row(f"{BENCH_PREFIX}MEM-{idx:07d}",
+        full_name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        institution=rng.choice(INSTITUTIONS),
+        birth_date=date(rng.randrange(1960, 2000), rng.randrange(1, 13), rng.randrange(1, 29)),
+        gender=rng.choice(GENDERS),
+        phone=f"06{rng.randrange(10 ** 8):08d}",
+        email=f"bench{idx}@example.com",
+        province=rng.choice(PROVINCES),
+        academic_year=academic_year["name"],
+        membership_status=status,
+        membership_date=random_date(academic_year["start_date"], academic_year["end_date"], rng),
+        card_number=f"B{idx:09d}",
+        is_active=int(status == "Active"))
+
+def make_card(member, academic_year, seq, is_current, paid):
+    return base_row(f"{BENCH_PREFIX}CARD-{seq:08d}",
+        member=member["name"],
+        member_name=member["full_name"],
+        card_number=f"{member['card_number']}-{academic_year['start_date'].year}",
+        issue_date=academic_year["start_date"],
+        expiry_date=academic_year["end_date"],
+        status="Active" if is_current else "Expired",
+        payment_status=PAID_STATUS if paid else UNPAID)
+
+def make_income(seq, member, academic_year, entry_type, amount, rng):
+    posting_date = random_date(academic_year["start_date"], academic_year["end_date"], rng)
+    return base_row(f"{BENCH_PREFIX}INC-{seq:08d}", docstatus=1,
+        posting_date=posting_date,
+        academic_year=academic_year["name"],
+        entry_type=entry_type,
+        status="Submitted",
+        member=member["name"],
+        member_name=member["full_name"],
+        amount=amount,
+        currency="MAD",
+        payment_method=rng.choice(PAYMENT_METHODS),
+        reference_number=None,
+        payment_date=posting_date,
+        collected_by=frappe.session.user,
+        notes=None)
+
+def random_date(start, end, rng):
+    return start + timedelta(days=rng.randrange((end - start).days + 1))
+
+def base_row(name, docstatus=0, **fields):
+    timestamp = now()
+    return {
+        "name": name,
+        "creation": timestamp,
+        "modified": timestamp,
+        "owner": frappe.session.user,
+        "modified_by": frappe.session.user,
+        "docstatus": docstatus,
+        **fields
+    }
+
+def bulk_insert(doctype, rows, ignore_duplicates=False):
+    """Insert rows, keeping only the keys that are columns of the doctype's table"""
+    if not rows:
+        return
+
+    columns = set(frappe.db.get_table_columns(doctype))
+    fields = [field for field in rows[0] if field in columns]
+    frappe.db.bulk_insert(doctype, fields=fields,
+        values=[tuple(row.get(field) for field in fields) for row in rows],
+        ignore_duplicates=ignore_duplicates)
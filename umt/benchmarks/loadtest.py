@@ -0,0 +1,372 @@
+import asyncio
+import json
+import random
+import re
+import ssl
+import time
+from urllib.parse import urlencode, urlsplit
+
+import frappe
+from frappe.utils import get_url
+
+from umt.benchmarks.member_search import percentile
+from umt.benchmarks.runner import write_results
+
+# HTTP load test for the UMT pages and whitelisted methods. Virtual users are
+# asyncio tasks, each with its own keep-alive connection and session, picking
+# requests from a weighted session mix with think time in between. The number
+# of users follows a ramp profile of stages; every stage is reported on its own
+# so the stage where an endpoint saturates stands out.
+#
+# Write endpoints create real documents: run it against a test site only.
+#
+#   bench --site test.local execute umt.benchmarks.loadtest.run \
+#       --kwargs "{'pwd': 'admin', 'profile': '10:30,50:60,100:60', 'mix': 'campaign'}"
+
+METHOD_PATH = "/api/method/"
+
+ENDPOINTS = {
+    "admin_dashboard": ("GET", "/admin/dashboard", None),
+    "admin_members": ("GET", "/admin/members", None),
+    "admin_finance": ("GET", "/admin/finance", None),
+    "member_portal": ("GET", "/member_portal", None),
+    "renew_membership": ("GET", "/renew_membership", None),
+    "save_member": ("POST", METHOD_PATH + "umt.www.admin.members.save_member",
+        lambda rng: {"data": json.dumps({
+            "full_name": f"BENCH زائر {rng.randrange(10 ** 6)}",
+            "province": "عمالة طنجة",
+            "membership_status": "Active",
+            "phone": f"07{rng.randrange(10 ** 8):08d}"
+        })}),
+    "save_transaction": ("POST", METHOD_PATH + "umt.www.admin.finance.save_transaction",
+        lambda rng: {"data": json.dumps({
+            "transaction_type": "expense",
+            "expense_type": "مصاريف أخرى",
+            "description": "BENCH load test",
+            "amount": rng.choice([100, 250, 500]),
+            "payment_method": "نقدا"
+        })}),
+    "submit_renewal": ("POST", METHOD_PATH + "umt.www.renew_membership.submit_renewal",
+        lambda rng: {"payment_method": "نقدا", "transaction_ref": f"BENCH-{rng.randrange(10 ** 8)}"}),
+    "export_members": ("GET", METHOD_PATH + "umt.www.admin.members.export_members", None),
+    "export_transactions": ("GET", METHOD_PATH + "umt.www.admin.finance.export_transactions", None)
+}
+
+# Relative weights of the requests in each session mix
+MIXES = {
+    "admin": {
+        "admin_dashboard": 25, "admin_members": 25, "admin_finance": 20,
+        "save_member": 10, "save_transaction": 10, "export_members": 5, "export_transactions": 5
+    },
+    "member": {"member_portal": 60, "renew_membership": 30, "submit_renewal": 10},
+    "campaign": {
+        "member_portal": 30, "renew_membership": 30, "submit_renewal": 20,
+        "admin_dashboard": 8, "admin_members": 6, "save_member": 4, "admin_finance": 2
+    },
+    "default": {
+        "admin_dashboard": 15, "admin_members": 15, "admin_finance": 10, "member_portal": 20,
+        "renew_membership": 15, "save_member": 6, "save_transaction": 6, "submit_renewal": 8,
+        "export_members": 3, "export_transactions": 2
+    }
+}
+
+# A stage saturates an endpoint when it crosses one of these, or when adding
+# users no longer adds throughput
+MAX_ERROR_RATE = 0.01
+MAX_P95_MS = 2000
+MIN_THROUGHPUT_GAIN = 0.1
+
+class HTTPError(Exception):
+    pass
+
+class Connection:
+    """Minimal HTTP/1.1 keep-alive client on asyncio streams, with a cookie jar"""
+
+    def __init__(self, url, timeout):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.secure = parts.scheme == "https"
+        self.port = parts.port or (443 if self.secure else 80)
+        self.timeout = timeout
+        self.reader = self.writer = None
+        self.cookies = {}
+        self.headers = {}
+        self.ttfb = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.wait_for(asyncio.open_connection(
+            self.host, self.port, ssl=ssl.create_default_context() if self.secure else None), self.timeout)
+
+    async def close(self):
+        if self.writer:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except Exception:
+                pass
+        self.reader = self.writer = None
+
+    async def request(self, method, path, data=None):
+        """Send a request and return (status, body), reconnecting once if the
+        server closed the kept-alive connection"""
+        for attempt in range(2):
+            if not self.writer:
+                await self.connect()
+            try:
+                return await asyncio.wait_for(self.send(method, path, data), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                await self.close()
+                if attempt:
+                    raise
+
+    async def send(self, method, path, data):
+        body = urlencode(data).encode() if data else b""
+        if method == "GET" and data:
+            path, body = f"{path}?{body.decode()}", b""
+
+        headers = {
+            "Host": self.host,
+            "Connection": "keep-alive",
+            "Accept": "application/json, text/html",
+            "Content-Length": str(len(body)),
+            **self.headers
+        }
+        if body:
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+
+        head = f"{method} {path} HTTP/1.1\r\n" + "".join(f"{k}: {v}\r\n" for k, v in headers.items()) + "\r\n"
+        start = time.perf_counter()
+        self.writer.write(head.encode() + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed")
+        self.ttfb = (time.perf_counter() - start) * 1000
+        status = int(status_line.split()[1])
+
+        response_headers = {}
+        while True:
+            line = (await self.reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            key, _sep, value = line.partition(":")
+            key, value = key.strip().lower(), value.strip()
+            if key == "set-cookie":
+                cookie_name, _sep, cookie_value = value.split(";", 1)[0].partition("=")
+                self.cookies[cookie_name.strip()] = cookie_value.strip()
+            response_headers[key] = value
+
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                if not size:
+                    await self.reader.readline()
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            content = b"".join(chunks)
+        else:
+            content = await self.reader.readexactly(int(response_headers.get("content-length", 0)))
+
+        if response_headers.get("connection", "").lower() == "close":
+            await self.close()
+
+        return status, content
+
+class Stats:
+    """Latency samples and error counts per stage and endpoint"""
+
+    def __init__(self):
+        self.stages = []
+
+    def start_stage(self, users, duration):
+        self.stages.append({"users": users, "duration": duration, "started": time.perf_counter(), "endpoints": {}})
+
+    def record(self, endpoint, latency_ms, error=None):
+        stats = self.stages[-1]["endpoints"].setdefault(endpoint, {"samples": [], "errors": 0, "last_error": None})
+        stats["samples"].append(latency_ms)
+        if error:
+            stats["errors"] += 1
+            stats["last_error"] = error
+
+    def end_stage(self):
+        self.stages[-1]["elapsed"] = time.perf_counter() - self.stages[-1]["started"]
+
+    def report(self):
+        stages = []
+        for stage in self.stages:
+            endpoints = {name: summarize(stats["samples"], stats["errors"], stage["elapsed"], stats["last_error"])
+                for name, stats in sorted(stage["endpoints"].items())}
+            samples = [s for stats in stage["endpoints"].values() for s in stats["samples"]]
+            errors = sum(stats["errors"] for stats in stage["endpoints"].values())
+            stages.append({
+                "users": stage["users"],
+                "seconds": round(stage["elapsed"], 2),
+                "total": summarize(samples, errors, stage["elapsed"]),
+                "endpoints": endpoints
+            })
+        return stages
+
+def summarize(samples, errors, elapsed, last_error=None):
+    samples = sorted(samples)
+    summary = {
+        "requests": len(samples),
+        "rps": round(len(samples) / elapsed, 2) if elapsed else 0,
+        "error_rate": round(errors / len(samples), 4) if samples else 0,
+        "p50_ms": round(percentile(samples, 50), 2) if samples else None,
+        "p95_ms": round(percentile(samples, 95), 2) if samples else None,
+        "p99_ms": round(percentile(samples, 99), 2) if samples else None,
+        "max_ms": round(samples[-1], 2) if samples else None
+    }
+    if last_error:
+        summary["last_error"] = last_error
+    return summary
+
+def parse_profile(profile):
+    """Stages as [(users, seconds)], from "users:seconds,..." or a list of pairs"""
+    if isinstance(profile, str):
+        profile = [stage.split(":") for stage in profile.split(",") if stage.strip()]
+    return [(int(users), float(seconds)) for users, seconds in profile]
+
+def find_saturation(stages):
+    """Per endpoint, the user count of the first stage past the limits"""
+    saturation = {}
+    for idx, stage in enumerate(stages):
+        for name, stats in stage["endpoints"].items():
+            if name in saturation:
+                continue
+
+            previous = stages[idx - 1]["endpoints"].get(name) if idx else None
+            reason = None
+            if stats["error_rate"] > MAX_ERROR_RATE:
+                reason = "error_rate"
+            elif stats["p95_ms"] is not None and stats["p95_ms"] > MAX_P95_MS:
+                reason = "p95"
+            elif (previous and stage["users"] > stages[idx - 1]["users"]
+                    and stats["rps"] < previous["rps"] * (1 + MIN_THROUGHPUT_GAIN)):
+                reason = "throughput"
+
+            if reason:
+                saturation[name] = {"users": stage["users"], "reason": reason}
+    return saturation
+
+async def login(connection, usr, pwd, api_key=None, api_secret=None):
+    """Token auth when API keys are given, else a session login plus the CSRF
+    token needed for POSTs"""
+    if api_key and api_secret:
+        connection.headers["Authorization"] = f"token {api_key}:{api_secret}"
+        return
+
+    status, content = await connection.request("POST", METHOD_PATH + "login", {"usr": usr, "pwd": pwd})
+    if status != 200:
+        raise HTTPError(f"login failed with status {status}")
+
+    status, content = await connection.request("GET", "/app")
+    match = re.search(rb'csrf_token\s*=\s*"([^"]+)"', content)
+    if match:
+        connection.headers["X-Frappe-CSRF-Token"] = match.group(1).decode()
+
+def is_failure(content):
+    """Whitelisted methods report handled errors as {"success": false}"""
+    try:
+        message = json.loads(content).get("message")
+    except ValueError:
+        return False
+    return isinstance(message, dict) and message.get("success") is False
+
+async def virtual_user(url, auth, mix, stats, stop, think_time, timeout, rng):
+    connection = Connection(url, timeout)
+    endpoints, weights = list(mix), list(mix.values())
+
+    try:
+        await login(connection, *auth)
+        while not stop.is_set():
+            name = rng.choices(endpoints, weights)[0]
+            method, path, payload = ENDPOINTS[name]
+
+            start = time.perf_counter()
+            error = None
+            try:
+                status, content = await connection.request(method, path, payload(rng) if payload else None)
+                if status >= 400:
+                    error = f"HTTP {status}"
+                elif method == "POST" and is_failure(content):
+                    error = "success: false"
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                await connection.close()
+            stats.record(name, (time.perf_counter() - start) * 1000, error)
+
+            if think_time:
+                try:
+                    await asyncio.wait_for(stop.wait(), rng.expovariate(1 / think_time))
+                except asyncio.TimeoutError:
+                    pass
+    except Exception as e:
+        stats.record("login", 0, f"{type(e).__name__}: {e}")
+    finally:
+        await connection.close()
+
+async def drive(url, auth, mix, profile, think_time, timeout, seed):
+    stats = Stats()
+    users = []
+
+    for stage_users, seconds in profile:
+        stats.start_stage(stage_users, seconds)
+
+        while len(users) > stage_users:
+            stop, task = users.pop()
+            stop.set()
+            await task
+
+        while len(users) < stage_users:
+            stop = asyncio.Event()
+            rng = random.Random(seed + len(users))
+            users.append((stop, asyncio.ensure_future(
+                virtual_user(url, auth, mix, stats, stop, think_time, timeout, rng))))
+
+        await asyncio.sleep(seconds)
+        stats.end_stage()
+
+    for stop, _task in users:
+        stop.set()
+    await asyncio.gather(*(task for _stop, task in users))
+
+    return stats
+
+def run(url=None, usr="Administrator", pwd=None, api_key=None, api_secret=None,
+        profile="5:30,20:60,50:60,100:60", mix="default", think_time=1.0, timeout=30, seed=42, output=None):
+    """Ramp virtual users through `profile` and report each stage.
+
+    `mix` is one of MIXES or a dict of endpoint weights. Results carry the
+    throughput, latency percentiles and error rate of every endpoint per stage,
+    and the first stage at which each endpoint saturated.
+    """
+    url = (url or get_url()).rstrip("/")
+    mix = MIXES[mix] if isinstance(mix, str) else mix
+    unknown = set(mix) - set(ENDPOINTS)
+    if unknown:
+        frappe.throw(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+
+    profile = parse_profile(profile)
+    auth = (usr, pwd or frappe.conf.get("admin_password"), api_key, api_secret)
+
+    stats = asyncio.run(drive(url, auth, mix, profile, float(think_time), float(timeout), int(seed)))
+    stages = stats.report()
+
+    report = {
+        "url": url,
+        "mix": mix,
+        "think_time": float(think_time),
+        "stages": stages,
+        "saturation": find_saturation(stages)
+    }
+
+    path = write_results(report, output, prefix="loadtest")
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"Results written to {path}")
+    return report
@@ -0,0 +1,95 @@
+import json
+import random
+import threading
+import time
+
+import frappe
+
+from umt.search import autocomplete, get_autocomplete_entries, AUTOCOMPLETE_KEY, AUTOCOMPLETE_SETS
+from umt.benchmarks.member_search import make_member, percentile, FIRST_NAMES, LAST_NAMES
+
+BENCH_PREFIX = "BENCH-AC-"
+
+def run(members=200000, keystrokes=2000, concurrency=8, seed=42):
+    """Measure per-keystroke autocomplete latency with `concurrency` parallel typists.
+
+    Synthetic entries are added to the live sets and removed afterwards.
+    """
+    members, keystrokes, concurrency = int(members), int(keystrokes), int(concurrency)
+    rng = random.Random(seed)
+    entries = seed_entries(members, rng)
+
+    site = frappe.local.site
+    samples = []
+    lock = threading.Lock()
+
+    def typist(worker):
+        frappe.init(site=site)
+        worker_rng = random.Random(seed + worker)
+        local_samples = []
+        try:
+            for prefix in make_keystrokes(keystrokes // concurrency, worker_rng):
+                start = time.perf_counter()
+                autocomplete(prefix)
+                local_samples.append((time.perf_counter() - start) * 1000)
+        finally:
+            frappe.destroy()
+        with lock:
+            samples.extend(local_samples)
+
+    threads = [threading.Thread(target=typist, args=(worker,)) for worker in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    cleanup(entries)
+
+    samples.sort()
+    report = {
+        "members": members,
+        "keystrokes": len(samples),
+        "concurrency": concurrency,
+        "keystrokes_per_second": round(len(samples) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "p99_ms": round(percentile(samples, 99), 3)
+    }
+    print(json.dumps(report, indent=2))
+    return report
+
+def seed_entries(count, rng, batch_size=10000):
+    cache = frappe.cache()
+    entries = {set_name: [] for set_name in AUTOCOMPLETE_SETS}
+
+    for start in range(0, count, batch_size):
+        pipeline = cache.pipeline()
+        for idx in range(start, min(start + batch_size, count)):
+            member = frappe._dict(make_member(idx, rng), name=f"{BENCH_PREFIX}{idx:07d}")
+            for set_name, entry in get_autocomplete_entries(member):
+                entries[set_name].append(entry)
+                pipeline.zadd(cache.make_key(AUTOCOMPLETE_KEY.format(set_name)), {entry: 0})
+        pipeline.execute()
+
+    return entries
+
+def make_keystrokes(count, rng):
+    """Successive prefixes of names, phones and card numbers, as typed"""
+    keystrokes = []
+    while len(keystrokes) < count:
+        word = rng.choice([
+            f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            f"06{rng.randrange(10 ** 8):08d}",
+            f"2025{rng.randrange(3):02d}{rng.randrange(10 ** 7):07d}"
+        ])
+        keystrokes.extend(word[:length] for length in range(1, len(word) + 1))
+    return keystrokes[:count]
+
+def cleanup(entries):
+    cache = frappe.cache()
+    for set_name, set_entries in entries.items():
+        key = cache.make_key(AUTOCOMPLETE_KEY.format(set_name))
+        for start in range(0, len(set_entries), 10000):
+            cache.zrem(key, *set_entries[start:start + 10000])
@@ -0,0 +1,95 @@
+import json
+import random
+import time
+
+import frappe
+
+from umt.search import search, insert_tokens, get_member_tokens
+
+BENCH_PREFIX = "BENCH-SEARCH-"
+
+FIRST_NAMES = ["محمد", "أحمد", "فاطمة", "خديجة", "يوسف", "إبراهيم", "عائشة", "مريم", "عبد الله", "سعيد", "نادية", "حسن"]
+LAST_NAMES = ["العلوي", "الإدريسي", "بنعلي", "التازي", "الفاسي", "المراكشي", "بوزيد", "الحسني", "الطنجاوي", "أمزيان"]
+INSTITUTIONS = ["ثانوية ابن خلدون", "مدرسة الأمل", "إعدادية الفتح", "ثانوية الحسن الثاني", "مدرسة النور"]
+
+def run(members=1000000, queries=200, seed=42):
+    """Measure ranked search latency over `members` synthetic members.
+
+    Synthetic members and their tokens use `BENCH-SEARCH-` ids and are deleted
+    afterwards. The report includes the share of queries that returned members.
+    """
+    members, queries = int(members), int(queries)
+    rng = random.Random(seed)
+
+    start = time.perf_counter()
+    seed_tokens(members, rng)
+    seed_seconds = time.perf_counter() - start
+
+    samples = []
+    hits = 0
+    for query in make_queries(queries, rng):
+        start = time.perf_counter()
+        hits += bool(search(query))
+        samples.append((time.perf_counter() - start) * 1000)
+
+    cleanup()
+
+    samples.sort()
+    report = {
+        "members": members,
+        "queries": queries,
+        "seed_seconds": round(seed_seconds, 2),
+        "hit_rate": round(hits / queries, 3) if queries else 0,
+        "p50_ms": round(percentile(samples, 50), 2),
+        "p95_ms": round(percentile(samples, 95), 2),
+        "p99_ms": round(percentile(samples, 99), 2),
+        "max_ms": round(samples[-1], 2)
+    }
+    print(json.dumps(report, indent=2))
+    return report
+
+def seed_tokens(count, rng, batch_size=10000):
+    """Insert synthetic members and their search tokens"""
+    from umt.benchmarks.datagen import base_row, bulk_insert
+
+    for start in range(0, count, batch_size):
+        members = [
+            base_row(f"{BENCH_PREFIX}{idx:07d}", **make_member(idx, rng))
+            for idx in range(start, min(start + batch_size, count))
+        ]
+        bulk_insert("Member", members)
+        insert_tokens({member["name"]: get_member_tokens(member) for member in members})
+        frappe.db.commit()
+
+def make_member(idx, rng):
+    return {
+        "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "card_number": f"2025{idx % 3:02d}{idx:07d}",
+        "phone": f"06{rng.randrange(10 ** 8):08d}",
+        "institution": rng.choice(INSTITUTIONS),
+        "membership_status": "Active",
+        "is_active": 1
+    }
+
+def make_queries(count, rng):
+    """Mix of full names, name prefixes with spelling variants, phones and card numbers"""
+    queries = []
+    for idx in range(count):
+        kind = idx % 4
+        if kind == 0:
+            queries.append(f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}")
+        elif kind == 1:
+            queries.append(f"{rng.choice(FIRST_NAMES).replace('ا', 'أ')[:3]} {rng.choice(LAST_NAMES)[:4]}")
+        elif kind == 2:
+            queries.append(f"06{rng.randrange(10 ** 8):08d}")
+        else:
+            queries.append(f"2025{rng.randrange(3):02d}{rng.randrange(10 ** 6):06d}")
+    return queries
+
+def percentile(samples, pct):
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+def cleanup():
+    frappe.db.sql("DELETE FROM `tabMember_Search_Token` WHERE member LIKE %s", (BENCH_PREFIX + "%",))
+    frappe.db.sql("DELETE FROM `tabMember` WHERE name LIKE %s", (BENCH_PREFIX + "%",))
+    frappe.db.commit()
@@ -0,0 +1,57 @@
+import json
+import time
+
+import frappe
+
+from umt import permissions
+
+# Per-call cost of the admin access checks, before and after the shared
+# permission layer, for the session user (or `user`):
+#
+#   bench --site test.local execute umt.benchmarks.permissions.run --kwargs "{'user': 'finance@example.com'}"
+
+def run(iterations=100000, user=None):
+    """Time each access check `iterations` times and print the mean cost per call"""
+    iterations = int(iterations)
+    if user:
+        frappe.set_user(user)
+
+    def cold(check):
+        def call():
+            permissions.clear_cache()
+            return check()
+        return call
+
+    @permissions.require_access("finance")
+    def decorated():
+        return True
+
+    def bare():
+        return True
+
+    cases = {
+        "finance_per_call_roles": lambda: bool({"System Manager", "Finance Manager", "Finance User"}
+            & set(frappe.get_roles())),
+        "finance_cold": cold(permissions.has_finance_access),
+        "finance_warm": permissions.has_finance_access,
+        "settings_per_call_permission": lambda: frappe.has_permission("System Settings", "write"),
+        "settings_cold": cold(permissions.has_settings_access),
+        "settings_warm": permissions.has_settings_access,
+        "undecorated_method": bare,
+        "decorated_method": decorated
+    }
+
+    report = {"user": frappe.session.user, "iterations": iterations}
+    permissions.clear_cache()
+    for name, call in cases.items():
+        if name == "decorated_method" and not permissions.has_finance_access():
+            report[name] = None
+            continue
+        call()
+        start = time.perf_counter()
+        for _idx in range(iterations):
+            call()
+        report[name] = {"us_per_call": round((time.perf_counter() - start) * 1e6 / iterations, 3)}
+
+    print(json.dumps(report, indent=2))
+    return report
@@ -0,0 +1,99 @@
+import json
+import threading
+import time
+
+import frappe
+
+from umt.benchmarks.member_search import percentile
+from umt.report.member_status_report import member_status_report
+from umt.report.financial_summary_report import financial_summary_report
+
+# Reference queries: one count per cell through frappe.get_all, the way the
+# reports used to compute them. The report tests assert identical results:
+#
+#   bench --site test.local run-tests --app umt
+
+def get_member_filters(filters, **extra):
+    member_filters = dict(extra)
+    if filters.get("from_date") and filters.get("to_date"):
+        member_filters["membership_date"] = ["between", [filters.from_date, filters.to_date]]
+    elif filters.get("from_date"):
+        member_filters["membership_date"] = [">=", filters.from_date]
+    elif filters.get("to_date"):
+        member_filters["membership_date"] = ["<=", filters.to_date]
+    return member_filters
+
+def get_reference_member_row(province, filters):
+    """One count per cell, the way the report used to compute it"""
+    row = {"total_members": frappe.db.count("Member", get_member_filters(filters, province=province))}
+    for status in ("Active", "Inactive", "Expired"):
+        row[f"{status.lower()}_members"] = frappe.db.count("Member",
+            get_member_filters(filters, province=province, membership_status=status))
+
+    members = frappe.get_all("Member", filters=get_member_filters(filters, province=province), pluck="name")
+    for key, payment_status in (("paid_cards", member_status_report.PAID), ("unpaid_cards", member_status_report.UNPAID)):
+        row[key] = frappe.db.count("Membership_Card", {
+            "member": ["in", members or [""]],
+            "payment_status": payment_status,
+            "status": "Active"
+        })
+    return row
+
+def get_reference_member_data(filters):
+    filters = frappe._dict(filters)
+    provinces = member_status_report.get_provinces()
+    provinces += sorted(set(frappe.get_all("Member", filters={"province": ["not in", provinces]},
+        pluck="province", distinct=True)) - {None, ""})
+    return [get_reference_member_row(province, filters) for province in provinces]
+
+def run(concurrency=16, iterations=25, filters=None):
+    """Run both reports' queries from `concurrency` threads and report latency.
+
+    Report caching is bypassed by calling get_data directly. The member status
+    report is also timed with the previous one-count-per-cell approach.
+    """
+    concurrency, iterations = int(concurrency), int(iterations)
+    filters = json.loads(filters) if isinstance(filters, str) else (filters or {})
+    site = frappe.local.site
+    samples = {"member_status": [], "member_status_per_cell": [], "financial_summary": []}
+    lock = threading.Lock()
+
+    def worker():
+        frappe.init(site=site)
+        frappe.connect()
+        local = {key: [] for key in samples}
+        try:
+            for _idx in range(iterations):
+                for key, get_data in (
+                        ("member_status", member_status_report.get_data),
+                        ("member_status_per_cell", get_reference_member_data),
+                        ("financial_summary", financial_summary_report.get_data)):
+                    start = time.perf_counter()
+                    get_data(filters)
+                    local[key].append((time.perf_counter() - start) * 1000)
+        finally:
+            frappe.destroy()
+        with lock:
+            for key, values in local.items():
+                samples[key].extend(values)
+
+    threads = [threading.Thread(target=worker) for _idx in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    report = {"concurrency": concurrency, "iterations": iterations, "seconds": round(elapsed, 2)}
+    for key, values in samples.items():
+        values.sort()
+        report[key] = {
+            "runs": len(values),
+            "p50_ms": round(percentile(values, 50), 2),
+            "p95_ms": round(percentile(values, 95), 2),
+            "p99_ms": round(percentile(values, 99), 2)
+        }
+
+    print(json.dumps(report, indent=2))
+    return report
@@ -0,0 +1,169 @@
+import json
+import os
+import subprocess
+import time
+
+import frappe
+from frappe.utils import now_datetime
+
+from umt.benchmarks import datagen
+from umt.benchmarks.member_search import percentile
+
+# Timed scenarios against the app's real entry points, on the synthetic
+# dataset from datagen. Results are printed and written as JSON under the
+# site's private/benchmarks folder so runs can be compared over time.
+#
+#   bench --site test.local execute umt.benchmarks.runner.run --kwargs "{'scale': '100k'}"
+
+RESULTS_DIR = "benchmarks"
+
+def run(scale="10k", scenarios=None, repeat=5, generate=True, keep_data=True, output=None):
+    """Generate the dataset if needed, run the scenarios and return the results.
+
+    `scenarios` is a list (or comma separated string) of scenario names,
+    defaulting to all of them. Report caching is bypassed so every run
+    measures the queries. Scenarios that write roll back after each run, so the
+    dataset is the same for every iteration and every scenario.
+    """
+    repeat = int(repeat)
+    if isinstance(scenarios, str):
+        scenarios = [s.strip() for s in scenarios.split(",") if s.strip()]
+
+    dataset = datagen.get_dataset()
+    if generate and not dataset["academic_years"]:
+        datagen.generate(scale)
+        dataset = datagen.get_dataset()
+
+    if not dataset["academic_years"]:
+        frappe.throw("No benchmark dataset, run umt.benchmarks.datagen.generate first")
+
+    context = frappe._dict(
+        academic_year=dataset["academic_years"][-1],
+        member=frappe.db.sql("SELECT name FROM `tabMember` WHERE name LIKE %s ORDER BY name LIMIT 1",
+            (datagen.BENCH_PREFIX + "%",), pluck=True)[0]
+    )
+
+    available = get_scenarios()
+    selected = scenarios or list(available)
+    unknown = set(selected) - set(available)
+    if unknown:
+        frappe.throw(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    frappe.local.conf.umt_disable_report_cache = 1
+    try:
+        results = {name: time_scenario(available[name], context, repeat) for name in selected}
+    finally:
+        frappe.local.conf.pop("umt_disable_report_cache", None)
+
+    report = {
+        "timestamp": now_datetime().isoformat(),
+        "site": frappe.local.site,
+        "commit": get_commit(),
+        "repeat": repeat,
+        "dataset": dataset,
+        "scenarios": results
+    }
+
+    path = write_results(report, output)
+    print(json.dumps(report, indent=2, ensure_ascii=False, default=str))
+    print(f"Results written to {path}")
+
+    if not keep_data:
+        datagen.cleanup()
+
+    return report
+
+def time_scenario(scenario, context, repeat):
+    """Run a scenario `repeat` times, each inside a savepoint that is rolled back"""
+    samples, errors = [], []
+
+    for _idx in range(repeat):
+        frappe.db.savepoint("umt_benchmark")
+        frappe.local.response = frappe._dict()
+        start = time.perf_counter()
+        try:
+            result = scenario(context)
+            if isinstance(result, dict) and result.get("success") is False:
+                errors.append(result.get("message"))
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+        samples.append((time.perf_counter() - start) * 1000)
+        frappe.db.rollback(save_point="umt_benchmark")
+        frappe.local.message_log = []
+
+    samples.sort()
+    return {
+        "runs": len(samples),
+        "errors": len(errors),
+        "error": errors[-1] if errors else None,
+        "min_ms": round(samples[0], 2),
+        "p50_ms": round(percentile(samples, 50), 2),
+        "p95_ms": round(percentile(samples, 95), 2),
+        "max_ms": round(samples[-1], 2)
+    }
+
+def get_scenarios():
+    from umt.report.financial_summary_report import financial_summary_report
+    from umt.report.member_status_report import member_status_report
+    from umt.www import renew_membership
+    from umt.www.admin import dashboard, members, finance, structure, settings
+
+    scenarios = {
+        "financial_summary_report": lambda ctx: financial_summary_report.execute(
+            {"academic_year": ctx.academic_year}),
+        "financial_summary_report_all_years": lambda ctx: financial_summary_report.execute({}),
+        "member_status_report": lambda ctx: member_status_report.execute(
+            {"academic_year": ctx.academic_year}),
+        "member_status_report_all_years": lambda ctx: member_status_report.execute({}),
+        "save_member_insert": lambda ctx: members.save_member(new_member_data()),
+        "save_member_update": lambda ctx: members.save_member({"name": ctx.member, "phone": "0600000000"}),
+        "submit_renewal": submit_renewal(renew_membership),
+        "export_members": lambda ctx: export(members.export_members),
+        "export_transactions": lambda ctx: export(finance.export_transactions)
+    }
+
+    for name, page in (("dashboard", dashboard), ("members", members), ("finance", finance),
+            ("structure", structure), ("settings", settings)):
+        scenarios[f"admin_{name}_page"] = lambda ctx, page=page: page.get_context(frappe._dict())
+
+    return scenarios
+
+def new_member_data():
+    return {
+        "full_name": "عضو تجريبي",
+        "province": datagen.PROVINCES[0],
+        "membership_status": "Active",
+        "phone": "0611111111",
+        "gender": datagen.GENDERS[0]
+    }
+
+def submit_renewal(renew_membership):
+    """Renewal as the member linked to the current user; the link is set inside
+    the scenario's savepoint and rolled back with it"""
+    def scenario(ctx):
+        if "user" in frappe.db.get_table_columns("Member"):
+            frappe.db.sql("UPDATE `tabMember` SET user = %s WHERE name = %s", (frappe.session.user, ctx.member))
+        return renew_membership.submit_renewal(datagen.PAYMENT_METHODS[0], transaction_ref="BENCH")
+    return scenario
+
+def export(method):
+    frappe.local.form_dict = frappe._dict()
+    method()
+    return len(frappe.local.response.get("filecontent") or b"")
+
+def get_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"],
+            cwd=frappe.get_app_path("umt"), stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+def write_results(report, output=None, prefix="results"):
+    if not output:
+        folder = frappe.get_site_path("private", RESULTS_DIR)
+        os.makedirs(folder, exist_ok=True)
+        output = os.path.join(folder, f"{prefix}-{now_datetime().strftime('%Y%m%d-%H%M%S')}.json")
+
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False, default=str)
+    return output
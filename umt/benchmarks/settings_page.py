@@ -0,0 +1,67 @@
+import asyncio
+import json
+
+import frappe
+from frappe.utils import get_url
+
+from umt.benchmarks.loadtest import Connection, login, METHOD_PATH
+from umt.benchmarks.member_search import percentile
+from umt.benchmarks.runner import get_commit, write_results
+
+PAGE = "/admin/settings"
+PANELS = ["payment", "notifications", "backup"]
+
+def run(url=None, usr="Administrator", pwd=None, iterations=20, output=None):
+    """Measure the time to first byte of the settings page and of each lazy panel.
+
+    Run it on the commit before and after a change to compare the two: the
+    results carry the commit they were measured on. Panels are timed on a cold
+    fragment cache (first request) and warm (the following ones).
+    """
+    url = (url or get_url()).rstrip("/")
+    iterations = int(iterations)
+
+    frappe.cache().delete_keys("umt_fragment:")
+    samples = asyncio.run(measure(url, usr, pwd or frappe.conf.get("admin_password"), iterations))
+
+    report = {"url": url, "commit": get_commit(), "iterations": iterations}
+    for key, values in samples.items():
+        report[key] = summarize(values)
+
+    path = write_results(report, output, prefix="settings-page")
+    print(json.dumps(report, indent=2))
+    print(f"Results written to {path}")
+    return report
+
+async def measure(url, usr, pwd, iterations):
+    connection = Connection(url, timeout=60)
+    samples = {"page_ttfb_ms": []}
+
+    try:
+        await login(connection, usr, pwd)
+
+        for _idx in range(iterations):
+            await connection.request("GET", PAGE)
+            samples["page_ttfb_ms"].append(connection.ttfb)
+
+        for panel in PANELS:
+            cold, warm = f"{panel}_panel_cold_ttfb_ms", f"{panel}_panel_warm_ttfb_ms"
+            samples[cold], samples[warm] = [], []
+            for idx in range(iterations + 1):
+                await connection.request("POST", METHOD_PATH + "umt.www.admin.settings.get_panel", {"panel": panel})
+                samples[cold if idx == 0 else warm].append(connection.ttfb)
+    finally:
+        await connection.close()
+
+    return samples
+
+def summarize(values):
+    values = sorted(values)
+    if not values:
+        return None
+    return {
+        "runs": len(values),
+        "p50": round(percentile(values, 50), 2),
+        "p95": round(percentile(values, 95), 2),
+        "max": round(values[-1], 2)
+    }
@@ -0,0 +1,47 @@
+import json
+import os
+import time
+
+import frappe
+
+from umt.backups import dump_database, get_workers
+from umt.snapshots import take_snapshot
+
+def run(full_backup=True):
+    """Compare an incremental snapshot with a full snapshot and a full database dump.
+
+    The snapshots are kept in the chain (the incremental one is taken on top of
+    the full one); the database dump is deleted afterwards.
+    """
+    report = {}
+
+    for label, full in (("full_snapshot", True), ("incremental_snapshot", False)):
+        name = take_snapshot(full=full)
+        snapshot = frappe.db.get_value("Data_Snapshot", name,
+            ["row_count", "deleted_count", "file_size", "duration"], as_dict=1)
+        report[label] = {
+            "name": name,
+            "rows": snapshot.row_count,
+            "deleted": snapshot.deleted_count,
+            "bytes": snapshot.file_size,
+            "seconds": snapshot.duration
+        }
+
+    if full_backup:
+        start = time.perf_counter()
+        path, uncompressed_size = dump_database(get_workers())
+        report["full_backup"] = {
+            "bytes": os.path.getsize(path),
+            "uncompressed_bytes": uncompressed_size,
+            "seconds": round(time.perf_counter() - start, 2)
+        }
+        os.remove(path)
+
+        incremental, backup = report["incremental_snapshot"], report["full_backup"]
+        report["incremental_vs_full_backup"] = {
+            "size_ratio": round(incremental["bytes"] / backup["bytes"], 4) if backup["bytes"] else None,
+            "time_ratio": round(incremental["seconds"] / backup["seconds"], 4) if backup["seconds"] else None
+        }
+
+    print(json.dumps(report, indent=2))
+    return report
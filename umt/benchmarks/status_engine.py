@@ -0,0 +1,53 @@
+import json
+import time
+
+from frappe.utils import today, add_months
+
+from umt.doctype.member.member import get_membership_status
+from umt import status_engine
+
+# The status engine against the per-document status logic, timed on the site's
+# members (identical results are asserted by umt/tests/test_status_engine.py):
+#
+#   bench --site test.local execute umt.benchmarks.status_engine.run --kwargs "{'dates': 12}"
+
+def run(dates=12, chunk_size=status_engine.CHUNK_SIZE):
+    """Time member status counts on `dates` monthly as-of dates, engine against a per-member loop.
+
+    Both use the same loaded chunks, so the difference is the status evaluation.
+    """
+    as_of_dates = [add_months(today(), -months) for months in range(int(dates))]
+    report = {"dates": len(as_of_dates), "runs": []}
+
+    for as_of in as_of_dates:
+        chunks = list(status_engine.iter_member_chunks(as_of, chunk_size=chunk_size))
+        members = sum(len(chunk.provinces) for chunk in chunks)
+
+        start = time.perf_counter()
+        for chunk in chunks:
+            status_engine.count_by_province({}, chunk.provinces,
+                status_engine.member_statuses(chunk.renewal_dates, chunk.is_active, as_of))
+        engine_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for chunk in chunks:
+            counts = {}
+            for province, active, renewal in zip(chunk.provinces, chunk.is_active, chunk.renewal_dates.tolist()):
+                status = get_membership_status(renewal, active, as_of, "Not Renewed")
+                counts[(province, status)] = counts.get((province, status), 0) + 1
+        loop_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        status_engine.get_member_status_counts(as_of, chunk_size=chunk_size)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        report["runs"].append({
+            "as_of": as_of,
+            "members": members,
+            "engine_ms": round(engine_ms, 2),
+            "per_member_ms": round(loop_ms, 2),
+            "with_queries_ms": round(total_ms, 2)
+        })
+
+    print(json.dumps(report, indent=2, default=str))
+    return report
@@ -0,0 +1,234 @@
+import frappe
+from frappe import _
+from frappe.utils import getdate, today, now, flt, cstr
+from umt.cache import bump_doctype_version
+from umt.cohorts import bump_cohort_versions
+from umt.doctype.activity_entry.activity_entry import add_activities
+from umt.doctype.financial_period.financial_period import is_period_sealed
+from umt.doctype.gl_entry.gl_entry import make_gl_entries, get_income_gl_map
+from umt.verification import VERIFY_CACHE_KEY
+
+CARD_ENTRY_TYPE = "بطاقة الإنخراط"
+PAID_STATUS = "المؤداة"
+DEFAULT_CHUNK_SIZE = 500
+
+# Columns written for every posted row, in bulk_insert order
+INSERT_FIELDS = [
+    "name", "owner", "creation", "modified", "modified_by", "docstatus",
+    "posting_date", "academic_year", "entry_type", "status",
+    "member", "member_name", "amount", "currency",
+    "payment_method", "reference_number", "payment_date", "collected_by", "notes"
+]
+
+def post_income_entries(rows, academic_year=None, posting_date=None, payment_date=None,
+        entry_type=CARD_ENTRY_TYPE, currency="MAD", chunk_size=DEFAULT_CHUNK_SIZE):
+    """Validate, name, insert and submit a batch of Income_Entry rows.
+
+    Rows are validated in a single pass, names are reserved as one block of the
+    `INC-{YYYY}-{#####}` series and valid rows are written and committed chunk by
+    chunk. Returns one result dict per input row, in input order.
+    """
+    posting_date = getdate(posting_date or today())
+    payment_date = getdate(payment_date or posting_date)
+    academic_year = academic_year or frappe.db.get_default("current_academic_year")
+
+    results = [{"row": idx, "success": False, "name": None, "message": None} for idx in range(len(rows))]
+    entries = validate_rows(rows, results, academic_year, posting_date, payment_date, entry_type, currency)
+
+    if not entries:
+        return results
+
+    names = reserve_names(len(entries))
+    for entry, name in zip(entries, names):
+        entry["name"] = name
+
+    chunk_size = max(int(chunk_size or DEFAULT_CHUNK_SIZE), 1)
+    for start in range(0, len(entries), chunk_size):
+        chunk = entries[start:start + chunk_size]
+        try:
+            insert_chunk(chunk)
+            make_gl_entries([row for entry in chunk for row in get_income_gl_map(entry)])
+            update_membership_cards([e["member"] for e in chunk if e["entry_type"] == CARD_ENTRY_TYPE and e["member"]])
+            add_activities([{
+                "activity_type": "Payment",
+                "description": _("{0}: {1} درهم").format(e["entry_type"], e["amount"]),
+                "member": e["member"],
+                "reference_doctype": "Income_Entry",
+                "reference_name": e["name"],
+                "icon": "money"
+            } for e in chunk])
+            frappe.db.commit()
+            bump_doctype_version("Income_Entry", "Membership_Card", "Member")
+            bump_cohort_versions()
+        except Exception as e:
+            frappe.db.rollback()
+            frappe.log_error(frappe.get_traceback(), _("خطأ في التسجيل الجماعي للمداخيل"))
+            for entry in chunk:
+                results[entry["row"]].update({"success": False, "name": None, "message": str(e)})
+            continue
+
+        for entry in chunk:
+            results[entry["row"]].update({"success": True, "name": entry["name"], "message": None})
+
+    return results
+
+def validate_rows(rows, results, academic_year, posting_date, payment_date, entry_type, currency):
+    """Validate all rows at once and return the entries that can be posted.
+
+    Mirrors IncomeEntry.validate, but resolves members and payment methods with
+    one query each instead of one document load per row.
+    """
+    errors = {}
+    current_date = getdate(today())
+
+    batch_error = None
+    if not academic_year:
+        batch_error = _("يجب تحديد السنة الدراسية")
+    elif not frappe.db.exists("Academic Year", academic_year):
+        batch_error = _("السنة الدراسية {0} غير موجودة").format(academic_year)
+    elif posting_date > current_date:
+        batch_error = "تاريخ التسجيل لا يمكن أن يكون في المستقبل"
+    elif payment_date > current_date:
+        batch_error = "تاريخ الدفع لا يمكن أن يكون في المستقبل"
+    elif payment_date > posting_date:
+        batch_error = "تاريخ الدفع لا يمكن أن يكون بعد تاريخ التسجيل"
+    elif is_period_sealed(posting_date):
+        batch_error = "لا يمكن التسجيل أو الإلغاء في فترة مالية مقفلة"
+
+    if batch_error:
+        for result in results:
+            result["message"] = batch_error
+        return []
+
+    member_ids = {cstr(row.get("member")).strip() for row in rows if row.get("member")}
+    members = set()
+    if member_ids:
+        members = set(frappe.get_all("Member", filters={"name": ["in", list(member_ids)]}, pluck="name"))
+
+    payment_methods = set(frappe.get_meta("Income_Entry").get_field("payment_method").options.split("\n"))
+
+    user = frappe.session.user
+    timestamp = now()
+    entries = []
+
+    for idx, row in enumerate(rows):
+        member = cstr(row.get("member")).strip() or None
+        amount = flt(row.get("amount"))
+        payment_method = cstr(row.get("payment_method")).strip()
+
+        if amount <= 0:
+            errors[idx] = "يجب أن يكون المبلغ أكبر من صفر"
+        elif payment_method not in payment_methods:
+            errors[idx] = _("طريقة الدفع {0} غير صالحة").format(payment_method)
+        elif entry_type == CARD_ENTRY_TYPE and not member:
+            errors[idx] = "يجب تحديد العضو لدفع بطاقة الإنخراط"
+        elif member and member not in members:
+            errors[idx] = _("العضو {0} غير موجود").format(member)
+
+        if idx in errors:
+            results[idx]["message"] = errors[idx]
+            continue
+
+        entries.append({
+            "row": idx,
+            "owner": user,
+            "creation": timestamp,
+            "modified": timestamp,
+            "modified_by": user,
+            "docstatus": 1,
+            "posting_date": posting_date,
+            "academic_year": academic_year,
+            "entry_type": entry_type,
+            "status": "Submitted",
+            "member": member,
+            "member_name": row.get("member_name"),
+            "amount": amount,
+            "currency": currency,
+            "payment_method": payment_method,
+            "reference_number": row.get("reference_number") or row.get("reference"),
+            "payment_date": payment_date,
+            "collected_by": user,
+            "notes": row.get("notes")
+        })
+
+    return entries
+
+def reserve_names(count):
+    """Reserve a contiguous block of `INC-{YYYY}-{#####}` names.
+
+    Uses the same `tabSeries` counter as the Income_Entry autoname, bumped once
+    for the whole block and committed right away so that single-entry saves are
+    not blocked behind the batch.
+    """
+    prefix = f"INC-{getdate(today()).year}-"
+
+    current = frappe.db.sql("SELECT `current` FROM `tabSeries` WHERE `name`=%s FOR UPDATE", (prefix,))
+    if current and current[0][0] is not None:
+        start = current[0][0]
+        frappe.db.sql("UPDATE `tabSeries` SET `current` = `current` + %s WHERE `name`=%s", (count, prefix))
+    else:
+        start = 0
+        frappe.db.sql("INSERT INTO `tabSeries` (`name`, `current`) VALUES (%s, %s)", (prefix, count))
+
+    frappe.db.commit()
+    return [f"{prefix}{seq:05d}" for seq in range(start + 1, start + count + 1)]
+
+def insert_chunk(entries):
+    """Insert a chunk of already-validated, submitted entries in one statement"""
+    frappe.db.bulk_insert(
+        "Income_Entry",
+        fields=INSERT_FIELDS,
+        values=[tuple(entry[field] for field in INSERT_FIELDS) for entry in entries]
+    )
+
+def update_membership_cards(members, cancel=False):
+    """Set the payment status of each member's current active card in bulk.
+
+    Equivalent to IncomeEntry.update_membership_card followed by
+    MembershipCard.on_update for every member, in a fixed number of queries.
+    """
+    if not members:
+        return
+
+    cards = frappe.db.sql("""
+        SELECT c.name, c.card_number
+        FROM `tabMember` m
+        INNER JOIN `tabMembership_Card` c ON c.name = m.current_card
+        WHERE m.name IN %(members)s
+        AND c.status = 'Active'
+    """, {"members": tuple(set(members))}, as_dict=1)
+
+    if not cards:
+        return
+
+    card_names = tuple(card.name for card in cards)
+    payment_status = "غير المؤداة" if cancel else PAID_STATUS
+    # Member rows are bumped too: incremental snapshots select them by `modified`
+    values = {
+        "payment_status": payment_status,
+        "modified": now(),
+        "user": frappe.session.user,
+        "cards": card_names
+    }
+    frappe.db.sql("""
+        UPDATE `tabMembership_Card`
+        SET payment_status = %(payment_status)s, modified = %(modified)s, modified_by = %(user)s
+        WHERE name IN %(cards)s
+    """, values)
+    frappe.db.sql("""
+        UPDATE `tabMember`
+        SET card_payment_status = %(payment_status)s, modified = %(modified)s, modified_by = %(user)s
+        WHERE current_card IN %(cards)s
+    """, values)
+
+    for card in cards:
+        if card.card_number:
+            frappe.cache().hdel(VERIFY_CACHE_KEY, card.card_number)
+
+    if not cancel:
+        frappe.db.sql("""
+            UPDATE `tabMember` m
+            JOIN `tabMembership_Card` c ON c.member = m.name
+            SET m.last_renewal_date = c.issue_date, m.modified = %(modified)s, m.modified_by = %(user)s
+            WHERE c.name IN %(cards)s
+        """, values)
@@ -0,0 +1,76 @@
+import gzip
+import json
+import os
+
+import frappe
+from frappe.utils import get_bench_path
+
+# Front-end bundles. Every `*.bundle.js` / `*.bundle.css` under umt/public is an
+# esbuild entry: `umt.bundle.*` is the core shared by the UMT web pages and each
+# page has its own `umt_<page>.bundle.js`, loaded with `bundled_asset` by that
+# page only. Production builds are content hashed (`umt.bundle.<hash>.js`), so
+# /assets can be served with a long-lived immutable Cache-Control.
+
+ASSETS_MANIFESTS = ["assets.json", "assets-rtl.json"]
+REPORT_FILE = "bundle-report.json"
+
+# Gzipped size above which a bundle is flagged in the report
+DEFAULT_BUDGET_KB = 50
+
+def build(mode="production"):
+    """Build the app's bundles and write the size report"""
+    from frappe.build import bundle
+
+    bundle(mode, apps="umt")
+    return write_bundle_report()
+
+def get_bundles():
+    """Map of bundle name to built file for the app's bundles, from the asset manifests"""
+    sites_path = os.path.join(get_bench_path(), "sites")
+    bundles = {}
+
+    for manifest in ASSETS_MANIFESTS:
+        path = os.path.join(sites_path, "assets", manifest)
+        if not os.path.exists(path):
+            continue
+
+        with open(path) as f:
+            for name, url in json.load(f).items():
+                if url.startswith("/assets/umt/"):
+                    key = f"{name} (rtl)" if manifest == "assets-rtl.json" else name
+                    bundles[key] = os.path.join(sites_path, url.lstrip("/"))
+
+    return bundles
+
+def get_bundle_report(budget_kb=None):
+    budget_kb = budget_kb or frappe.conf.get("umt_bundle_budget_kb") or DEFAULT_BUDGET_KB
+    report = []
+
+    for name, path in sorted(get_bundles().items()):
+        if not os.path.exists(path):
+            continue
+
+        with open(path, "rb") as f:
+            content = f.read()
+
+        gzip_size = len(gzip.compress(content))
+        report.append({
+            "bundle": name,
+            "file": os.path.basename(path),
+            "size": len(content),
+            "gzip_size": gzip_size,
+            "over_budget": gzip_size > budget_kb * 1024
+        })
+
+    return report
+
+def write_bundle_report(budget_kb=None):
+    """Write the size report next to the built files and return it"""
+    report = get_bundle_report(budget_kb)
+    path = os.path.join(get_bench_path(), "sites", "assets", "umt", "dist", REPORT_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, "w") as f:
+        json.dump(report, f, indent=1)
+
+    return report
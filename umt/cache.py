@@ -0,0 +1,178 @@
+import frappe
+from frappe.utils import cstr
+from functools import wraps
+import hashlib
+import json
+import pickle
+import zlib
+from umt.permissions import get_user_roles
+
+VERSION_KEY = "umt_version:{0}"
+REPORT_KEY = "umt_report:{0}:{1}"
+REFRESH_LOCK_KEY = "umt_report_refresh:{0}"
+FRAGMENT_KEY = "umt_fragment:{0}:{1}"
+FRAGMENT_TEMPLATE = "umt/templates/includes/admin/{0}.html"
+
+REPORT_CACHE_TTL = 24 * 60 * 60
+REFRESH_LOCK_TTL = 10 * 60
+FRAGMENT_CACHE_TTL = 6 * 60 * 60
+
+def bump_version(doc, method=None):
+    """Document event hook: invalidate cached results built from this doctype.
+
+    The version moves once the change is committed: bumped any earlier, a
+    concurrent reader could rebuild from the old rows and store the result
+    under the new version, where it would stay for the whole TTL.
+    """
+    after_commit(bump_doctype_version, doc.doctype)
+
+def after_commit(method, *args):
+    """Run `method(*args)` after the current transaction commits, dropped on rollback"""
+    frappe.db.after_commit.add(lambda: method(*args))
+
+def bump_doctype_version(*doctypes):
+    """Increment the data version counter of one or more doctypes"""
+    cache = frappe.cache()
+    for doctype in doctypes:
+        cache.incr(cache.make_key(VERSION_KEY.format(doctype)))
+
+def get_versions(doctypes):
+    """Get the current data version counter of each doctype"""
+    cache = frappe.cache()
+    versions = cache.mget([cache.make_key(VERSION_KEY.format(doctype)) for doctype in doctypes])
+    return [int(v or 0) for v in versions]
+
+def normalize_filters(filters):
+    """Build a stable representation of report filters, ignoring empty values"""
+    if isinstance(filters, str):
+        filters = json.loads(filters or "{}")
+
+    return json.dumps(
+        {k: cstr(v) for k, v in (filters or {}).items() if v not in (None, "", [])},
+        sort_keys=True
+    )
+
+def get_report_key(report_name, filters):
+    digest = hashlib.sha1(f"{normalize_filters(filters)}:{frappe.local.lang}".encode()).hexdigest()
+    return frappe.cache().make_key(REPORT_KEY.format(frappe.scrub(report_name), digest))
+
+def cached_report(report_name, depends_on, ttl=REPORT_CACHE_TTL, stale_while_revalidate=None):
+    """Cache a script report `execute` function by report name and filters.
+
+    Results are stored zlib-compressed in redis together with the data versions of
+    `depends_on` at compute time, and are recomputed once any of those versions has
+    moved. With stale-while-revalidate (argument or the
+    `umt_report_cache_stale_while_revalidate` site config), an outdated result is
+    served immediately while a background job recomputes it.
+    """
+    def decorator(execute):
+        method = f"{execute.__module__}.{execute.__name__}"
+
+        @wraps(execute)
+        def wrapper(filters=None):
+            if frappe.conf.get("umt_disable_report_cache"):
+                return execute(filters)
+
+            key = get_report_key(report_name, filters)
+            versions = get_versions(depends_on)
+            entry = load_entry(key)
+
+            if entry and entry["versions"] == versions:
+                return entry["result"]
+
+            swr = stale_while_revalidate
+            if swr is None:
+                swr = frappe.conf.get("umt_report_cache_stale_while_revalidate")
+
+            if entry and swr:
+                enqueue_refresh(method, key, filters)
+                return entry["result"]
+
+            result = execute(filters)
+            store_entry(key, versions, result, ttl)
+            return result
+
+        wrapper.report_cache = {"depends_on": depends_on, "ttl": ttl}
+        return wrapper
+
+    return decorator
+
+def load_entry(key):
+    data = frappe.cache().get(key)
+    if not data:
+        return None
+
+    try:
+        return pickle.loads(zlib.decompress(data))
+    except Exception:
+        return None
+
+def store_entry(key, versions, result, ttl):
+    data = zlib.compress(pickle.dumps({"versions": versions, "result": result}, protocol=pickle.HIGHEST_PROTOCOL))
+    frappe.cache().set(key, data, ex=ttl)
+
+def enqueue_refresh(method, key, filters):
+    """Queue a single background recomputation per cache entry"""
+    cache = frappe.cache()
+    if not cache.set(cache.make_key(REFRESH_LOCK_KEY.format(key)), 1, nx=True, ex=REFRESH_LOCK_TTL):
+        return
+
+    frappe.enqueue(
+        "umt.cache.refresh_report",
+        queue="short",
+        method=method,
+        key=key,
+        filters=filters,
+        lang=frappe.local.lang
+    )
+
+def refresh_report(method, key, filters, lang=None):
+    """Background job: recompute a cached report result"""
+    if lang:
+        frappe.local.lang = lang
+
+    execute = frappe.get_attr(method)
+    cache_options = execute.report_cache
+
+    try:
+        versions = get_versions(cache_options["depends_on"])
+        store_entry(key, versions, execute.__wrapped__(filters), cache_options["ttl"])
+    finally:
+        cache = frappe.cache()
+        cache.delete(cache.make_key(REFRESH_LOCK_KEY.format(key)))
+
+def get_fragment_key(name, depends_on, vary=None):
+    """Key of a page fragment for the current role set, language and data versions"""
+    parts = [
+        ",".join(sorted(get_user_roles())),
+        frappe.local.lang,
+        ",".join(str(v) for v in get_versions(depends_on)),
+        cstr(vary)
+    ]
+    digest = hashlib.sha1("|".join(parts).encode()).hexdigest()
+    return frappe.cache().make_key(FRAGMENT_KEY.format(name, digest))
+
+def render_fragment(name, get_context, depends_on, vary=None, template=None, ttl=FRAGMENT_CACHE_TTL):
+    """Render a page section, or return it from the fragment cache.
+
+    The section is rendered with `template`, by default the fragment's file
+    under templates/includes/admin.
+    `get_context` is only called on a miss, so a hit skips both the queries and
+    the Jinja rendering. The key carries the data versions of `depends_on`: the
+    bump_version doc hooks of those doctypes make the next view render a new
+    fragment, and outdated ones expire with `ttl`. `vary` adds anything else
+    the section depends on, such as the current date.
+    """
+    template = template or FRAGMENT_TEMPLATE.format(name)
+    if frappe.conf.get("umt_disable_fragment_cache"):
+        return frappe.render_template(template, get_context())
+
+    cache = frappe.cache()
+    key = get_fragment_key(name, depends_on, vary)
+    html = cache.get(key)
+    if html is not None:
+        return frappe.safe_decode(html)
+
+    html = frappe.render_template(template, get_context())
+    cache.set(key, html, ex=ttl)
+    return html
@@ -0,0 +1,280 @@
+import frappe
+from frappe import _
+from frappe.utils import cint, flt, now_datetime
+from concurrent.futures import ProcessPoolExecutor
+import base64
+import glob
+import io
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+
+from umt.query import Conditions, equals, date_range
+
+# Bulk membership card printing. The selected cards are cut into chunks and
+# each chunk is rendered to one PDF (one page per card) in a separate worker
+# process; workers load the card template and fonts once, when they start.
+# Each card has a QR code of its signed verification link.
+# Chunks are then merged into a single PDF or split into one PDF per card and
+# zipped. Jobs run on the long queue and report progress like backups do.
+
+CARD_TEMPLATE = "umt/templates/cards/membership_cards.html"
+FONT_DIR = ("public", "fonts")
+PAID_STATUS = "المؤداة"
+
+CHUNK_SIZE = 200
+EXPORT_TIMEOUT = 3600
+EXPORT_STATUS_KEY = "umt_card_export:{0}"
+PROGRESS_EVENT = "umt_card_export_progress"
+OUTPUT_FORMATS = ("pdf", "zip")
+
+PDF_OPTIONS = {
+    "page-width": "85.6mm",
+    "page-height": "54mm",
+    "margin-top": "0mm",
+    "margin-bottom": "0mm",
+    "margin-left": "0mm",
+    "margin-right": "0mm",
+    "disable-smart-shrinking": "",
+    "encoding": "UTF-8"
+}
+
+def start_card_export(filters=None, output_format="pdf"):
+    """Queue a card export job and return its id"""
+    filters = frappe._dict(frappe.parse_json(filters) if isinstance(filters, str) else (filters or {}))
+    if output_format not in OUTPUT_FORMATS:
+        frappe.throw(_("صيغة التصدير غير صالحة"))
+
+    if not get_cards(filters, count_only=True):
+        frappe.throw(_("لا توجد بطاقات مطابقة لمعايير التصفية"))
+
+    export_id = frappe.generate_hash(length=10)
+    set_status(export_id, "Queued", 0, _("تصدير البطاقات في قائمة الانتظار"))
+    frappe.enqueue(
+        "umt.cards.run_card_export",
+        queue="long",
+        timeout=EXPORT_TIMEOUT,
+        export_id=export_id,
+        filters=filters,
+        output_format=output_format,
+        user=frappe.session.user
+    )
+    return export_id
+
+def run_card_export(export_id, filters=None, output_format="pdf", user=None, workers=None, chunk_size=None):
+    """Background job: render the filtered cards and attach the result as a private file.
+
+    `export_id` is the id returned by start_card_export; `job_id` is reserved by
+    frappe.enqueue for the RQ job itself.
+    """
+    user = user or frappe.session.user
+    try:
+        set_status(export_id, "Running", 0, _("جاري إعداد البطاقات"), user)
+        cards = get_cards(filters)
+        result = render_cards(cards, output_format, workers, chunk_size,
+            lambda progress: set_status(export_id, "Running", progress, _("جاري طباعة البطاقات"), user))
+
+        file_doc = save_output(result.pop("path"), output_format)
+        frappe.db.commit()
+        set_status(export_id, "Completed", 100, _("تم تصدير {0} بطاقة").format(result["cards"]), user,
+            file_url=file_doc.file_url, **result)
+        return result
+    except Exception:
+        frappe.db.rollback()
+        frappe.log_error(frappe.get_traceback(), _("خطأ في تصدير البطاقات"))
+        set_status(export_id, "Failed", 0, _("فشل تصدير البطاقات"), user)
+
+def get_cards(filters=None, count_only=False):
+    """Cards matching the province, academic year and payment status filters.
+
+    A card belongs to an academic year when it was issued during that year.
+    Only active cards are printed unless a `status` filter is given.
+    """
+    filters = frappe._dict(filters or {})
+    conditions = Conditions()
+    equals(conditions, "c.status", filters.get("status") or "Active")
+    equals(conditions, "c.payment_status", filters.get("payment_status"))
+    equals(conditions, "m.province", filters.get("province"))
+
+    if filters.get("academic_year"):
+        year = frappe.db.get_value("Academic Year", filters.academic_year, ["start_date", "end_date"], as_dict=1)
+        if not year:
+            frappe.throw(_("السنة الدراسية غير موجودة"))
+        date_range(conditions, year.start_date, year.end_date, "c.issue_date")
+
+    if count_only:
+        return frappe.db.sql("""
+            SELECT COUNT(*) FROM `tabMembership_Card` c
+            INNER JOIN `tabMember` m ON m.name = c.member
+            WHERE {conditions}
+        """.format(conditions=conditions.sql()), conditions.values)[0][0]
+
+    return frappe.db.sql("""
+        SELECT c.name, c.member, c.member_name, c.card_number, c.issue_date, c.expiry_date,
+            c.payment_status, m.full_name, m.province, m.institution
+        FROM `tabMembership_Card` c
+        INNER JOIN `tabMember` m ON m.name = c.member
+        WHERE {conditions}
+        ORDER BY m.province, c.card_number
+    """.format(conditions=conditions.sql()), conditions.values, as_dict=1)
+
+def get_workers():
+    return cint(frappe.conf.get("umt_card_workers")) or os.cpu_count() or 1
+
+def get_chunk_size():
+    return cint(frappe.conf.get("umt_card_chunk_size")) or CHUNK_SIZE
+
+def render_cards(cards, output_format="pdf", workers=None, chunk_size=None, on_progress=None):
+    """Render `cards` on a process pool and return the output path with throughput metrics"""
+    workers = cint(workers) or get_workers()
+    chunk_size = cint(chunk_size) or get_chunk_size()
+    chunks = [cards[i:i + chunk_size] for i in range(0, len(cards), chunk_size)]
+    workdir = tempfile.mkdtemp(prefix="umt-cards-")
+    start = time.monotonic()
+
+    try:
+        # spawn, not fork: the job's database and redis connections must not be shared
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)) or 1, mp_context=context,
+                initializer=init_worker, initargs=(frappe.local.site, frappe.local.sites_path,
+                    frappe.local.lang)) as pool:
+            futures = [
+                pool.submit(render_chunk, idx, [dict(card) for card in chunk], workdir, output_format == "zip")
+                for idx, chunk in enumerate(chunks)
+            ]
+            chunk_paths = []
+            for done, future in enumerate(futures, 1):
+                chunk_paths.append(future.result())
+                if on_progress:
+                    on_progress(cint(done * 95 / len(futures)))
+
+        render_seconds = time.monotonic() - start
+        path = (merge_pdfs if output_format == "pdf" else zip_pdfs)(chunk_paths, workdir)
+        duration = time.monotonic() - start
+    except Exception:
+        shutil.rmtree(workdir, ignore_errors=True)
+        raise
+
+    return {
+        "path": path,
+        "cards": len(cards),
+        "chunks": len(chunks),
+        "workers": workers,
+        "render_seconds": flt(render_seconds, 2),
+        "duration": flt(duration, 2),
+        "cards_per_second": flt(len(cards) / duration, 1) if duration else 0
+    }
+
+# Per worker process state, set up once by init_worker
+_worker = {}
+
+def init_worker(site, sites_path, lang=None):
+    """Connect the worker to the site and load the card template and fonts once"""
+    frappe.init(site=site, sites_path=sites_path)
+    frappe.connect()
+    if lang:
+        frappe.local.lang = lang
+
+    from frappe.utils.jinja import get_jenv
+    _worker.update(
+        template=get_jenv().get_template(CARD_TEMPLATE),
+        context={
+            "font_css": get_font_css(),
+            "organization_name": frappe.defaults.get_global_default("company_name"),
+            "paid_status": PAID_STATUS
+        }
+    )
+
+def get_font_css():
+    """@font-face rules embedding the fonts shipped in public/fonts"""
+    rules = []
+    for path in sorted(glob.glob(os.path.join(frappe.get_app_path("umt", *FONT_DIR), "*.ttf"))):
+        with open(path, "rb") as f:
+            data = base64.b64encode(f.read()).decode()
+        weight = "bold" if "bold" in os.path.basename(path).lower() else "normal"
+        rules.append('@font-face {{ font-family: "UMT Card"; font-weight: {0}; '
+            'src: url(data:font/ttf;base64,{1}) format("truetype"); }}'.format(weight, data))
+    return "\n".join(rules)
+
+def render_chunk(idx, cards, workdir, split=False):
+    """Render a chunk of cards to one PDF, or to one PDF per card when `split`"""
+    from frappe.utils.pdf import get_pdf
+    from umt.verification import get_card_qr
+
+    for card in cards:
+        card["qr"] = get_card_qr(card["card_number"]) if card["card_number"] else None
+
+    html = _worker["template"].render(dict(_worker["context"], cards=cards))
+    pdf = get_pdf(html, dict(PDF_OPTIONS))
+
+    if not split:
+        path = os.path.join(workdir, f"chunk-{idx:05d}.pdf")
+        with open(path, "wb") as f:
+            f.write(pdf)
+        return path
+
+    from pypdf import PdfReader, PdfWriter
+
+    reader = PdfReader(io.BytesIO(pdf))
+    paths = []
+    for card, page in zip(cards, reader.pages):
+        writer = PdfWriter()
+        writer.add_page(page)
+        path = os.path.join(workdir, f"{frappe.scrub(card['card_number'] or card['name'])}.pdf")
+        with open(path, "wb") as f:
+            writer.write(f)
+        paths.append(path)
+    return paths
+
+def merge_pdfs(chunk_paths, workdir):
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for path in chunk_paths:
+        writer.append(path)
+
+    path = os.path.join(workdir, "cards.pdf")
+    with open(path, "wb") as f:
+        writer.write(f)
+    writer.close()
+    return path
+
+def zip_pdfs(chunk_paths, workdir):
+    # PDFs are already compressed, storing them is as small and much faster
+    path = os.path.join(workdir, "cards.zip")
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as archive:
+        for paths in chunk_paths:
+            for card_path in paths:
+                archive.write(card_path, os.path.basename(card_path))
+    return path
+
+def save_output(path, output_format):
+    """Move the output into private files and register it as a File"""
+    file_name = f"membership-cards-{now_datetime():%Y%m%d-%H%M%S}-{frappe.generate_hash(length=6)}.{output_format}"
+    target = frappe.get_site_path("private", "files", file_name)
+    shutil.move(path, target)
+    shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+
+    return frappe.get_doc({
+        "doctype": "File",
+        "file_name": file_name,
+        "file_url": f"/private/files/{file_name}",
+        "is_private": 1
+    }).insert(ignore_permissions=True)
+
+def set_status(job_id, status, progress, message=None, user=None, **extra):
+    """Store the job status for polling and push it to the user's browser"""
+    data = {"job_id": job_id, "status": status, "progress": progress, "message": message, **extra}
+    cache = frappe.cache()
+    cache.set(cache.make_key(EXPORT_STATUS_KEY.format(job_id)), frappe.as_json(data), ex=EXPORT_TIMEOUT)
+
+    if user:
+        frappe.publish_realtime(PROGRESS_EVENT, data, user=user)
+
+def get_status(job_id):
+    cache = frappe.cache()
+    status = cache.get(cache.make_key(EXPORT_STATUS_KEY.format(job_id)))
+    return frappe.parse_json(status) if status else None
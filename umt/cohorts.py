@@ -0,0 +1,180 @@
+import frappe
+from frappe import _
+from frappe.utils import cint
+import numpy as np
+
+from umt.cache import load_entry, store_entry, after_commit, REPORT_CACHE_TTL
+
+# Renewal cohorts: members are grouped by the academic year of their first paid
+# card (their join year) and followed through the years in which they hold a
+# paid card again. Cards are read in keyset-paged chunks and the cohort matrices
+# are built with NumPy, for all provinces at once.
+#
+# Results are cached per academic year. Every academic year has its own data
+# version, bumped when a card issued during it changes, and the matrices up to
+# a year only depend on the versions of that year and the ones before it, so
+# closed years stay cached while the current year's cards are being issued.
+# Bulk updates and academic year changes bump the version shared by all years,
+# and a member moving to another province shows in the cohorts when their
+# years are next rebuilt.
+
+PAID_STATUS = "المؤداة"
+CHUNK_SIZE = 100000
+
+COHORT_KEY = "umt_cohorts:{0}"
+COHORT_VERSION_KEY = "umt_cohort_version:{0}"
+ALL_YEARS = "all"
+ALL_PROVINCES = None
+
+def get_academic_years(up_to):
+    """Academic years from the first one to `up_to`, in order"""
+    end = frappe.db.get_value("Academic Year", up_to, "start_date")
+    if not end:
+        frappe.throw(_("السنة الدراسية غير موجودة"))
+
+    return frappe.db.sql("""
+        SELECT name, start_date, end_date
+        FROM `tabAcademic Year`
+        WHERE start_date <= %s
+        ORDER BY start_date
+    """, (end,), as_dict=1)
+
+def get_year_of(date):
+    if date:
+        return frappe.db.get_value("Academic Year",
+            {"start_date": ["<=", date], "end_date": [">=", date]}, "name")
+
+def bump_cohort_versions(*dates):
+    """Invalidate the cohorts of the academic years containing `dates`, or of all years"""
+    cache = frappe.cache()
+    years = {get_year_of(date) for date in dates} if dates else {ALL_YEARS}
+    for year in filter(None, years):
+        cache.incr(cache.make_key(COHORT_VERSION_KEY.format(year)))
+
+def on_card_change(doc, method=None):
+    """Membership_Card hook: invalidate the cohorts of the card's academic year"""
+    previous = doc.get_doc_before_save() if method != "on_trash" else None
+    after_commit(bump_cohort_versions, *{doc.issue_date, previous.issue_date if previous else None} - {None})
+
+def on_academic_year_change(doc, method=None):
+    """Academic Year hook: new year bounds change which year every card falls in"""
+    after_commit(bump_cohort_versions)
+
+def get_cohort_versions(years):
+    cache = frappe.cache()
+    keys = [COHORT_VERSION_KEY.format(year) for year in [ALL_YEARS] + years]
+    return [int(v or 0) for v in cache.mget([cache.make_key(key) for key in keys])]
+
+def get_cohorts(academic_year):
+    """Cohort matrices up to `academic_year`, from the cache when still current"""
+    years = get_academic_years(academic_year)
+    year_names = [year.name for year in years]
+    versions = get_cohort_versions(year_names)
+    key = frappe.cache().make_key(COHORT_KEY.format(academic_year))
+
+    entry = None if frappe.conf.get("umt_disable_report_cache") else load_entry(key)
+    if entry and entry["versions"] == versions:
+        return entry["result"]
+
+    result = build_cohorts(years)
+    store_entry(key, versions, result, REPORT_CACHE_TTL)
+    return result
+
+def iter_card_chunks(end_date, chunk_size=CHUNK_SIZE):
+    """(member, province, issue_date) of paid cards issued by `end_date`, in chunks"""
+    last_name = ""
+    while True:
+        rows = frappe.db.sql("""
+            SELECT c.name, c.member, m.province, c.issue_date
+            FROM `tabMembership_Card` c
+            INNER JOIN `tabMember` m ON m.name = c.member
+            WHERE c.name > %(last_name)s
+            AND c.payment_status = %(paid)s
+            AND c.issue_date <= %(end_date)s
+            ORDER BY c.name
+            LIMIT {limit}
+        """.format(limit=cint(chunk_size)), {"last_name": last_name, "paid": PAID_STATUS, "end_date": end_date})
+
+        if not rows:
+            break
+
+        names, members, provinces, issue_dates = zip(*rows)
+        yield members, provinces, issue_dates
+        last_name = names[-1]
+
+def build_cohorts(years, chunk_size=CHUNK_SIZE):
+    """Cohort counts and churn per province for the given academic years.
+
+    Returns a dict with the year names, the provinces and, per province (and
+    ALL_PROVINCES for all of them together):
+        cohorts[j, y]  members who joined in year j and hold a card in year y
+        held[y]        members holding a card in year y
+        churned[y]     members who held a card in year y - 1 but not in year y
+    """
+    n_years = len(years)
+    starts = np.array([year.start_date for year in years], dtype="datetime64[D]")
+    ends = np.array([year.end_date for year in years], dtype="datetime64[D]")
+
+    members, provinces, year_idx = [], [], []
+    for chunk_members, chunk_provinces, issue_dates in iter_card_chunks(years[-1].end_date, chunk_size):
+        dates = np.array(issue_dates, dtype="datetime64[D]")
+        idx = np.searchsorted(starts, dates, side="right") - 1
+        in_year = (idx >= 0) & (dates <= ends[np.clip(idx, 0, None)])
+
+        members.append(np.array(chunk_members, dtype=object)[in_year])
+        provinces.append(np.array([p or "" for p in chunk_provinces], dtype=object)[in_year])
+        year_idx.append(idx[in_year])
+
+    result = {"years": [year.name for year in years], "provinces": [], "matrices": {}}
+    if not members or not sum(len(chunk) for chunk in members):
+        return result
+
+    members = np.concatenate(members)
+    provinces = np.concatenate(provinces)
+    year_idx = np.concatenate(year_idx)
+
+    # Member x year presence; a member's province is the one on their cards
+    member_names, member_idx = np.unique(members, return_inverse=True)
+    held = np.zeros((len(member_names), n_years), dtype=bool)
+    held[member_idx, year_idx] = True
+    member_provinces = np.empty(len(member_names), dtype=object)
+    member_provinces[member_idx] = provinces
+
+    province_names, province_idx = np.unique(member_provinces, return_inverse=True)
+    n_provinces = len(province_names)
+    join_year = held.argmax(axis=1)
+    churned = np.zeros_like(held)
+    churned[:, 1:] = held[:, :-1] & ~held[:, 1:]
+
+    # bincount over (province, join year) per year: one pass per year, no loops over members
+    cohort_key = province_idx * n_years + join_year
+    cohorts = np.stack([
+        np.bincount(cohort_key, weights=held[:, y], minlength=n_provinces * n_years)
+        for y in range(n_years)
+    ], axis=1).reshape(n_provinces, n_years, n_years).astype(np.int64)
+
+    held_counts = np.stack([np.bincount(province_idx, weights=held[:, y], minlength=n_provinces)
+        for y in range(n_years)], axis=1).astype(np.int64)
+    churned_counts = np.stack([np.bincount(province_idx, weights=churned[:, y], minlength=n_provinces)
+        for y in range(n_years)], axis=1).astype(np.int64)
+
+    result["provinces"] = [name for name in province_names if name]
+    for idx, name in enumerate(province_names):
+        result["matrices"][name] = get_matrices(cohorts[idx], held_counts[idx], churned_counts[idx])
+    result["matrices"][ALL_PROVINCES] = get_matrices(cohorts.sum(axis=0), held_counts.sum(axis=0), churned_counts.sum(axis=0))
+    return result
+
+def get_matrices(cohorts, held, churned):
+    return {"cohorts": cohorts, "held": held, "churned": churned}
+
+def get_rates(matrices):
+    """Retention of each cohort and the renewal and churn rates of each year, in percent"""
+    cohorts = matrices["cohorts"].astype(float)
+    sizes = np.diag(cohorts)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        retention = np.where(sizes[:, None] > 0, cohorts * 100 / sizes[:, None], np.nan)
+        previous = np.concatenate([[0], matrices["held"][:-1]]).astype(float)
+        churn = np.where(previous > 0, matrices["churned"] * 100 / previous, np.nan)
+
+    retention[np.tril_indices(len(sizes), -1)] = np.nan
+    return {"retention": retention, "churn": churn, "renewal": 100 - churn}
@@ -0,0 +1,146 @@
+import click
+import frappe
+from frappe.commands import pass_context, get_site
+
+@click.command("umt-rebuild-member-index")
+@pass_context
+def rebuild_member_index(context):
+    """Rebuild the member search tokens, link autocomplete sets and duplicate blocking keys"""
+    from umt.search import rebuild_search_index, rebuild_autocomplete_index
+    from umt.dedup import rebuild_block_keys
+
+    site = get_site(context)
+    frappe.init(site=site)
+    frappe.connect()
+
+    try:
+        rebuild_search_index()
+        rebuild_autocomplete_index()
+        rebuild_block_keys()
+        click.echo("Member search, autocomplete and blocking indexes rebuilt")
+    finally:
+        frappe.destroy()
+
+@click.command("umt-take-snapshot")
+@click.option("--full", is_flag=True, default=False, help="Start a new chain with a full snapshot")
+@pass_context
+def take_snapshot(context, full=False):
+    """Export UMT rows changed since the last snapshot"""
+    from umt.snapshots import take_snapshot
+
+    site = get_site(context)
+    frappe.init(site=site)
+    frappe.connect()
+
+    try:
+        name = take_snapshot(full=full)
+        snapshot = frappe.db.get_value("Data_Snapshot", name,
+            ["snapshot_type", "row_count", "deleted_count", "file_size", "duration"], as_dict=1)
+        click.echo(f"{name}: {snapshot.snapshot_type}, {snapshot.row_count} rows, "
+            f"{snapshot.deleted_count} deletions, {snapshot.file_size} bytes in {snapshot.duration}s")
+    finally:
+        frappe.destroy()
+
+@click.command("umt-restore-snapshot")
+@click.argument("snapshot", required=False)
+@pass_context
+def restore_snapshot(context, snapshot=None):
+    """Replay a full snapshot and its increments up to SNAPSHOT (defaults to the latest)"""
+    from umt.snapshots import restore_snapshot, get_snapshot_doctypes
+    from umt.cache import bump_doctype_version
+    from umt.search import rebuild_search_index, rebuild_autocomplete_index
+    from umt.dedup import rebuild_block_keys
+
+    site = get_site(context)
+    frappe.init(site=site)
+    frappe.connect()
+
+    try:
+        for name in restore_snapshot(snapshot):
+            click.echo(f"Applied {name}")
+
+        rebuild_search_index()
+        rebuild_autocomplete_index()
+        rebuild_block_keys()
+        bump_doctype_version(*get_snapshot_doctypes())
+        frappe.clear_cache()
+        click.echo("Member indexes rebuilt")
+    finally:
+        frappe.destroy()
+
+@click.command("umt-reconcile-budgets")
+@pass_context
+def reconcile_budgets(context):
+    """Rebuild budget utilization counters from submitted expense entries"""
+    from umt.doctype.budget_line.budget_line import reconcile_budgets
+
+    site = get_site(context)
+    frappe.init(site=site)
+    frappe.connect()
+
+    try:
+        drifted = reconcile_budgets()
+        for line in drifted:
+            click.echo(f"{line['name']}: {line['utilized_amount']} -> {line['ledger_amount']}, "
+                f"{line['entry_count']} -> {line['ledger_count']} entries")
+        click.echo(f"{len(drifted)} budget lines corrected")
+    finally:
+        frappe.destroy()
+
+@click.command("umt-rebuild-ledger")
+@pass_context
+def rebuild_ledger(context):
+    """Rebuild the general ledger and account balances from submitted entries"""
+    from umt.doctype.gl_entry.gl_entry import rebuild_ledger, get_account_balance
+
+    site = get_site(context)
+    frappe.init(site=site)
+    frappe.connect()
+
+    try:
+        rebuild_ledger()
+        click.echo(f"Ledger rebuilt, cash balance {get_account_balance()}")
+    finally:
+        frappe.destroy()
+
+@click.command("umt-build")
+@click.option("--mode", default="production", type=click.Choice(["production", "development"]))
+@click.option("--report-only", is_flag=True, default=False, help="Only report the sizes of the last build")
+def build(mode="production", report_only=False):
+    """Build the UMT front-end bundles and report their sizes"""
+    from umt.bundles import build, write_bundle_report
+
+    report = write_bundle_report() if report_only else build(mode)
+    for row in report:
+        flag = "  over budget" if row["over_budget"] else ""
+        click.echo(f"{row['bundle']:<40} {row['size'] / 1024:>8.1f} KB  {row['gzip_size'] / 1024:>7.1f} KB gzip{flag}")
+
+@click.command("umt-backfill-current-cards")
+@click.option("--batch-size", default=5000, type=int, help="Members updated per query")
+@pass_context
+def backfill_current_cards(context, batch_size=5000):
+    """Set the current card, card expiry and card payment status of every member"""
+    from umt.doctype.membership_card.membership_card import backfill_current_cards
+    from umt.cache import bump_doctype_version
+
+    site = get_site(context)
+    frappe.init(site=site)
+    frappe.connect()
+
+    try:
+        updated = backfill_current_cards(batch_size)
+        frappe.db.commit()
+        bump_doctype_version("Member")
+        click.echo(f"Current card set for {updated} members")
+    finally:
+        frappe.destroy()
+
+commands = [
+    rebuild_member_index,
+    take_snapshot,
+    restore_snapshot,
+    reconcile_budgets,
+    rebuild_ledger,
+    build,
+    backfill_current_cards
+]
@@ -0,0 +1,270 @@
+import frappe
+from frappe import _
+from frappe.utils import cint, cstr, flt
+from multiprocessing import Pool
+import numpy as np
+import zlib
+
+from umt.search import normalize_arabic, normalize_phone
+
+VECTOR_DIM = 512
+PHONE_SUFFIX_LENGTH = 6
+
+# Pairs scoring above REVIEW_THRESHOLD go to the merge queue, inserts scoring
+# above BLOCK_THRESHOLD are refused unless flagged with `ignore_duplicates`
+REVIEW_THRESHOLD = 0.8
+BLOCK_THRESHOLD = 0.95
+
+BIRTH_DATE_BONUS = 0.1
+PHONE_BONUS = 0.1
+
+# Known birth dates or phones that differ point to two people with the same
+# name: either one keeps a pair below BLOCK_THRESHOLD, both below REVIEW_THRESHOLD
+BIRTH_DATE_PENALTY = 0.15
+PHONE_PENALTY = 0.1
+
+MAX_CANDIDATES = 200
+MAX_BLOCK_SIZE = 2000
+
+def get_name_key(name):
+    """Normalized name without the article, words sorted so word order does not matter"""
+    words = []
+    for word in normalize_arabic(name).split():
+        if word.startswith("ال") and len(word) > 3:
+            word = word[2:]
+        words.append(word)
+    return " ".join(sorted(words))
+
+def get_block_keys(doc):
+    """Get the blocking keys of a member.
+
+    Two members are only ever compared when they share one of these keys: the
+    name key, the 3-letter stems of the name words with the birth date, or the
+    phone suffix.
+    """
+    keys = set()
+    name_key = get_name_key(doc.get("full_name"))
+
+    if name_key:
+        keys.add(f"n:{name_key}")
+        stems = " ".join(word[:3] for word in name_key.split())
+        if doc.get("birth_date"):
+            keys.add(f"b:{doc.get('birth_date')}:{stems}")
+        keys.add(f"s:{stems}")
+
+    phone = normalize_phone(doc.get("phone"))
+    if len(phone) >= PHONE_SUFFIX_LENGTH:
+        keys.add(f"p:{phone[-PHONE_SUFFIX_LENGTH:]}")
+
+    return [key[:140] for key in keys]
+
+def update_block_keys(doc, method=None):
+    """Member hook: refresh the blocking keys of a member"""
+    if not any(doc.has_value_changed(field) for field in ("full_name", "birth_date", "phone")):
+        return
+
+    frappe.db.delete("Member_Block_Key", {"member": doc.name})
+    insert_block_keys({doc.name: get_block_keys(doc)})
+
+def remove_block_keys(doc, method=None):
+    """Member hook: drop blocking keys and queued pairs of a deleted member"""
+    frappe.db.delete("Member_Block_Key", {"member": doc.name})
+    frappe.db.delete("Member_Duplicate", {"member": doc.name})
+    frappe.db.delete("Member_Duplicate", {"duplicate_of": doc.name})
+
+def insert_block_keys(member_keys):
+    values = [
+        (frappe.generate_hash(length=12), member, key)
+        for member, keys in member_keys.items()
+        for key in keys
+    ]
+    if values:
+        frappe.db.bulk_insert("Member_Block_Key", fields=["name", "member", "block_key"], values=values)
+
+def rebuild_block_keys(batch_size=5000):
+    """Rebuild the blocking index for all members"""
+    frappe.db.sql("TRUNCATE `tabMember_Block_Key`")
+
+    last_name = ""
+    while True:
+        members = frappe.db.sql("""
+            SELECT name, full_name, birth_date, phone
+            FROM `tabMember`
+            WHERE name > %s
+            ORDER BY name
+            LIMIT %s
+        """, (last_name, batch_size), as_dict=1)
+
+        if not members:
+            break
+
+        insert_block_keys({member.name: get_block_keys(member) for member in members})
+        frappe.db.commit()
+        last_name = members[-1].name
+
+def vectorize(names):
+    """Hash character trigrams of each name into L2-normalized count vectors"""
+    matrix = np.zeros((len(names), VECTOR_DIM), dtype=np.float32)
+
+    for row, name in enumerate(names):
+        padded = f"  {name} "
+        for idx in range(len(padded) - 2):
+            matrix[row, zlib.crc32(padded[idx:idx + 3].encode()) % VECTOR_DIM] += 1
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+def score_matrix(left, right):
+    """Score every record of `left` against every record of `right`.
+
+    Records are (name_key, birth_date, phone_suffix) tuples. The score is the
+    cosine similarity of the name trigram vectors, raised when the birth date or
+    the phone suffix also match and lowered when both records have one and they
+    differ.
+    """
+    left_names, left_births, left_phones = (np.array(column, dtype=object) for column in zip(*left))
+    right_names, right_births, right_phones = (np.array(column, dtype=object) for column in zip(*right))
+
+    scores = vectorize(left_names) @ vectorize(right_names).T
+    penalties = np.zeros_like(scores)
+    for values, other, bonus, penalty in (
+            (left_births, right_births, BIRTH_DATE_BONUS, BIRTH_DATE_PENALTY),
+            (left_phones, right_phones, PHONE_BONUS, PHONE_PENALTY)):
+        known = (values[:, None] != "") & (other[None, :] != "")
+        same = values[:, None] == other[None, :]
+        scores += bonus * (known & same)
+        penalties += penalty * (known & ~same)
+
+    # Penalties apply after the cap, so a matching field can't make up for a conflicting one
+    return np.maximum(np.minimum(scores, 1.0) - penalties, 0.0)
+
+def get_record(doc):
+    phone = normalize_phone(doc.get("phone"))
+    return (
+        get_name_key(doc.get("full_name")),
+        cstr(doc.get("birth_date")),
+        phone[-PHONE_SUFFIX_LENGTH:] if len(phone) >= PHONE_SUFFIX_LENGTH else ""
+    )
+
+def find_duplicates(doc, threshold=REVIEW_THRESHOLD):
+    """Find likely duplicates of a member through the blocking index.
+
+    Returns (member, score) pairs above `threshold`, best first.
+    """
+    keys = get_block_keys(doc)
+    if not keys:
+        return []
+
+    # Members sharing a selective key (name, birth date, phone) come before those
+    # only sharing the broad name stems, then by the number of keys they share
+    candidates = frappe.db.sql("""
+        SELECT m.name, m.full_name, m.birth_date, m.phone
+        FROM (
+            SELECT member, COUNT(*) as shared_keys, MAX(block_key NOT LIKE 's:%%') as selective
+            FROM `tabMember_Block_Key`
+            WHERE block_key IN %(keys)s
+            AND member != %(name)s
+            GROUP BY member
+            ORDER BY selective DESC, shared_keys DESC
+            LIMIT %(limit)s
+        ) k
+        INNER JOIN `tabMember` m ON m.name = k.member
+    """, {"keys": tuple(keys), "name": doc.name or "", "limit": MAX_CANDIDATES}, as_dict=1)
+
+    if not candidates:
+        return []
+
+    scores = score_matrix([get_record(doc)], [get_record(c) for c in candidates])[0]
+    matches = [(c.name, float(score)) for c, score in zip(candidates, scores) if score >= threshold]
+    return sorted(matches, key=lambda d: d[1], reverse=True)
+
+def check_duplicates(doc, method=None):
+    """Member hook (validate): refuse near-certain duplicates on insert"""
+    if not doc.is_new() or doc.flags.ignore_duplicates:
+        return
+
+    duplicates = find_duplicates(doc)
+    if duplicates and duplicates[0][1] >= BLOCK_THRESHOLD:
+        frappe.throw(_("يوجد عضو مسجل بنفس المعلومات: {0}").format(duplicates[0][0]))
+
+    doc.flags.duplicate_candidates = duplicates
+
+def queue_duplicates(doc, method=None):
+    """Member hook (after_insert): send probable duplicates to the merge queue"""
+    for duplicate_of, score in doc.flags.duplicate_candidates or []:
+        add_to_merge_queue(doc.name, duplicate_of, score, "Inline")
+
+def add_to_merge_queue(member, duplicate_of, score, source):
+    for pair in ((member, duplicate_of), (duplicate_of, member)):
+        if frappe.db.exists("Member_Duplicate", {"member": pair[0], "duplicate_of": pair[1]}):
+            return
+
+    frappe.get_doc({
+        "doctype": "Member_Duplicate",
+        "member": member,
+        "duplicate_of": duplicate_of,
+        "score": flt(score * 100, 2),
+        "status": "Open",
+        "source": source
+    }).insert(ignore_permissions=True)
+
+def score_blocks(blocks, threshold=REVIEW_THRESHOLD):
+    """Pool worker: score all pairs inside each block, return pairs above threshold"""
+    pairs = []
+    for members, records in blocks:
+        scores = score_matrix(records, records)
+        left, right = np.nonzero(np.triu(scores >= threshold, k=1))
+        for i, j in zip(left.tolist(), right.tolist()):
+            pairs.append((members[i], members[j], float(scores[i, j])))
+    return pairs
+
+def scan_duplicates(processes=None, chunk_size=200, threshold=REVIEW_THRESHOLD):
+    """Scan the whole Member table for duplicate pairs and fill the merge queue.
+
+    Members are grouped by blocking key, blocks are scored in parallel across a
+    process pool, and each pair is queued once with its best score. The newer
+    member of a pair is queued as the duplicate of the older one.
+    """
+    records = {
+        m.name: get_record(m)
+        for m in frappe.db.sql("SELECT name, full_name, birth_date, phone FROM `tabMember`", as_dict=1)
+    }
+
+    blocks = []
+    current_key, current_members = None, []
+    for block_key, member in frappe.db.sql("""
+        SELECT block_key, member FROM `tabMember_Block_Key` ORDER BY block_key
+    """):
+        if block_key != current_key:
+            if 1 < len(current_members) <= MAX_BLOCK_SIZE:
+                blocks.append((current_members, [records[m] for m in current_members]))
+            current_key, current_members = block_key, []
+        if member in records:
+            current_members.append(member)
+
+    if 1 < len(current_members) <= MAX_BLOCK_SIZE:
+        blocks.append((current_members, [records[m] for m in current_members]))
+
+    chunks = [blocks[idx:idx + cint(chunk_size)] for idx in range(0, len(blocks), cint(chunk_size))]
+    with Pool(processes=cint(processes) or None) as pool:
+        results = pool.starmap(score_blocks, [(chunk, threshold) for chunk in chunks])
+
+    best = {}
+    for chunk_pairs in results:
+        for left, right, score in chunk_pairs:
+            pair = (max(left, right), min(left, right))
+            best[pair] = max(score, best.get(pair, 0))
+
+    for (member, duplicate_of), score in best.items():
+        add_to_merge_queue(member, duplicate_of, score, "Batch")
+    frappe.db.commit()
+
+    return len(best)
+
+@frappe.whitelist()
+def start_duplicate_scan():
+    """Queue a full-table duplicate scan"""
+    frappe.only_for(["System Manager", "UNEM Manager"])
+    frappe.enqueue("umt.dedup.scan_duplicates", queue="long", timeout=3600)
+    return {"success": True, "message": _("تم إطلاق البحث عن الأعضاء المكررين")}
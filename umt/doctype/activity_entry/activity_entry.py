@@ -0,0 +1,131 @@
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import now, add_days, cint, get_datetime
+
+FIELDS = [
+    "name", "creation", "modified", "owner", "modified_by",
+    "activity_type", "member", "icon", "reference_doctype", "reference_name", "description"
+]
+
+DEFAULT_RETENTION_DAYS = 365
+PRUNE_BATCH_SIZE = 5000
+
+class ActivityEntry(Document):
+    pass
+
+def on_doctype_update():
+    frappe.db.add_index("Activity_Entry", ["member", "creation"])
+    frappe.db.add_index("Activity_Entry", ["creation"])
+
+def add_activity(activity_type, description, member=None, reference_doctype=None,
+        reference_name=None, icon=None):
+    """Append an entry to the activity stream"""
+    add_activities([{
+        "activity_type": activity_type,
+        "description": description,
+        "member": member,
+        "reference_doctype": reference_doctype,
+        "reference_name": reference_name,
+        "icon": icon
+    }])
+
+def add_activities(activities):
+    """Append many entries to the activity stream with a single insert"""
+    if not activities:
+        return
+
+    timestamp = now()
+    user = frappe.session.user
+    values = []
+
+    for activity in activities:
+        row = {
+            "name": frappe.generate_hash(length=12),
+            "creation": timestamp,
+            "modified": timestamp,
+            "owner": user,
+            "modified_by": user,
+            **activity
+        }
+        values.append(tuple(row.get(field) for field in FIELDS))
+
+    frappe.db.bulk_insert("Activity_Entry", fields=FIELDS, values=values)
+
+def get_activities(member=None, cursor=None, limit=20):
+    """Read the activity stream newest first, one page at a time.
+
+    `cursor` is the `next_cursor` of the previous page. Pages are resolved with
+    the (member, creation) or (creation) index instead of an offset scan.
+    """
+    limit = min(cint(limit) or 20, 100)
+    conditions = []
+    values = {"member": member, "limit": limit + 1}
+
+    if member:
+        conditions.append("member = %(member)s")
+
+    if cursor:
+        creation, name = cursor.split("|", 1)
+        values.update({"cursor_creation": get_datetime(creation), "cursor_name": name})
+        conditions.append("""(creation < %(cursor_creation)s
+            OR (creation = %(cursor_creation)s AND name < %(cursor_name)s))""")
+
+    activities = frappe.db.sql("""
+        SELECT name, creation, activity_type, member, icon,
+            reference_doctype, reference_name, description
+        FROM `tabActivity_Entry`
+        {where}
+        ORDER BY creation DESC, name DESC
+        LIMIT %(limit)s
+    """.format(where="WHERE " + " AND ".join(conditions) if conditions else ""), values, as_dict=1)
+
+    next_cursor = None
+    if len(activities) > limit:
+        activities = activities[:limit]
+        last = activities[-1]
+        next_cursor = f"{last.creation}|{last.name}"
+
+    return {"activities": activities, "next_cursor": next_cursor}
+
+def prune_activities(retention_days=None, batch_size=PRUNE_BATCH_SIZE):
+    """Delete activity entries older than the retention period in small batches"""
+    retention_days = cint(retention_days or frappe.conf.get("umt_activity_retention_days") or DEFAULT_RETENTION_DAYS)
+    cutoff = add_days(now(), -retention_days)
+
+    while True:
+        names = frappe.db.sql_list("""
+            SELECT name FROM `tabActivity_Entry`
+            WHERE creation < %s
+            ORDER BY creation
+            LIMIT %s
+        """, (cutoff, batch_size))
+
+        if names:
+            frappe.db.delete("Activity_Entry", {"name": ["in", names]})
+            frappe.db.commit()
+
+        if len(names) < batch_size:
+            break
+
+# Document event hooks
+
+def on_member_insert(doc, method=None):
+    add_activity("Member", _("تسجيل عضو جديد: {0}").format(doc.name),
+        member=doc.name, reference_doctype=doc.doctype, reference_name=doc.name, icon="user")
+
+def on_card_update(doc, method=None):
+    if doc.has_value_changed("status") or doc.has_value_changed("payment_status"):
+        add_activity("Card", _("بطاقة العضوية {0}: {1} - {2}").format(doc.card_number, _(doc.status), doc.payment_status),
+            member=doc.member, reference_doctype=doc.doctype, reference_name=doc.name, icon="id-card")
+
+def on_income_submit(doc, method=None):
+    add_activity("Payment", get_payment_description(doc),
+        member=doc.member, reference_doctype=doc.doctype, reference_name=doc.name, icon="money")
+
+def on_income_cancel(doc, method=None):
+    add_activity("Payment", _("إلغاء: {0}").format(get_payment_description(doc)),
+        member=doc.member, reference_doctype=doc.doctype, reference_name=doc.name, icon="money")
+
+def get_payment_description(doc):
+    return _("{0}: {1} درهم").format(doc.entry_type, doc.amount)
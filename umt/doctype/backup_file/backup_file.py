@@ -0,0 +1,107 @@
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from datetime import datetime
+from umt.cache import bump_doctype_version, after_commit
+import os
+
+# Backup file suffixes written by frappe.utils.backups, per catalog file type
+FILE_TYPES = {
+    "-database.sql.gz": "Database",
+    "-private-files.tar": "Private Files",
+    "-private-files.tgz": "Private Files",
+    "-files.tar": "Public Files",
+    "-files.tgz": "Public Files",
+    "-site_config_backup.json": "Site Config"
+}
+
+class BackupFile(Document):
+    def on_trash(self):
+        """Remove the backup file with its catalog entry"""
+        path = get_backup_path(self.file_name, check_catalog=False)
+        if os.path.exists(path):
+            os.remove(path)
+
+def get_backup_dir():
+    return os.path.realpath(frappe.get_site_path("private", "backups"))
+
+def get_file_type(file_name):
+    for suffix, file_type in FILE_TYPES.items():
+        if file_name.endswith(suffix):
+            return file_type
+
+def get_backup_path(file_name, check_catalog=True):
+    """Resolve a backup file name to its path inside the backup directory.
+
+    Only bare file names of catalogued backups are accepted, so a name such as
+    `../../site_config.json` can never point outside the backup directory.
+    """
+    file_name = file_name or ""
+    backup_dir = get_backup_dir()
+    path = os.path.realpath(os.path.join(backup_dir, file_name))
+
+    if (os.path.basename(file_name) != file_name or file_name.startswith(".")
+            or os.path.dirname(path) != backup_dir):
+        frappe.throw(_("اسم ملف النسخة الاحتياطية غير صالح"))
+
+    if check_catalog and not frappe.db.exists("Backup_File", file_name):
+        frappe.throw(_("ملف النسخة الاحتياطية غير موجود"))
+
+    return path
+
+def register_backup(path, metrics=None):
+    """Add a backup file written to the backup directory to the catalog.
+
+    `metrics` holds the throughput figures recorded by umt.backups for the run.
+    """
+    if not path or not os.path.exists(path):
+        return
+
+    file_name = os.path.basename(path)
+    stat = os.stat(path)
+    values = {
+        "file_type": get_file_type(file_name),
+        "backup_date": datetime.fromtimestamp(stat.st_mtime),
+        "file_size": stat.st_size,
+        **(metrics or {})
+    }
+
+    if frappe.db.exists("Backup_File", file_name):
+        frappe.db.set_value("Backup_File", file_name, values)
+        after_commit(bump_doctype_version, "Backup_File")
+    else:
+        frappe.get_doc({"doctype": "Backup_File", "file_name": file_name, **values}).insert(ignore_permissions=True)
+
+def sync_backup_catalog():
+    """Reconcile the catalog with the backup directory.
+
+    Picks up backups taken outside the settings page (scheduled or `bench
+    backup`) and drops entries whose files were purged by backup rotation.
+    """
+    backup_dir = get_backup_dir()
+    catalogued = set(frappe.get_all("Backup_File", pluck="name"))
+    on_disk = set()
+
+    if os.path.isdir(backup_dir):
+        with os.scandir(backup_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and get_file_type(entry.name):
+                    on_disk.add(entry.name)
+                    if entry.name not in catalogued:
+                        register_backup(entry.path)
+
+    missing = list(catalogued - on_disk)
+    if missing:
+        frappe.db.delete("Backup_File", {"name": ["in", missing]})
+        after_commit(bump_doctype_version, "Backup_File")
+
+    frappe.db.commit()
+
+def get_backups(file_type="Database", limit=None):
+    """Get catalogued backups, newest first"""
+    return frappe.get_all("Backup_File",
+        filters={"file_type": file_type} if file_type else None,
+        fields=["name", "file_type", "backup_date", "file_size", "compression_mode", "duration", "throughput"],
+        order_by="backup_date desc",
+        limit_page_length=limit
+    )
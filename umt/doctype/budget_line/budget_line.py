@@ -0,0 +1,132 @@
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import flt, cint, now
+
+class BudgetLine(Document):
+    def validate(self):
+        """Validate budget line data"""
+        if flt(self.budget_amount) < 0:
+            frappe.throw(_("لا يمكن أن يكون مبلغ الميزانية سالبا"))
+
+def on_doctype_update():
+    frappe.db.add_unique("Budget_Line", ["academic_year", "expense_type"], constraint_name="unique_year_type")
+
+def get_budget_line_name(academic_year, expense_type):
+    """Budget lines are named after their academic year and expense type, so
+    lookups are primary key reads"""
+    return f"{academic_year}-{expense_type}"
+
+def get_remaining_budget(academic_year, expense_type):
+    """Get (remaining amount, action on exceed) for an expense type, or None when no budget is set"""
+    line = frappe.db.get_value("Budget_Line", get_budget_line_name(academic_year, expense_type),
+        ["budget_amount", "utilized_amount", "action_on_exceed"], as_dict=1)
+
+    if not line or not flt(line.budget_amount):
+        return None
+
+    return flt(line.budget_amount) - flt(line.utilized_amount), line.action_on_exceed
+
+def check_budget(academic_year, expense_type, amount):
+    """Refuse or warn about an expense exceeding the remaining budget"""
+    budget = get_remaining_budget(academic_year, expense_type)
+    if not budget:
+        return
+
+    remaining, action = budget
+    if flt(amount) > remaining:
+        message = _("المصروف ({0} درهم) يتجاوز الميزانية المتبقية لـ {1} ({2} درهم)").format(
+            flt(amount, 2), expense_type, flt(remaining, 2))
+
+        if action == "Stop":
+            frappe.throw(message)
+        frappe.msgprint(message, indicator="orange", alert=True)
+
+def apply_expense(academic_year, expense_type, amount, cancel=False):
+    """Add (or on cancel remove) an expense to its budget line counters.
+
+    The line is locked with SELECT ... FOR UPDATE, so concurrent submissions
+    are checked against the counter left by the previous one and the delta
+    update cannot be lost.
+    """
+    name = get_budget_line_name(academic_year, expense_type)
+    ensure_budget_line(name, academic_year, expense_type)
+
+    line = frappe.db.sql("""
+        SELECT budget_amount, utilized_amount, action_on_exceed
+        FROM `tabBudget_Line`
+        WHERE name = %s
+        FOR UPDATE
+    """, (name,), as_dict=1)[0]
+
+    amount = -flt(amount) if cancel else flt(amount)
+
+    if (amount > 0 and flt(line.budget_amount) and line.action_on_exceed == "Stop"
+            and flt(line.utilized_amount) + amount > flt(line.budget_amount)):
+        frappe.throw(_("المصروف يتجاوز الميزانية المتبقية لـ {0} ({1} درهم)").format(
+            expense_type, flt(flt(line.budget_amount) - flt(line.utilized_amount), 2)))
+
+    frappe.db.sql("""
+        UPDATE `tabBudget_Line`
+        SET utilized_amount = utilized_amount + %(amount)s,
+            entry_count = entry_count + %(count)s,
+            modified = %(modified)s
+        WHERE name = %(name)s
+    """, {"amount": amount, "count": -1 if cancel else 1, "modified": now(), "name": name})
+
+def ensure_budget_line(name, academic_year, expense_type):
+    """Create an uncapped line to carry the counters of an expense type without a budget"""
+    if frappe.db.exists("Budget_Line", name):
+        return
+
+    timestamp = now()
+    frappe.db.sql("""
+        INSERT IGNORE INTO `tabBudget_Line`
+            (name, creation, modified, owner, modified_by, docstatus,
+            academic_year, expense_type, budget_amount, action_on_exceed, utilized_amount, entry_count)
+        VALUES (%s, %s, %s, %s, %s, 0, %s, %s, 0, 'Stop', 0, 0)
+    """, (name, timestamp, timestamp, frappe.session.user, frappe.session.user, academic_year, expense_type))
+
+def get_utilization(academic_year, expense_type):
+    """Get the submitted expense total and count of an expense type from its counters"""
+    line = frappe.db.get_value("Budget_Line", get_budget_line_name(academic_year, expense_type),
+        ["budget_amount", "utilized_amount", "entry_count"], as_dict=1)
+    return line or frappe._dict(budget_amount=0, utilized_amount=0, entry_count=0)
+
+def reconcile_budgets():
+    """Rebuild utilization counters from submitted expense entries.
+
+    Returns the lines whose counters had drifted, with the stored and ledger
+    values.
+    """
+    ledger = {
+        get_budget_line_name(row.academic_year, row.expense_type): row
+        for row in frappe.db.sql("""
+            SELECT academic_year, expense_type, SUM(amount) as amount, COUNT(*) as entry_count
+            FROM `tabExpense_Entry`
+            WHERE docstatus = 1
+            GROUP BY academic_year, expense_type
+        """, as_dict=1)
+    }
+
+    for name, row in ledger.items():
+        ensure_budget_line(name, row.academic_year, row.expense_type)
+
+    drifted = []
+    for line in frappe.get_all("Budget_Line", fields=["name", "utilized_amount", "entry_count"]):
+        row = ledger.get(line.name)
+        amount, entry_count = (flt(row.amount), cint(row.entry_count)) if row else (0, 0)
+
+        if flt(line.utilized_amount, 2) != flt(amount, 2) or cint(line.entry_count) != entry_count:
+            drifted.append({
+                "name": line.name,
+                "utilized_amount": line.utilized_amount,
+                "ledger_amount": amount,
+                "entry_count": line.entry_count,
+                "ledger_count": entry_count
+            })
+            frappe.db.set_value("Budget_Line", line.name,
+                {"utilized_amount": amount, "entry_count": entry_count}, update_modified=False)
+
+    frappe.db.commit()
+    return drifted
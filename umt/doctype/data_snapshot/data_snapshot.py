@@ -0,0 +1,13 @@
+import frappe
+from frappe.model.document import Document
+import os
+import shutil
+
+from umt.snapshots import get_snapshot_path
+
+class DataSnapshot(Document):
+    def on_trash(self):
+        """Remove the snapshot chunks with the catalog entry"""
+        path = get_snapshot_path(self.name)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
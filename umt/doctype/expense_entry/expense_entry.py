@@ -1,13 +1,18 @@
 import frappe
 from frappe.model.document import Document
 from frappe.utils import getdate, today, flt
+from umt.doctype.financial_period.financial_period import validate_period_open
+from umt.doctype.gl_entry.gl_entry import make_gl_entries, make_reverse_gl_entries, get_expense_gl_map
+from umt.doctype.budget_line.budget_line import check_budget, apply_expense, get_utilization
 
 class ExpenseEntry(Document):
     def validate(self):
         """Validate expense entry data before saving"""
         self.validate_dates()
+        self.validate_period()
         self.validate_amounts()
         self.validate_attachments()
+        self.validate_budget()
         
     def validate_dates(self):
         """Validate posting and payment dates"""
@@ -20,6 +25,10 @@ class ExpenseEntry(Document):
         if getdate(self.payment_date) > getdate(self.posting_date):
             frappe.throw("تاريخ الدفع لا يمكن أن يكون بعد تاريخ التسجيل")
     
+    def validate_period(self):
+        """Block postings into sealed financial periods"""
+        validate_period_open(self.posting_date)
+    
     def validate_amounts(self):
         """Validate payment amounts"""
         if flt(self.amount) <= 0:
@@ -30,6 +39,10 @@ class ExpenseEntry(Document):
         if flt(self.amount) > 1000 and not self.attach_receipt:
             frappe.throw("يجب إرفاق وصل للمصاريف التي تتجاوز 1000 درهم")
     
+    def validate_budget(self):
+        """Check the expense against the remaining budget of its type"""
+        check_budget(self.academic_year, self.expense_type, self.amount)
+    
     def on_submit(self):
         """Handle submission of expense entry"""
         self.create_gl_entry()
@@ -37,32 +50,27 @@ class ExpenseEntry(Document):
     
     def on_cancel(self):
         """Handle cancellation of expense entry"""
+        self.validate_period()
         self.cancel_gl_entry()
         self.update_budget(cancel=True)
     
     def create_gl_entry(self):
         """Create General Ledger entries for expense"""
-        # This method will be implemented when accounting module is set up
-        pass
+        make_gl_entries(get_expense_gl_map(self))
     
     def cancel_gl_entry(self):
         """Cancel General Ledger entries"""
-        # This method will be implemented when accounting module is set up
-        pass
+        make_reverse_gl_entries(self.doctype, self.name)
     
     def update_budget(self, cancel=False):
         """Update budget utilization"""
-        # This method will be implemented when budgeting module is set up
-        pass
+        apply_expense(self.academic_year, self.expense_type, self.amount, cancel=cancel)
     
     def get_expense_analytics(self):
         """Get analytics for this expense type"""
-        return frappe.get_all("Expense_Entry",
-            filters={
-                "expense_type": self.expense_type,
-                "academic_year": self.academic_year,
-                "docstatus": 1
-            },
-            fields=["sum(amount) as total_amount"],
-            group_by="expense_type"
-        )
+        utilization = get_utilization(self.academic_year, self.expense_type)
+        return [{
+            "total_amount": utilization.utilized_amount,
+            "entry_count": utilization.entry_count,
+            "budget_amount": utilization.budget_amount
+        }]
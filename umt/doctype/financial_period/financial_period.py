@@ -0,0 +1,233 @@
+import frappe
+from frappe.model.document import Document
+from frappe.utils import getdate, today, now, flt, add_months, add_days, get_first_day, get_last_day
+
+INCOME = "Income"
+EXPENSE = "Expense"
+
+class FinancialPeriod(Document):
+    def validate(self):
+        """Validate period data"""
+        self.period_start = get_first_day(self.period_start)
+        self.period_end = get_last_day(self.period_start)
+        self.period = getdate(self.period_start).strftime("%Y-%m")
+        self.validate_closed_month()
+
+    def validate_closed_month(self):
+        """Only past months can be sealed"""
+        if getdate(self.period_end) >= getdate(today()):
+            frappe.throw("لا يمكن إقفال فترة لم تنته بعد")
+
+    def before_submit(self):
+        """Seal the ledger as it is now, right after the last sealed period"""
+        self.validate_sequence()
+        self.compute_totals()
+
+    def validate_sequence(self):
+        """Sealed periods are contiguous: each one starts the day after the previous one ends"""
+        last_sealed = get_last_sealed_period()
+        if last_sealed:
+            if getdate(self.period_start) != getdate(add_days(last_sealed.period_end, 1)):
+                frappe.throw("يجب أن تلي الفترة مباشرة آخر فترة مقفلة ({0})".format(last_sealed.period))
+        elif has_postings_before(self.period_start):
+            frappe.throw("توجد عمليات قبل هذه الفترة، يجب إقفال الفترات السابقة أولا")
+
+    def on_submit(self):
+        """Record when the period was sealed"""
+        self.db_set("sealed_on", now())
+        clear_sealed_cache()
+
+    def on_cancel(self):
+        """Reopen the period; later sealed periods carry a stale closing balance"""
+        if frappe.db.exists("Financial_Period", {"period_start": [">", self.period_start], "docstatus": 1}):
+            frappe.throw("لا يمكن إعادة فتح فترة تليها فترات مقفلة")
+        clear_sealed_cache()
+
+    def compute_totals(self):
+        """Compute per-type totals for the period from the ledger tables"""
+        self.set("lines", [])
+
+        for category, doctype, type_field in (
+            (INCOME, "Income_Entry", "entry_type"),
+            (EXPENSE, "Expense_Entry", "expense_type")
+        ):
+            rows = frappe.db.sql("""
+                SELECT {type_field} as entry_type, academic_year,
+                    IFNULL(SUM(amount), 0) as amount, COUNT(*) as entry_count
+                FROM `tab{doctype}`
+                WHERE docstatus = 1
+                AND posting_date BETWEEN %s AND %s
+                GROUP BY {type_field}, academic_year
+            """.format(doctype=doctype, type_field=type_field),
+                (self.period_start, self.period_end), as_dict=1)
+
+            for row in rows:
+                self.append("lines", {"category": category, **row})
+
+        self.total_income = sum(flt(d.amount) for d in self.lines if d.category == INCOME)
+        self.total_expenses = sum(flt(d.amount) for d in self.lines if d.category == EXPENSE)
+        self.balance = self.total_income - self.total_expenses
+        self.closing_balance = get_balance_before(self.period_start) + self.balance
+
+def has_postings_before(date):
+    """Check whether any submitted income or expense was posted before a date"""
+    return any(
+        frappe.db.exists(doctype, {"docstatus": 1, "posting_date": ["<", date]})
+        for doctype in ("Income_Entry", "Expense_Entry")
+    )
+
+def get_balance_before(date):
+    """Get the cumulative balance of all postings before a date"""
+    previous = frappe.db.get_value("Financial_Period",
+        {"docstatus": 1, "period_end": add_days(date, -1)},
+        "closing_balance"
+    )
+    if previous is not None:
+        return flt(previous)
+
+    # No sealed period right before this one: sum the unsealed history once
+    return get_live_balance(to_date=add_days(date, -1))
+
+def get_live_balance(from_date=None, to_date=None):
+    """Get income minus expenses posted between two dates (both optional)"""
+    conditions = "docstatus = 1"
+    values = {"from_date": from_date, "to_date": to_date}
+    if from_date:
+        conditions += " AND posting_date >= %(from_date)s"
+    if to_date:
+        conditions += " AND posting_date <= %(to_date)s"
+
+    income = frappe.db.sql(
+        "SELECT IFNULL(SUM(amount), 0) FROM `tabIncome_Entry` WHERE " + conditions, values)[0][0]
+    expenses = frappe.db.sql(
+        "SELECT IFNULL(SUM(amount), 0) FROM `tabExpense_Entry` WHERE " + conditions, values)[0][0]
+
+    return flt(income) - flt(expenses)
+
+def close_period(period_start):
+    """Compute, store and seal the snapshot for the month containing `period_start`"""
+    period_start = get_first_day(period_start)
+    if frappe.db.exists("Financial_Period", {"period_start": period_start, "docstatus": 1}):
+        return
+
+    name = frappe.db.get_value("Financial_Period", {"period_start": period_start, "docstatus": 0})
+    doc = frappe.get_doc("Financial_Period", name) if name else frappe.new_doc("Financial_Period")
+    doc.period_start = period_start
+    doc.flags.ignore_permissions = True
+    doc.save()
+    doc.submit()
+    return doc
+
+def close_pending_periods():
+    """Seal every finished month that is not sealed yet, oldest first"""
+    current_month = get_first_day(today())
+    last_sealed = get_last_sealed_period()
+
+    if last_sealed:
+        month = add_months(last_sealed.period_start, 1)
+    else:
+        first_posting = frappe.db.sql("""
+            SELECT MIN(posting_date) FROM (
+                SELECT MIN(posting_date) as posting_date FROM `tabIncome_Entry` WHERE docstatus = 1
+                UNION ALL
+                SELECT MIN(posting_date) FROM `tabExpense_Entry` WHERE docstatus = 1
+            ) t
+        """)[0][0]
+        month = get_first_day(first_posting) if first_posting else add_months(current_month, -1)
+
+    while getdate(month) < getdate(current_month):
+        close_period(month)
+        frappe.db.commit()
+        month = add_months(month, 1)
+
+def get_last_sealed_period():
+    """Get the most recent sealed period"""
+    periods = frappe.get_all("Financial_Period",
+        filters={"docstatus": 1},
+        fields=["name", "period", "period_start", "period_end", "closing_balance"],
+        order_by="period_start desc",
+        limit=1
+    )
+    return periods[0] if periods else None
+
+def get_sealed_until():
+    """Get the end date of the last sealed period, cached between closes"""
+    sealed_until = frappe.cache().get_value("umt_sealed_until")
+    if sealed_until is None:
+        last_sealed = get_last_sealed_period()
+        sealed_until = str(last_sealed.period_end) if last_sealed else ""
+        frappe.cache().set_value("umt_sealed_until", sealed_until)
+
+    return getdate(sealed_until) if sealed_until else None
+
+def clear_sealed_cache():
+    frappe.cache().delete_value("umt_sealed_until")
+
+def is_period_sealed(date):
+    """Check whether a posting date falls into a sealed period"""
+    sealed_until = get_sealed_until()
+    if not sealed_until or getdate(date) > sealed_until:
+        return False
+
+    # Periods are sealed in sequence, but periods sealed before that was
+    # enforced may leave unsealed months behind the last one
+    return bool(frappe.db.exists("Financial_Period", {"period_start": get_first_day(date), "docstatus": 1}))
+
+def validate_period_open(posting_date):
+    """Block postings and cancellations in sealed periods"""
+    if posting_date and is_period_sealed(posting_date):
+        frappe.throw("لا يمكن التسجيل أو الإلغاء في فترة مالية مقفلة")
+
+def get_period_totals(date):
+    """Get sealed income and expense totals for the month containing `date`, or None if open"""
+    if not is_period_sealed(date):
+        return None
+
+    return frappe.db.get_value("Financial_Period",
+        {"period_start": get_first_day(date), "docstatus": 1},
+        ["total_income", "total_expenses", "balance", "closing_balance"],
+        as_dict=1
+    )
+
+def get_sealed_lines(from_date=None, to_date=None, academic_year=None):
+    """Get snapshot lines of sealed periods lying entirely inside a date range.
+
+    Returns the date ranges covered by those periods, adjacent periods merged
+    into one range, together with the lines.
+    """
+    conditions = ["p.docstatus = 1"]
+    values = {"from_date": from_date, "to_date": to_date, "academic_year": academic_year}
+    if from_date:
+        conditions.append("p.period_start >= %(from_date)s")
+    if to_date:
+        conditions.append("p.period_end <= %(to_date)s")
+
+    periods = frappe.db.sql("""
+        SELECT p.period_start, p.period_end
+        FROM `tabFinancial_Period` p
+        WHERE {conditions}
+        ORDER BY p.period_start
+    """.format(conditions=" AND ".join(conditions)), values)
+
+    ranges = []
+    for period_start, period_end in periods:
+        if ranges and getdate(period_start) == getdate(add_days(ranges[-1][1], 1)):
+            ranges[-1] = (ranges[-1][0], period_end)
+        else:
+            ranges.append((period_start, period_end))
+
+    if not ranges:
+        return [], []
+
+    if academic_year:
+        conditions.append("l.academic_year = %(academic_year)s")
+
+    lines = frappe.db.sql("""
+        SELECT p.period, l.category, l.entry_type, SUM(l.amount) as amount
+        FROM `tabFinancial_Period` p
+        JOIN `tabFinancial_Period_Line` l ON l.parent = p.name AND l.parenttype = 'Financial_Period'
+        WHERE {conditions}
+        GROUP BY p.period, l.category, l.entry_type
+    """.format(conditions=" AND ".join(conditions)), values, as_dict=1)
+
+    return ranges, lines
@@ -0,0 +1,211 @@
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import flt, cint, now
+from collections import defaultdict
+
+# Append-only journal. Each submitted Income_Entry or Expense_Entry posts a
+# balanced pair of rows; cancelling posts the mirror rows instead of deleting.
+# GL_Account_Balance keeps the running debit - credit balance of each account.
+
+CASH_ACCOUNT = "الخزينة"
+INCOME_ACCOUNT_PREFIX = "مداخيل - "
+EXPENSE_ACCOUNT_PREFIX = "مصاريف - "
+
+FIELDS = [
+    "name", "creation", "modified", "owner", "modified_by",
+    "posting_date", "account", "debit", "credit",
+    "voucher_type", "voucher_no", "is_reversal", "remarks"
+]
+
+REBUILD_BATCH_SIZE = 5000
+
+class GLEntry(Document):
+    def validate(self):
+        """Journal rows are written once and never edited"""
+        if not self.is_new():
+            frappe.throw(_("لا يمكن تعديل قيود دفتر الأستاذ"))
+
+    def on_trash(self):
+        frappe.throw(_("لا يمكن حذف قيود دفتر الأستاذ، يجب إلغاء المستند الأصلي"))
+
+def on_doctype_update():
+    frappe.db.add_index("GL_Entry", ["account", "posting_date"])
+    frappe.db.add_index("GL_Entry", ["voucher_type", "voucher_no"])
+
+def get_account_type(account):
+    if account.startswith(INCOME_ACCOUNT_PREFIX):
+        return "Income"
+    if account.startswith(EXPENSE_ACCOUNT_PREFIX):
+        return "Expense"
+    return "Asset"
+
+def get_income_gl_map(entry):
+    """Journal rows of an income entry: debit cash, credit the income account"""
+    return [
+        gl_row(entry, "Income_Entry", CASH_ACCOUNT, debit=entry.get("amount")),
+        gl_row(entry, "Income_Entry", INCOME_ACCOUNT_PREFIX + entry.get("entry_type"), credit=entry.get("amount"))
+    ]
+
+def get_expense_gl_map(entry):
+    """Journal rows of an expense entry: debit the expense account, credit cash"""
+    return [
+        gl_row(entry, "Expense_Entry", EXPENSE_ACCOUNT_PREFIX + entry.get("expense_type"), debit=entry.get("amount")),
+        gl_row(entry, "Expense_Entry", CASH_ACCOUNT, credit=entry.get("amount"))
+    ]
+
+def gl_row(entry, voucher_type, account, debit=0, credit=0):
+    return {
+        "posting_date": entry.get("posting_date"),
+        "account": account,
+        "debit": flt(debit),
+        "credit": flt(credit),
+        "voucher_type": voucher_type,
+        "voucher_no": entry.get("name"),
+        "is_reversal": 0
+    }
+
+def make_gl_entries(gl_map):
+    """Append balanced journal rows and apply them to the account balances.
+
+    Rows of any number of vouchers are written with one insert; balances are
+    updated by delta under row locks taken in account order, so concurrent
+    postings cannot deadlock or lose an update.
+    """
+    if not gl_map:
+        return
+
+    validate_balanced(gl_map)
+
+    timestamp = now()
+    user = frappe.session.user
+    deltas = defaultdict(lambda: [0, 0])
+    values = []
+
+    for row in gl_map:
+        row = {
+            "name": frappe.generate_hash(length=12),
+            "creation": timestamp,
+            "modified": timestamp,
+            "owner": user,
+            "modified_by": user,
+            "remarks": None,
+            **row
+        }
+        values.append(tuple(row.get(field) for field in FIELDS))
+        deltas[row["account"]][0] += flt(row["debit"]) - flt(row["credit"])
+        deltas[row["account"]][1] += 1
+
+    frappe.db.bulk_insert("GL_Entry", fields=FIELDS, values=values)
+    update_account_balances(deltas)
+
+def make_reverse_gl_entries(voucher_type, voucher_no):
+    """Post mirror rows for a cancelled voucher, on its original posting date"""
+    entries = frappe.get_all("GL_Entry",
+        filters={"voucher_type": voucher_type, "voucher_no": voucher_no},
+        fields=["posting_date", "account", "debit", "credit", "is_reversal"]
+    )
+
+    if not entries or any(cint(e.is_reversal) for e in entries):
+        return
+
+    make_gl_entries([{
+        "posting_date": e.posting_date,
+        "account": e.account,
+        "debit": e.credit,
+        "credit": e.debit,
+        "voucher_type": voucher_type,
+        "voucher_no": voucher_no,
+        "is_reversal": 1,
+        "remarks": _("إلغاء {0}").format(voucher_no)
+    } for e in entries])
+
+def validate_balanced(gl_map):
+    totals = defaultdict(float)
+    for row in gl_map:
+        totals[(row["voucher_type"], row["voucher_no"])] += flt(row["debit"]) - flt(row["credit"])
+
+    for (voucher_type, voucher_no), difference in totals.items():
+        if abs(flt(difference, 2)) > 0:
+            frappe.throw(_("القيد غير متوازن للمستند {0} {1}").format(voucher_type, voucher_no))
+
+def update_account_balances(deltas):
+    accounts = sorted(deltas)
+    timestamp = now()
+
+    frappe.db.bulk_insert("GL_Account_Balance",
+        fields=["name", "creation", "modified", "owner", "modified_by", "account", "account_type", "balance", "entry_count"],
+        values=[
+            (account, timestamp, timestamp, frappe.session.user, frappe.session.user, account, get_account_type(account), 0, 0)
+            for account in accounts
+        ],
+        ignore_duplicates=True
+    )
+
+    frappe.db.sql("""
+        SELECT name FROM `tabGL_Account_Balance`
+        WHERE name IN %s
+        ORDER BY name
+        FOR UPDATE
+    """, (tuple(accounts),))
+
+    for account in accounts:
+        amount, count = deltas[account]
+        frappe.db.sql("""
+            UPDATE `tabGL_Account_Balance`
+            SET balance = balance + %s, entry_count = entry_count + %s, modified = %s
+            WHERE name = %s
+        """, (amount, count, timestamp, account))
+
+def get_account_balance(account=CASH_ACCOUNT):
+    """Current balance of an account, from a primary key lookup"""
+    return flt(frappe.db.get_value("GL_Account_Balance", account, "balance"))
+
+def get_balance_as_of(date, account=CASH_ACCOUNT):
+    """Balance of an account at the end of `date`.
+
+    The current balance minus the rows posted after `date`: a tail scan on the
+    (account, posting_date) index, bounded by how far back `date` is.
+    """
+    tail = frappe.db.sql("""
+        SELECT IFNULL(SUM(debit - credit), 0)
+        FROM `tabGL_Entry`
+        WHERE account = %s AND posting_date > %s
+    """, (account, date))[0][0]
+
+    return get_account_balance(account) - flt(tail)
+
+def rebuild_ledger():
+    """Rebuild the journal and balances from submitted income and expense entries"""
+    frappe.db.sql("TRUNCATE `tabGL_Entry`")
+    frappe.db.sql("TRUNCATE `tabGL_Account_Balance`")
+
+    for doctype, type_field, get_gl_map in (
+            ("Income_Entry", "entry_type", get_income_gl_map),
+            ("Expense_Entry", "expense_type", get_expense_gl_map)):
+        last_name = ""
+        while True:
+            entries = frappe.db.sql("""
+                SELECT name, posting_date, amount, {type_field}
+                FROM `tab{doctype}`
+                WHERE docstatus = 1 AND name > %s
+                ORDER BY name
+                LIMIT %s
+            """.format(doctype=doctype, type_field=type_field), (last_name, REBUILD_BATCH_SIZE), as_dict=1)
+
+            if not entries:
+                break
+
+            make_gl_entries([row for entry in entries for row in get_gl_map(entry)])
+            frappe.db.commit()
+            last_name = entries[-1].name
+
+def ensure_ledger():
+    """after_migrate: build the journal once for postings made before it existed"""
+    if frappe.db.sql("SELECT name FROM `tabGL_Entry` LIMIT 1"):
+        return
+
+    if not (frappe.db.exists("Income_Entry", {"docstatus": 1}) or frappe.db.exists("Expense_Entry", {"docstatus": 1})):
+        return
+
+    rebuild_ledger()
@@ -1,11 +1,14 @@
 import frappe
 from frappe.model.document import Document
 from frappe.utils import getdate, today, flt
+from umt.doctype.financial_period.financial_period import validate_period_open
+from umt.doctype.gl_entry.gl_entry import make_gl_entries, make_reverse_gl_entries, get_income_gl_map
 
 class IncomeEntry(Document):
     def validate(self):
         """Validate income entry data before saving"""
         self.validate_dates()
+        self.validate_period()
         self.validate_amounts()
         self.validate_member()
         
@@ -20,6 +23,10 @@ class IncomeEntry(Document):
         if getdate(self.payment_date) > getdate(self.posting_date):
             frappe.throw("تاريخ الدفع لا يمكن أن يكون بعد تاريخ التسجيل")
     
+    def validate_period(self):
+        """Block postings into sealed financial periods"""
+        validate_period_open(self.posting_date)
+    
     def validate_amounts(self):
         """Validate payment amounts"""
         if flt(self.amount) <= 0:
@@ -37,32 +44,25 @@ class IncomeEntry(Document):
     
     def on_cancel(self):
         """Handle cancellation of income entry"""
+        self.validate_period()
         self.update_membership_card(cancel=True)
         self.cancel_gl_entry()
     
     def update_membership_card(self, cancel=False):
         """Update membership card payment status"""
         if self.entry_type == "بطاقة الإنخراط" and self.member:
-            card = frappe.get_list("Membership_Card",
-                filters={
-                    "member": self.member,
-                    "status": "Active"
-                },
-                order_by="creation desc",
-                limit=1
-            )
+            card = frappe.db.get_value("Member", self.member, "current_card")
             
             if card:
-                card_doc = frappe.get_doc("Membership_Card", card[0].name)
-                card_doc.payment_status = "غير المؤداة" if cancel else "المؤداة"
-                card_doc.save()
+                card_doc = frappe.get_doc("Membership_Card", card)
+                if card_doc.status == "Active":
+                    card_doc.payment_status = "غير المؤداة" if cancel else "المؤداة"
+                    card_doc.save()
     
     def create_gl_entry(self):
         """Create General Ledger entries for income"""
-        # This method will be implemented when accounting module is set up
-        pass
+        make_gl_entries(get_income_gl_map(self))
     
     def cancel_gl_entry(self):
         """Cancel General Ledger entries"""
-        # This method will be implemented when accounting module is set up
-        pass
+        make_reverse_gl_entries(self.doctype, self.name)
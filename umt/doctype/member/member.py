@@ -2,12 +2,22 @@ import frappe
 from frappe.model.document import Document
 from frappe.utils import today, add_years, getdate
 
+# Maintained by the Membership_Card hooks, never by saving the member
+CARD_POINTER_FIELDS = ("current_card", "card_expiry", "card_payment_status")
+
 class Member(Document):
     def validate(self):
         """Validate member data before saving"""
         self.validate_dates()
+        self.load_card_pointer()
         if not self.membership_date:
             self.membership_date = today()
+    
+    def load_card_pointer(self):
+        """Keep the stored current card fields instead of the values on the document"""
+        values = None if self.is_new() else frappe.db.get_value("Member", self.name, CARD_POINTER_FIELDS, as_dict=1)
+        for fieldname in CARD_POINTER_FIELDS:
+            self.set(fieldname, values.get(fieldname) if values else None)
         
     def validate_dates(self):
         """Validate birth date and membership dates"""
@@ -60,15 +70,27 @@ class Member(Document):
         if not self.last_renewal_date:
             return
             
-        today_date = getdate(today())
-        renewal_date = getdate(self.last_renewal_date)
-        expiry_date = add_years(renewal_date, 1)
+        self.membership_status = get_membership_status(self.last_renewal_date, self.is_active)
         
-        if today_date > expiry_date:
-            self.membership_status = 'Expired'
-        elif not self.is_active:
-            self.membership_status = 'Inactive'
-        else:
-            self.membership_status = 'Active'
-            
-        self.db_update()
+        # Only the status: a full db_update would overwrite the card pointer
+        # set by the card inserted in after_insert
+        self.db_set("membership_status", self.membership_status, update_modified=False)
+
+def get_membership_status(last_renewal_date, is_active, as_of=None, current=None):
+    """Status of a member on `as_of` (default today); `current` when never renewed.
+    
+    Vectorized in umt.status_engine.member_statuses, keep both in step.
+    """
+    if not last_renewal_date:
+        return current
+    
+    today_date = getdate(as_of or today())
+    renewal_date = getdate(last_renewal_date)
+    expiry_date = add_years(renewal_date, 1)
+    
+    if today_date > expiry_date:
+        return 'Expired'
+    elif not is_active:
+        return 'Inactive'
+    else:
+        return 'Active'
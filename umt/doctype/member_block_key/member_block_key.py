@@ -0,0 +1,9 @@
+import frappe
+from frappe.model.document import Document
+
+class MemberBlockKey(Document):
+    pass
+
+def on_doctype_update():
+    frappe.db.add_index("Member_Block_Key", ["block_key", "member"])
+    frappe.db.add_index("Member_Block_Key", ["member"])
@@ -0,0 +1,11 @@
+import frappe
+from frappe.model.document import Document
+
+class MemberDuplicate(Document):
+    def validate(self):
+        """Validate the duplicate pair"""
+        if self.member == self.duplicate_of:
+            frappe.throw("لا يمكن أن يكون العضو مكررا مع نفسه")
+
+def on_doctype_update():
+    frappe.db.add_index("Member_Duplicate", ["member", "duplicate_of"])
@@ -0,0 +1,9 @@
+import frappe
+from frappe.model.document import Document
+
+class MemberSearchToken(Document):
+    pass
+
+def on_doctype_update():
+    frappe.db.add_index("Member_Search_Token", ["token", "member"])
+    frappe.db.add_index("Member_Search_Token", ["member"])
@@ -1,6 +1,6 @@
 import frappe
 from frappe.model.document import Document
-from frappe.utils import getdate, today, date_diff
+from frappe.utils import getdate, today, date_diff, now
 
 class MembershipCard(Document):
     def validate(self):
@@ -18,17 +18,100 @@ class MembershipCard(Document):
     
     def update_status(self):
         """Update card status based on expiry date"""
-        if getdate(self.expiry_date) < getdate(today()):
-            self.status = 'Expired'
-        elif self.status != 'Cancelled':
-            self.status = 'Active'
+        self.status = get_card_status(self.expiry_date, self.status)
             
     def on_update(self):
         """Update member's last renewal date when card is renewed"""
         if self.status == 'Active' and self.payment_status == 'المؤداة':
             frappe.db.set_value('Member', self.member, 'last_renewal_date', self.issue_date)
+        
+        update_current_card(self.member)
+        previous = self.get_doc_before_save()
+        if previous and previous.member and previous.member != self.member:
+            update_current_card(previous.member)
+    
+    def after_delete(self):
+        """Point the member to their next card"""
+        update_current_card(self.member)
             
     def on_trash(self):
         """Prevent deletion of active cards"""
         if self.status == 'Active':
             frappe.throw("لا يمكن حذف البطاقات النشطة")
+
+def get_card_status(expiry_date, status, as_of=None):
+    """Status of a card on `as_of` (default today).
+    
+    Vectorized in umt.status_engine.card_statuses, keep both in step.
+    """
+    if getdate(expiry_date) < getdate(as_of or today()):
+        return 'Expired'
+    elif status != 'Cancelled':
+        return 'Active'
+    return status
+
+def on_doctype_update():
+    frappe.db.add_index("Membership_Card", ["card_number", "issue_date"])
+    frappe.db.add_index("Membership_Card", ["member", "issue_date"])
+
+# The member's current card is their latest active card, or their latest card
+# when none is active. It is copied onto Member (current_card, card_expiry,
+# card_payment_status) so readers don't have to look it up per member.
+CURRENT_CARD_ORDER = "status = 'Active' DESC, issue_date DESC, creation DESC"
+
+def get_current_card(member):
+    card = frappe.db.sql("""
+        SELECT name, expiry_date, payment_status
+        FROM `tabMembership_Card`
+        WHERE member = %s
+        ORDER BY {order}
+        LIMIT 1
+    """.format(order=CURRENT_CARD_ORDER), (member,), as_dict=1)
+    return card[0] if card else None
+
+def update_current_card(member):
+    """Copy the member's current card onto the Member row"""
+    if not member:
+        return
+    
+    card = get_current_card(member) or frappe._dict()
+    frappe.db.set_value("Member", member, {
+        "current_card": card.name,
+        "card_expiry": card.expiry_date,
+        "card_payment_status": card.payment_status
+    })
+
+def backfill_current_cards(batch_size=5000):
+    """Set the current card fields of every member, `batch_size` members per query"""
+    last_name = ""
+    updated = 0
+    
+    while True:
+        names = frappe.db.sql("""
+            SELECT name FROM `tabMember`
+            WHERE name > %s
+            ORDER BY name
+            LIMIT %s
+        """, (last_name, batch_size), pluck=True)
+        
+        if not names:
+            break
+        
+        frappe.db.sql("""
+            UPDATE `tabMember` m
+            LEFT JOIN (
+                SELECT member, name, expiry_date, payment_status,
+                    ROW_NUMBER() OVER (PARTITION BY member ORDER BY {order}) AS position
+                FROM `tabMembership_Card`
+                WHERE member BETWEEN %(first)s AND %(last)s
+            ) c ON c.member = m.name AND c.position = 1
+            SET m.current_card = c.name, m.card_expiry = c.expiry_date, m.card_payment_status = c.payment_status,
+                m.modified = %(modified)s
+            WHERE m.name BETWEEN %(first)s AND %(last)s
+        """.format(order=CURRENT_CARD_ORDER), {"first": names[0], "last": names[-1], "modified": now()})
+        frappe.db.commit()
+        
+        updated += len(names)
+        last_name = names[-1]
+    
+    return updated
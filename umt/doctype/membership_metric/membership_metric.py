@@ -0,0 +1,164 @@
+import frappe
+from frappe.model.document import Document
+from frappe.utils import getdate, today, cint
+
+MEMBER_STATUS_FIELDS = {
+    "Active": "active_members",
+    "Inactive": "inactive_members",
+    "Expired": "expired_members"
+}
+
+METRICS = [
+    "total_members", "active_members", "inactive_members", "expired_members",
+    "active_cards", "paid_cards", "unpaid_cards"
+]
+
+# Bucket expressions used to downsample the daily series
+INTERVALS = {
+    "day": "metric_date",
+    "week": "YEARWEEK(metric_date, 3)",
+    "month": "DATE_FORMAT(metric_date, '%%Y-%%m')"
+}
+
+class MembershipMetric(Document):
+    pass
+
+def on_doctype_update():
+    frappe.db.add_index("Membership_Metric", ["metric_date", "province"])
+
+def record_daily_metrics(date=None):
+    """Store per-province member and card counts as of `date` (defaults to today).
+
+    Statuses are evaluated against the date itself, the same way
+    Member.update_membership_status and MembershipCard.update_status do, so
+    cards that expired without being saved again are not counted as active.
+    """
+    date = getdate(date or today())
+    rows = {}
+
+    def get_row(province):
+        return rows.setdefault(province or None, {field: 0 for field in METRICS})
+
+    members = frappe.db.sql("""
+        SELECT province,
+            CASE
+                WHEN last_renewal_date IS NULL THEN membership_status
+                WHEN %(date)s > DATE_ADD(last_renewal_date, INTERVAL 1 YEAR) THEN 'Expired'
+                WHEN IFNULL(is_active, 0) = 0 THEN 'Inactive'
+                ELSE 'Active'
+            END as status,
+            COUNT(*) as count
+        FROM `tabMember`
+        WHERE IFNULL(membership_date, DATE(creation)) <= %(date)s
+        GROUP BY province, status
+    """, {"date": date}, as_dict=1)
+
+    for d in members:
+        row = get_row(d.province)
+        row["total_members"] += d.count
+        if d.status in MEMBER_STATUS_FIELDS:
+            row[MEMBER_STATUS_FIELDS[d.status]] += d.count
+
+    cards = frappe.db.sql("""
+        SELECT m.province, c.payment_status, COUNT(*) as count
+        FROM `tabMembership_Card` c
+        JOIN `tabMember` m ON m.name = c.member
+        WHERE c.status != 'Cancelled'
+        AND c.issue_date <= %(date)s
+        AND c.expiry_date >= %(date)s
+        GROUP BY m.province, c.payment_status
+    """, {"date": date}, as_dict=1)
+
+    for d in cards:
+        row = get_row(d.province)
+        row["active_cards"] += d.count
+        row["paid_cards" if d.payment_status == "المؤداة" else "unpaid_cards"] += d.count
+
+    frappe.db.delete("Membership_Metric", {"metric_date": date})
+    for province, values in rows.items():
+        doc = frappe.get_doc({
+            "doctype": "Membership_Metric",
+            "metric_date": date,
+            "province": province,
+            **values
+        })
+        doc.db_insert()
+
+    frappe.db.commit()
+
+def get_metric_value(metric, date, province=None):
+    """Get a metric from the latest snapshot taken on or before `date`.
+
+    Returns None when no snapshot exists yet, so callers can fall back to a live count.
+    """
+    validate_metric(metric)
+    conditions, values = get_conditions(None, date, province)
+
+    snapshot_date = frappe.db.sql("""
+        SELECT MAX(metric_date) FROM `tabMembership_Metric` WHERE {conditions}
+    """.format(conditions=conditions), values)[0][0]
+
+    if not snapshot_date:
+        return None
+
+    values["snapshot_date"] = snapshot_date
+    return cint(frappe.db.sql("""
+        SELECT SUM({metric}) FROM `tabMembership_Metric`
+        WHERE metric_date = %(snapshot_date)s {province_condition}
+    """.format(
+        metric=metric,
+        province_condition="AND province = %(province)s" if province else ""
+    ), values)[0][0])
+
+@frappe.whitelist()
+def get_metric_series(metric, from_date, to_date, interval="day", province=None):
+    """Get a metric as a time series between two dates.
+
+    For weekly and monthly intervals each bucket holds the value of the last
+    snapshot inside it.
+    """
+    frappe.has_permission("Membership_Metric", "read", throw=True)
+    validate_metric(metric)
+
+    if interval not in INTERVALS:
+        frappe.throw(f"Invalid interval {interval}")
+
+    conditions, values = get_conditions(from_date, to_date, province)
+
+    snapshot_dates = [d[0] for d in frappe.db.sql("""
+        SELECT MAX(metric_date)
+        FROM `tabMembership_Metric`
+        WHERE {conditions}
+        GROUP BY {bucket}
+    """.format(conditions=conditions, bucket=INTERVALS[interval]), values)]
+
+    if not snapshot_dates:
+        return []
+
+    values["snapshot_dates"] = tuple(snapshot_dates)
+    return frappe.db.sql("""
+        SELECT metric_date as date, SUM({metric}) as value
+        FROM `tabMembership_Metric`
+        WHERE metric_date IN %(snapshot_dates)s {province_condition}
+        GROUP BY metric_date
+        ORDER BY metric_date
+    """.format(
+        metric=metric,
+        province_condition="AND province = %(province)s" if province else ""
+    ), values, as_dict=1)
+
+def validate_metric(metric):
+    if metric not in METRICS:
+        frappe.throw(f"Invalid metric {metric}")
+
+def get_conditions(from_date, to_date, province):
+    conditions = ["metric_date <= %(to_date)s"]
+    values = {"from_date": from_date, "to_date": getdate(to_date), "province": province}
+
+    if from_date:
+        values["from_date"] = getdate(from_date)
+        conditions.append("metric_date >= %(from_date)s")
+    if province:
+        conditions.append("province = %(province)s")
+
+    return " AND ".join(conditions), values
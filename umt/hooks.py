@@ -5,25 +5,114 @@ app_description = "UNEM Management Tool"
 app_email = "admin@unem.ma"
 app_license = "MIT"
 
-# Includes in <head>
-app_include_css = "/assets/umt/css/umt.min.css"
-app_include_js = "/assets/umt/js/umt.min.js"
+# Front-end bundles are not included in desk pages; the UMT web pages load
+# the core and their own page bundle, see umt/bundles.py
 
 # Document Events
 doc_events = {
     "Member": {
-        "after_insert": "umt.doctype.member.member.generate_membership_card",
-        "validate": "umt.doctype.member.member.validate_member",
-        "on_update": "umt.doctype.member.member.update_member"
+        "after_insert": [
+            "umt.doctype.member.member.generate_membership_card",
+            "umt.doctype.activity_entry.activity_entry.on_member_insert",
+            "umt.dedup.queue_duplicates"
+        ],
+        "validate": [
+            "umt.doctype.member.member.validate_member",
+            "umt.dedup.check_duplicates"
+        ],
+        "on_update": [
+            "umt.doctype.member.member.update_member",
+            "umt.cache.bump_version",
+            "umt.search.update_search_index",
+            "umt.search.update_autocomplete_index",
+            "umt.dedup.update_block_keys"
+        ],
+        "on_trash": [
+            "umt.cache.bump_version",
+            "umt.search.remove_from_search_index",
+            "umt.search.remove_from_autocomplete_index",
+            "umt.dedup.remove_block_keys"
+        ]
+    },
+    "Membership_Card": {
+        "on_update": [
+            "umt.cache.bump_version",
+            "umt.doctype.activity_entry.activity_entry.on_card_update",
+            "umt.verification.update_card_cache",
+            "umt.cohorts.on_card_change"
+        ],
+        "on_trash": [
+            "umt.cache.bump_version",
+            "umt.verification.update_card_cache",
+            "umt.cohorts.on_card_change"
+        ]
+    },
+    "Income_Entry": {
+        "on_submit": [
+            "umt.cache.bump_version",
+            "umt.doctype.activity_entry.activity_entry.on_income_submit"
+        ],
+        "on_cancel": [
+            "umt.cache.bump_version",
+            "umt.doctype.activity_entry.activity_entry.on_income_cancel"
+        ],
+        "on_trash": "umt.cache.bump_version"
+    },
+    "Expense_Entry": {
+        "on_submit": "umt.cache.bump_version",
+        "on_cancel": "umt.cache.bump_version",
+        "on_trash": "umt.cache.bump_version"
+    },
+    "Financial_Period": {
+        "on_submit": "umt.cache.bump_version",
+        "on_cancel": "umt.cache.bump_version"
     },
     "Payment Method": {
-        "on_update": "umt.doctype.payment_method.payment_method.on_update",
+        "on_update": [
+            "umt.doctype.payment_method.payment_method.on_update",
+            "umt.cache.bump_version"
+        ],
+        "on_trash": "umt.cache.bump_version"
+    },
+    # Doctypes behind the cached admin page fragments
+    "Academic Year": {
+        "on_update": [
+            "umt.cache.bump_version",
+            "umt.cohorts.on_academic_year_change"
+        ],
+        "on_trash": [
+            "umt.cache.bump_version",
+            "umt.cohorts.on_academic_year_change"
+        ]
+    },
+    "Role": {
+        "on_update": "umt.cache.bump_version",
+        "on_trash": "umt.cache.bump_version"
+    },
+    "User": {
+        "on_update": [
+            "umt.cache.bump_version",
+            "umt.permissions.clear_cache"
+        ],
+        "on_trash": "umt.cache.bump_version"
     },
     "Notification Settings": {
-        "on_update": "umt.doctype.notification_settings.notification_settings.on_update",
+        "on_update": [
+            "umt.doctype.notification_settings.notification_settings.on_update",
+            "umt.cache.bump_version"
+        ]
+    },
+    "Backup_File": {
+        "on_update": "umt.cache.bump_version",
+        "on_trash": "umt.cache.bump_version"
     }
 }
 
+# Link field search overrides
+standard_queries = {
+    "Member": "umt.search.member_query"
+}
+
 # Website Route Rules
 website_route_rules = [
     {"from_route": "/admin/settings", "to_route": "admin/settings"},
@@ -35,7 +124,11 @@ website_route_rules = [
 # Scheduled Tasks
 scheduler_events = {
     "daily": [
-        "umt.tasks.daily"
+        "umt.tasks.record_membership_metrics",
+        "umt.tasks.sync_backup_catalog"
+    ],
+    "daily_long": [
+        "umt.tasks.take_data_snapshot"
     ],
     "weekly": [
         "umt.tasks.weekly"
@@ -45,6 +138,13 @@ scheduler_events = {
     ]
 }
 
+# Catalog backups already on disk and journal postings made before the
+# ledger existed when the app is installed or migrated
+after_migrate = [
+    "umt.doctype.backup_file.backup_file.sync_backup_catalog",
+    "umt.doctype.gl_entry.gl_entry.ensure_ledger"
+]
+
 # DocType JS
 doctype_js = {
     "Member": "public/js/member.js",
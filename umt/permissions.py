@@ -0,0 +1,113 @@
+import functools
+
+import frappe
+from frappe import _
+
+# Access checks shared by the admin pages and their whitelisted methods.
+#
+# A user's roles come from frappe's cached role map (the "roles" redis hash,
+# cleared by frappe when a user's roles change) and are resolved once per
+# request into a frozenset kept on frappe.local, so every later check in the
+# same request is a set lookup.
+
+ADMIN_ROLES = frozenset({"System Manager"})
+FINANCE_ROLES = frozenset({"System Manager", "Finance Manager", "Finance User"})
+STRUCTURE_ROLES = frozenset({"System Manager", "Structure Manager", "HR Manager"})
+
+def get_request_cache(name):
+    """Dict stored on frappe.local, released with the request"""
+    cache = getattr(frappe.local, name, None)
+    if cache is None:
+        cache = {}
+        setattr(frappe.local, name, cache)
+    return cache
+
+def get_user_roles(user=None):
+    """Role set of `user` (default the session user), resolved once per request"""
+    user = user or frappe.session.user
+    role_sets = get_request_cache("umt_role_sets")
+    if user not in role_sets:
+        role_sets[user] = frozenset(frappe.get_roles(user))
+    return role_sets[user]
+
+def has_any_role(roles, user=None):
+    user = user or frappe.session.user
+    return user == "Administrator" or not get_user_roles(user).isdisjoint(roles)
+
+def has_doctype_permission(doctype, ptype="read", user=None):
+    """frappe.has_permission on a doctype, memoized for the request"""
+    user = user or frappe.session.user
+    checks = get_request_cache("umt_permission_checks")
+    key = (user, doctype, ptype)
+    if key not in checks:
+        checks[key] = bool(frappe.has_permission(doctype, ptype, user=user))
+    return checks[key]
+
+def clear_cache(doc=None, method=None):
+    """Forget the request's resolved roles, e.g. after a user's roles are changed"""
+    frappe.local.umt_role_sets = {}
+    frappe.local.umt_permission_checks = {}
+
+def is_admin(user=None):
+    return has_any_role(ADMIN_ROLES, user)
+
+def has_finance_access(user=None):
+    return has_any_role(FINANCE_ROLES, user)
+
+def has_structure_access(user=None):
+    return has_any_role(STRUCTURE_ROLES, user)
+
+def has_settings_access(user=None):
+    return has_doctype_permission("System Settings", "write", user)
+
+ACCESS_CHECKS = {
+    "admin": is_admin,
+    "finance": has_finance_access,
+    "structure": has_structure_access,
+    "settings": has_settings_access
+}
+
+def has_access(access, user=None):
+    return ACCESS_CHECKS[access](user)
+
+def check_access(access, message=None):
+    """Throw a PermissionError unless the session user has `access`"""
+    if not has_access(access):
+        frappe.throw(_(message or "غير مصرح لك بتنفيذ هذه العملية"), frappe.PermissionError)
+
+def require_access(access, message=None):
+    """Decorator for whitelisted methods: check `access` before running the method.
+
+    Apply it below @frappe.whitelist() so the checked function is the one
+    that is whitelisted. `message` is translated when the check fails.
+    """
+    if access not in ACCESS_CHECKS:
+        raise ValueError(f"Unknown access {access}")
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            check_access(access, message)
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def page_access(access, message=None):
+    """Decorator for a page's get_context: guests are sent to the login page,
+    other users without `access` get a PermissionError"""
+    if access not in ACCESS_CHECKS:
+        raise ValueError(f"Unknown access {access}")
+
+    def decorator(get_context):
+        @functools.wraps(get_context)
+        def wrapper(context, *args, **kwargs):
+            if frappe.session.user == "Guest":
+                request = getattr(frappe.local, "request", None)
+                frappe.local.flags.redirect_location = "/login" + (
+                    f"?redirect-to={request.path}" if request else "")
+                raise frappe.Redirect
+            check_access(access, message)
+            context.no_cache = 1
+            return get_context(context, *args, **kwargs)
+        return wrapper
+    return decorator
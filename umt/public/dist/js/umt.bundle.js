@@ -1,2 +0,0 @@
-// UMT Bundle
-frappe.provide("umt");
@@ -0,0 +1,16 @@
+// UMT core: shared by the UMT web pages and loaded before their page bundle
+frappe.provide('umt');
+
+$.extend(umt, {
+    datatable_language: {
+        url: '//cdn.datatables.net/plug-ins/1.10.24/i18n/Arabic.json'
+    },
+
+    datatable: function(selector, options) {
+        return $(selector).DataTable(Object.assign({
+            pageLength: 25,
+            dom: 'rtip',
+            language: umt.datatable_language
+        }, options));
+    }
+});
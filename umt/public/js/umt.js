@@ -1,8 +0,0 @@
-// UMT JavaScript Bundle
-frappe.provide('umt');
-
-umt = {
-    init: function() {
-        // Initialize UMT specific functionality
-    }
-};
@@ -0,0 +1,38 @@
+// umt_admin_dashboard: scripts of /admin/dashboard
+
+// frappe.Chart is only part of the desk bundle, web pages import the chart themselves
+import { Chart } from "frappe-charts/dist/frappe-charts.esm";
+
+function loadTrends(interval) {
+    frappe.call({
+        method: 'umt.www.admin.dashboard.get_membership_trends',
+        args: { interval: interval || 'month' },
+        callback: function(r) {
+            if (!r.message) return;
+
+            new Chart('#membership-trends', {
+                type: 'line',
+                height: 250,
+                data: {
+                    labels: r.message.members.map(d => d.date),
+                    datasets: [
+                        { name: __("مجموع الأعضاء"), values: r.message.members.map(d => d.value) },
+                        { name: __("البطاقات النشطة"), values: r.message.active_cards.map(d => d.value) }
+                    ]
+                }
+            });
+        }
+    });
+}
+
+frappe.ready(function() {
+    loadTrends('month');
+});
+
+// called from onclick/onchange attributes in the page templates, the bundle
+// itself is wrapped in a function scope by esbuild
+frappe.provide('umt.dashboard');
+
+$.extend(umt.dashboard, {
+    loadTrends
+});
@@ -0,0 +1,123 @@
+// umt_admin_finance: scripts of /admin/finance
+
+frappe.ready(function() {
+    // Initialize DataTable
+    var table = umt.datatable('#transactionsTable', { order: [[1, 'desc']] });
+
+    // Handle filters
+    $('#typeFilter, #yearFilter, #statusFilter').on('change', function() {
+        table.draw();
+    });
+
+    $('#dateFrom, #dateTo').on('change', function() {
+        table.draw();
+    });
+
+    // Custom filtering function
+    $.fn.dataTable.ext.search.push(function(settings, data, dataIndex) {
+        var type = $('#typeFilter').val();
+        var year = $('#yearFilter').val();
+        var status = $('#statusFilter').val();
+        var dateFrom = $('#dateFrom').val();
+        var dateTo = $('#dateTo').val();
+
+        var rowDate = new Date(data[1]);
+        var filterDateFrom = dateFrom ? new Date(dateFrom) : null;
+        var filterDateTo = dateTo ? new Date(dateTo) : null;
+
+        if (
+            (type === "" || data[2] === type) &&
+            (status === "" || data[6].includes(status)) &&
+            (!filterDateFrom || rowDate >= filterDateFrom) &&
+            (!filterDateTo || rowDate <= filterDateTo)
+        ) {
+            return true;
+        }
+        return false;
+    });
+});
+
+function showTransactionForm(type) {
+    $('#transactionType').val(type);
+    $('#modalTitle').text(type === 'income' ? __('مدخول جديد') : __('مصروف جديد'));
+    $('#transactionForm')[0].reset();
+    $('#transactionModal').modal('show');
+}
+
+function saveTransaction() {
+    var formData = new FormData($('#transactionForm')[0]);
+
+    frappe.call({
+        method: 'umt.umt.www.admin.finance.save_transaction',
+        args: {
+            data: Object.fromEntries(formData)
+        },
+        callback: function(r) {
+            if (!r.exc) {
+                frappe.show_alert({
+                    message: __('تم حفظ المعاملة بنجاح'),
+                    indicator: 'green'
+                });
+                $('#transactionModal').modal('hide');
+                location.reload();
+            }
+        }
+    });
+}
+
+function viewTransaction(name) {
+    window.location.href = '/admin/finance/transaction/' + name;
+}
+
+function approveTransaction(name) {
+    updateTransactionStatus(name, 'Approved');
+}
+
+function rejectTransaction(name) {
+    updateTransactionStatus(name, 'Rejected');
+}
+
+function updateTransactionStatus(name, status) {
+    frappe.call({
+        method: 'umt.umt.www.admin.finance.update_transaction_status',
+        args: {
+            name: name,
+            status: status
+        },
+        callback: function(r) {
+            if (!r.exc) {
+                frappe.show_alert({
+                    message: __('تم تحديث حالة المعاملة'),
+                    indicator: 'green'
+                });
+                location.reload();
+            }
+        }
+    });
+}
+
+function exportTransactions() {
+    var filters = {
+        type: $('#typeFilter').val(),
+        year: $('#yearFilter').val(),
+        status: $('#statusFilter').val(),
+        date_from: $('#dateFrom').val(),
+        date_to: $('#dateTo').val()
+    };
+
+    window.location.href = '/api/method/umt.umt.www.admin.finance.export_transactions?' + 
+        $.param(filters);
+}
+
+// called from onclick/onchange attributes in the page templates, the bundle
+// itself is wrapped in a function scope by esbuild
+frappe.provide('umt.finance');
+
+$.extend(umt.finance, {
+    showTransactionForm,
+    saveTransaction,
+    viewTransaction,
+    approveTransaction,
+    rejectTransaction,
+    exportTransactions
+});
@@ -0,0 +1,199 @@
+// umt_admin_members: scripts of /admin/members
+
+var table;
+
+frappe.ready(function() {
+    // Initialize DataTable
+    table = umt.datatable('#membersTable');
+
+    // Handle filters
+    $('#provinceFilter, #statusFilter, #yearFilter').on('change', function() {
+        table.draw();
+    });
+
+    $('#searchInput').on('keyup', function() {
+        table.search(this.value).draw();
+    });
+
+    // Custom filtering function
+    $.fn.dataTable.ext.search.push(function(settings, data, dataIndex) {
+        var province = $('#provinceFilter').val();
+        var status = $('#statusFilter').val();
+        var year = $('#yearFilter').val();
+
+        if (
+            (province === "" || data[2] === province) &&
+            (status === "" || data[3].includes(status)) &&
+            (year === "" || true) // Add year filtering logic if needed
+        ) {
+            return true;
+        }
+        return false;
+    });
+});
+
+// Server rendered pagination links
+function changePage(page) {
+    table.page(page - 1).draw('page');
+    $('.pagination .page-item').removeClass('active').eq(page - 1).addClass('active');
+    return false;
+}
+
+// Member management functions
+function showNewMemberForm() {
+    $('#memberForm')[0].reset();
+    $('#memberModal').modal('show');
+}
+
+function saveMember() {
+    var formData = new FormData($('#memberForm')[0]);
+
+    frappe.call({
+        method: 'umt.umt.www.admin.members.save_member',
+        args: {
+            data: Object.fromEntries(formData)
+        },
+        callback: function(r) {
+            if (!r.exc) {
+                frappe.show_alert({
+                    message: __('تم حفظ العضو بنجاح'),
+                    indicator: 'green'
+                });
+                $('#memberModal').modal('hide');
+                location.reload();
+            }
+        }
+    });
+}
+
+function viewMember(name) {
+    window.location.href = '/admin/members/' + name;
+}
+
+function editMember(name) {
+    frappe.call({
+        method: 'umt.umt.www.admin.members.get_member',
+        args: { name: name },
+        callback: function(r) {
+            if (!r.exc) {
+                var member = r.message;
+                // Populate form
+                $('#memberForm [name="full_name"]').val(member.full_name);
+                $('#memberForm [name="province"]').val(member.province);
+                // Add more fields
+
+                $('#memberModal').modal('show');
+            }
+        }
+    });
+}
+
+function deleteMember(name) {
+    frappe.confirm(
+        __('هل أنت متأكد من حذف هذا العضو؟'),
+        function() {
+            frappe.call({
+                method: 'umt.umt.www.admin.members.delete_member',
+                args: { name: name },
+                callback: function(r) {
+                    if (!r.exc) {
+                        frappe.show_alert({
+                            message: __('تم حذف العضو بنجاح'),
+                            indicator: 'green'
+                        });
+                        location.reload();
+                    }
+                }
+            });
+        }
+    );
+}
+
+function exportMembers() {
+    var filters = {
+        province: $('#provinceFilter').val(),
+        status: $('#statusFilter').val(),
+        year: $('#yearFilter').val()
+    };
+
+    window.location.href = '/api/method/umt.umt.www.admin.members.export_members?' + 
+        $.param(filters);
+}
+
+// Cards of the selected province and academic year, rendered by a background job
+function printCards() {
+    frappe.prompt([
+        {
+            fieldname: 'payment_status',
+            fieldtype: 'Select',
+            label: __('حالة الأداء'),
+            options: ['', 'المؤداة', 'غير المؤداة']
+        },
+        {
+            fieldname: 'output_format',
+            fieldtype: 'Select',
+            label: __('الصيغة'),
+            options: [
+                { value: 'pdf', label: __('ملف PDF واحد') },
+                { value: 'zip', label: __('ملف ZIP لكل بطاقة') }
+            ],
+            default: 'pdf'
+        }
+    ], function(values) {
+        frappe.call({
+            method: 'umt.umt.www.admin.members.export_cards',
+            args: {
+                filters: {
+                    province: $('#provinceFilter').val(),
+                    academic_year: $('#yearFilter').val(),
+                    payment_status: values.payment_status
+                },
+                output_format: values.output_format
+            },
+            callback: function(r) {
+                if (r.message && r.message.success) {
+                    $('#printCardsBtn').prop('disabled', true);
+                    frappe.show_alert({ message: r.message.message, indicator: 'blue' });
+                    pollCardExport(r.message.job_id);
+                } else if (r.message) {
+                    frappe.msgprint(r.message.message);
+                }
+            }
+        });
+    }, __('طباعة البطاقات'), __('طباعة'));
+}
+
+function pollCardExport(job_id) {
+    frappe.call({
+        method: 'umt.umt.www.admin.members.get_card_export_status',
+        args: { job_id: job_id },
+        callback: function(r) {
+            var status = r.message;
+            if (status && status.status === 'Completed') {
+                $('#printCardsBtn').prop('disabled', false);
+                frappe.show_alert({ message: status.message, indicator: 'green' });
+                window.open(status.file_url);
+            } else if (status && status.status === 'Failed') {
+                $('#printCardsBtn').prop('disabled', false);
+                frappe.show_alert({ message: status.message, indicator: 'red' });
+            } else {
+                setTimeout(function() { pollCardExport(job_id); }, 2000);
+            }
+        }
+    });
+}
+
+// called from onclick/onchange attributes in the page templates, the bundle
+// itself is wrapped in a function scope by esbuild
+frappe.provide('umt.members');
+
+$.extend(umt.members, {
+    showNewMemberForm,
+    saveMember,
+    viewMember,
+    editMember,
+    deleteMember,
+    exportMembers,
+    printCards,
+    changePage
+});
@@ -0,0 +1,216 @@
+// umt_admin_settings: scripts of /admin/settings
+
+frappe.ready(function() {
+    // Initialize tooltips
+    $('[data-toggle="tooltip"]').tooltip();
+
+    // Panels other than the general and security tabs load when first shown
+    $('a[data-toggle="pill"]').on('shown.bs.tab', function() {
+        $($(this).attr('href')).find('.settings-panel').each(function() {
+            loadPanel($(this).attr('data-panel'));
+        });
+    });
+    $('.tab-pane.active .settings-panel').each(function() {
+        loadPanel($(this).attr('data-panel'));
+    });
+});
+
+// A panel is loaded once its HTML is in the page, not while the request runs
+var loadedPanels = {};
+var loadingPanels = {};
+
+function loadPanel(panel, reload) {
+    if (loadingPanels[panel] || (loadedPanels[panel] && !reload)) return;
+    loadingPanels[panel] = true;
+
+    frappe.call({
+        method: 'umt.www.admin.settings.get_panel',
+        args: { panel: panel },
+        callback: function(r) {
+            loadingPanels[panel] = false;
+            if (r.message) {
+                $(`.settings-panel[data-panel="${panel}"]`).html(r.message.html);
+                loadedPanels[panel] = true;
+            }
+        },
+        error: function() {
+            loadingPanels[panel] = false;
+        }
+    });
+}
+
+function saveAllSettings() {
+    var settings = {
+        general: getFormData('#generalForm'),
+        security: getFormData('#securityForm')
+    };
+
+    // unloaded notification switches must not be saved as all disabled
+    if (loadedPanels.notifications) {
+        settings.notifications = getNotificationSettings();
+    }
+
+    frappe.call({
+        method: 'umt.umt.www.admin.settings.save_settings',
+        args: { settings: settings },
+        callback: function(r) {
+            if (!r.exc) {
+                frappe.show_alert({
+                    message: __('تم حفظ الإعدادات بنجاح'),
+                    indicator: 'green'
+                });
+            }
+        }
+    });
+}
+
+function getFormData(formId) {
+    var formData = new FormData($(formId)[0]);
+    return Object.fromEntries(formData);
+}
+
+function getNotificationSettings() {
+    var notifications = [];
+    $('input[name="notifications"]:checked').each(function() {
+        notifications.push($(this).attr('id').replace('notif_', ''));
+    });
+    return notifications;
+}
+
+function showPaymentMethodForm() {
+    $('#paymentMethodForm')[0].reset();
+    $('#paymentMethodModal').modal('show');
+}
+
+function savePaymentMethod() {
+    var formData = getFormData('#paymentMethodForm');
+
+    frappe.call({
+        method: 'umt.umt.www.admin.settings.save_payment_method',
+        args: { data: formData },
+        callback: function(r) {
+            if (!r.exc) {
+                frappe.show_alert({
+                    message: __('تم حفظ طريقة الدفع بنجاح'),
+                    indicator: 'green'
+                });
+                $('#paymentMethodModal').modal('hide');
+                loadPanel('payment', true);
+            }
+        }
+    });
+}
+
+function togglePaymentMethod(name) {
+    var enabled = $(`#method_${name}`).prop('checked');
+
+    frappe.call({
+        method: 'umt.umt.www.admin.settings.toggle_payment_method',
+        args: {
+            name: name,
+            enabled: enabled
+        },
+        callback: function(r) {
+            if (!r.exc) {
+                frappe.show_alert({
+                    message: __('تم تحديث حالة طريقة الدفع'),
+                    indicator: 'green'
+                });
+            }
+        }
+    });
+}
+
+function createBackup() {
+    frappe.call({
+        method: 'umt.umt.www.admin.settings.create_backup',
+        args: {
+            compression_mode: $('#backup_compression_mode').val(),
+            with_files: $('#backup_compression_mode').val() === 'Standard' ? 1 : 0
+        },
+        callback: function(r) {
+            if (r.message && r.message.success) {
+                $('#create_backup_btn').prop('disabled', true);
+                showBackupProgress({ progress: 0, message: r.message.message });
+                pollBackupStatus(r.message.job_id);
+            } else if (r.message) {
+                frappe.msgprint(r.message.message);
+            }
+        }
+    });
+}
+
+function showBackupProgress(status) {
+    $('.backup-progress').removeClass('d-none');
+    $('.backup-progress-message').text(status.message || '');
+    $('.backup-progress .progress-bar').css('width', status.progress + '%');
+}
+
+// Progress is also pushed over realtime; polling covers pages without a socket
+function pollBackupStatus(job_id) {
+    frappe.call({
+        method: 'umt.umt.www.admin.settings.get_backup_status',
+        callback: function(r) {
+            var status = r.message;
+            if (!status || status.job_id !== job_id) {
+                return setTimeout(function() { pollBackupStatus(job_id); }, 2000);
+            }
+
+            showBackupProgress(status);
+
+            if (status.status === 'Completed') {
+                frappe.show_alert({ message: status.message, indicator: 'green' });
+                $('#create_backup_btn').prop('disabled', false);
+                loadPanel('backup', true);
+            } else if (status.status === 'Failed') {
+                frappe.show_alert({ message: status.message, indicator: 'red' });
+                $('#create_backup_btn').prop('disabled', false);
+            } else {
+                setTimeout(function() { pollBackupStatus(job_id); }, 2000);
+            }
+        }
+    });
+}
+
+if (frappe.realtime) {
+    frappe.realtime.on('umt_backup_progress', showBackupProgress);
+}
+
+function downloadBackup(name) {
+    window.location.href = '/api/method/umt.umt.www.admin.settings.download_backup?name=' + name;
+}
+
+function deleteBackup(name) {
+    frappe.confirm(
+        __('هل أنت متأكد من حذف هذه النسخة الاحتياطية؟'),
+        function() {
+            frappe.call({
+                method: 'umt.umt.www.admin.settings.delete_backup',
+                args: { name: name },
+                callback: function(r) {
+                    if (!r.exc) {
+                        frappe.show_alert({
+                            message: __('تم حذف النسخة الاحتياطية بنجاح'),
+                            indicator: 'green'
+                        });
+                        loadPanel('backup', true);
+                    }
+                }
+            });
+        }
+    );
+}
+
+// called from onclick/onchange attributes in the page templates, the bundle
+// itself is wrapped in a function scope by esbuild
+frappe.provide('umt.settings');
+
+$.extend(umt.settings, {
+    saveAllSettings,
+    showPaymentMethodForm,
+    savePaymentMethod,
+    togglePaymentMethod,
+    createBackup,
+    downloadBackup,
+    deleteBackup
+});
@@ -0,0 +1,210 @@
+// umt_admin_structure: scripts of /admin/structure
+
+frappe.ready(function() {
+    initializeTree();
+    initializeDataTables();
+});
+
+function initializeTree() {
+    $('#organizationTree').jstree({
+        'core': {
+            'data': JSON.parse(document.getElementById('organization-tree-data').textContent),
+            'themes': {
+                'name': 'default',
+                'responsive': true
+            }
+        },
+        'plugins': ['types', 'dnd', 'search']
+    }).on('select_node.jstree', function(e, data) {
+        viewStructure(data.node.id);
+    });
+}
+
+function initializeDataTables() {
+    umt.datatable('#provincesTable', { pageLength: 10 });
+}
+
+function expandAll() {
+    $('#organizationTree').jstree('open_all');
+}
+
+function collapseAll() {
+    $('#organizationTree').jstree('close_all');
+}
+
+function showStructureForm() {
+    loadParentStructures();
+    $('#structureModal').modal('show');
+}
+
+function loadParentStructures() {
+    frappe.call({
+        method: 'umt.umt.www.admin.structure.get_parent_structures',
+        callback: function(r) {
+            if (!r.exc) {
+                var select = $('#parentStructure');
+                select.empty();
+                select.append(`<option value="">${__("لا يوجد")}</option>`);
+                r.message.forEach(function(structure) {
+                    select.append(`<option value="${structure.name}">${structure.title}</option>`);
+                });
+            }
+        }
+    });
+}
+
+function saveStructure() {
+    var formData = new FormData($('#structureForm')[0]);
+
+    frappe.call({
+        method: 'umt.umt.www.admin.structure.save_structure',
+        args: {
+            data: Object.fromEntries(formData)
+        },
+        callback: function(r) {
+            if (!r.exc) {
+                frappe.show_alert({
+                    message: __('تم حفظ الهيكل بنجاح'),
+                    indicator: 'green'
+                });
+                $('#structureModal').modal('hide');
+                location.reload();
+            }
+        }
+    });
+}
+
+function showRoleForm() {
+    $('#roleForm')[0].reset();
+    $('#roleModal').modal('show');
+}
+
+function saveRole() {
+    var formData = new FormData($('#roleForm')[0]);
+    var permissions = [];
+    $('input[name="permissions"]:checked').each(function() {
+        permissions.push($(this).val());
+    });
+    formData.append('permissions', JSON.stringify(permissions));
+
+    frappe.call({
+        method: 'umt.umt.www.admin.structure.save_role',
+        args: {
+            data: Object.fromEntries(formData)
+        },
+        callback: function(r) {
+            if (!r.exc) {
+                frappe.show_alert({
+                    message: __('تم حفظ الدور بنجاح'),
+                    indicator: 'green'
+                });
+                $('#roleModal').modal('hide');
+                location.reload();
+            }
+        }
+    });
+}
+
+// Province Management Functions
+function viewProvince(name) {
+    window.location.href = '/admin/structure/province/' + name;
+}
+
+function editProvince(name) {
+    frappe.call({
+        method: 'umt.umt.www.admin.structure.get_province',
+        args: { name: name },
+        callback: function(r) {
+            if (!r.exc) {
+                var province = r.message;
+                $('#structureForm [name="name"]').val(province.name);
+                $('#structureForm [name="type"]').val('province');
+                $('#structureForm [name="description"]').val(province.description);
+                $('#structureModal').modal('show');
+            }
+        }
+    });
+}
+
+function deleteProvince(name) {
+    frappe.confirm(
+        __('هل أنت متأكد من حذف هذا الإقليم؟'),
+        function() {
+            frappe.call({
+                method: 'umt.umt.www.admin.structure.delete_province',
+                args: { name: name },
+                callback: function(r) {
+                    if (!r.exc) {
+                        frappe.show_alert({
+                            message: __('تم حذف الإقليم بنجاح'),
+                            indicator: 'green'
+                        });
+                        location.reload();
+                    }
+                }
+            });
+        }
+    );
+}
+
+// Role Management Functions
+function editRole(name) {
+    frappe.call({
+        method: 'umt.umt.www.admin.structure.get_role',
+        args: { name: name },
+        callback: function(r) {
+            if (!r.exc) {
+                var role = r.message;
+                $('#roleForm [name="role_name"]').val(role.name);
+                $('#roleForm [name="description"]').val(role.description);
+
+                // Set permissions
+                $('input[name="permissions"]').prop('checked', false);
+                role.permissions.forEach(function(perm) {
+                    $(`#perm_${perm}`).prop('checked', true);
+                });
+
+                $('#roleModal').modal('show');
+            }
+        }
+    });
+}
+
+function deleteRole(name) {
+    frappe.confirm(
+        __('هل أنت متأكد من حذف هذا الدور؟'),
+        function() {
+            frappe.call({
+                method: 'umt.umt.www.admin.structure.delete_role',
+                args: { name: name },
+                callback: function(r) {
+                    if (!r.exc) {
+                        frappe.show_alert({
+                            message: __('تم حذف الدور بنجاح'),
+                            indicator: 'green'
+                        });
+                        location.reload();
+                    }
+                }
+            });
+        }
+    );
+}
+
+// called from onclick/onchange attributes in the page templates, the bundle
+// itself is wrapped in a function scope by esbuild
+frappe.provide('umt.structure');
+
+$.extend(umt.structure, {
+    expandAll,
+    collapseAll,
+    showStructureForm,
+    saveStructure,
+    showRoleForm,
+    saveRole,
+    viewProvince,
+    editProvince,
+    deleteProvince,
+    editRole,
+    deleteRole
+});
@@ -0,0 +1,30 @@
+// umt_portal: scripts of /member_portal
+
+frappe.ready(function() {
+    $('.load-more-activities').on('click', function() {
+        var button = $(this);
+        button.prop('disabled', true);
+
+        frappe.call({
+            method: 'umt.www.member_portal.get_activity_timeline',
+            args: { cursor: button.attr('data-cursor'), limit: 20 },
+            callback: function(r) {
+                if (r.exc || !r.message) return;
+
+                var list = $('.activity-list');
+                r.message.activities.forEach(function(activity) {
+                    $('<li>')
+                        .append($('<span class="activity-date">').text(activity.creation))
+                        .append($('<span class="activity-text">').text(activity.description))
+                        .appendTo(list);
+                });
+
+                if (r.message.next_cursor) {
+                    button.attr('data-cursor', r.message.next_cursor).prop('disabled', false);
+                } else {
+                    button.remove();
+                }
+            }
+        });
+    });
+});
@@ -0,0 +1,39 @@
+// umt_renewal: scripts of /renew_membership
+
+frappe.ready(function() {
+    // Handle payment method change
+    $('#paymentMethod').on('change', function() {
+        var method = $(this).val();
+        $('.payment-details').hide();
+        if (method === 'bank_transfer') {
+            $('#bankTransferDetails').show();
+        }
+    });
+
+    // Handle form submission
+    $('#renewalForm').on('submit', function(e) {
+        e.preventDefault();
+
+        var formData = new FormData(this);
+
+        frappe.call({
+            method: 'umt.umt.www.renew_membership.submit_renewal',
+            args: {
+                payment_method: formData.get('payment_method'),
+                transaction_ref: formData.get('transaction_ref'),
+                receipt: formData.get('receipt')
+            },
+            callback: function(r) {
+                if (!r.exc) {
+                    frappe.show_alert({
+                        message: __('تم تقديم طلب التجديد بنجاح'),
+                        indicator: 'green'
+                    });
+                    setTimeout(function() {
+                        window.location.href = '/member-portal';
+                    }, 2000);
+                }
+            }
+        });
+    });
+});
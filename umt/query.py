@@ -0,0 +1,67 @@
+import frappe
+from frappe.utils import get_first_day, get_last_day
+
+# Shared WHERE clause fragments for reports and admin pages.
+# Filter values are always passed to frappe.db.sql as bound %(name)s values and
+# never formatted into the SQL text; only column names, which come from code,
+# are. Fragments compare plain columns (no MONTH() or YEAR() wrappers) so the
+# date and province indexes stay usable.
+
+class Conditions:
+    """SQL conditions joined with AND, with the values they bind"""
+
+    def __init__(self, *conditions, **values):
+        self.conditions = list(conditions)
+        self.values = dict(values)
+
+    def add(self, condition, **values):
+        self.conditions.append(condition)
+        self.values.update(values)
+        return self
+
+    def sql(self):
+        return " AND ".join(f"({condition})" for condition in self.conditions) or "1=1"
+
+    def __str__(self):
+        return self.sql()
+
+def get_param(column, prefix=""):
+    """Bound value name for a column, e.g. `m.province` -> `m_province`"""
+    return prefix + column.replace(".", "_").replace("`", "")
+
+def equals(conditions, column, value):
+    if value:
+        param = get_param(column)
+        conditions.add(f"{column} = %({param})s", **{param: value})
+    return conditions
+
+def academic_year(conditions, value, column="academic_year"):
+    return equals(conditions, column, value)
+
+def province(conditions, value, column="province"):
+    return equals(conditions, column, value)
+
+def date_range(conditions, from_date=None, to_date=None, column="posting_date"):
+    if from_date:
+        param = get_param(column, "from_")
+        conditions.add(f"{column} >= %({param})s", **{param: from_date})
+    if to_date:
+        param = get_param(column, "to_")
+        conditions.add(f"{column} <= %({param})s", **{param: to_date})
+    return conditions
+
+def month(conditions, date, column="posting_date"):
+    """Restrict a date column to the month containing `date`"""
+    return date_range(conditions, get_first_day(date), get_last_day(date), column)
+
+def get_filter_conditions(filters, date_column="posting_date", alias="", base=None, with_province=False):
+    """Conditions for the usual academic year, date range and province report filters"""
+    filters = frappe._dict(filters or {})
+    conditions = Conditions(*([base] if base else []))
+
+    academic_year(conditions, filters.get("academic_year"), alias + "academic_year")
+    date_range(conditions, filters.get("from_date"), filters.get("to_date"), alias + date_column)
+    if with_province:
+        province(conditions, filters.get("province"), alias + "province")
+
+    return conditions
@@ -1,7 +1,22 @@
 import frappe
 from frappe import _
 from frappe.utils import flt
+from umt.cache import cached_report
+from umt.query import get_filter_conditions
+from umt.doctype.financial_period.financial_period import get_sealed_lines, INCOME
 
+INCOME_COLUMNS = {
+    "بطاقة الإنخراط": "card_income",
+    "مداخيل أخرى": "other_income"
+}
+
+EXPENSE_COLUMNS = {
+    "مصاريف إدارية": "admin_expenses",
+    "مصاريف الأنشطة": "activity_expenses",
+    "مصاريف أخرى": "other_expenses"
+}
+
+@cached_report("Financial Summary Report", depends_on=["Income_Entry", "Expense_Entry", "Financial_Period"])
 def execute(filters=None):
     columns = get_columns()
     data = get_data(filters)
@@ -70,22 +85,30 @@ def get_columns():
     ]
 
 def get_data(filters):
-    """Get report data based on filters"""
+    """Get report data based on filters.
+
+    Sealed months are read from Financial_Period snapshots, only the months that
+    are still open (or only partly covered by the date filters) are summed live.
+    """
+    filters = frappe._dict(filters or {})
+    totals = {}
+
+    sealed_ranges, sealed_lines = get_sealed_lines(
+        filters.get("from_date"), filters.get("to_date"), filters.get("academic_year")
+    )
+
+    for line in sealed_lines + get_live_lines(filters, sealed_ranges):
+        fieldname = INCOME_COLUMNS.get(line.entry_type) if line.category == INCOME \
+            else EXPENSE_COLUMNS.get(line.entry_type)
+        month = totals.setdefault(line.period, {})
+        if fieldname:
+            month[fieldname] = flt(month.get(fieldname)) + flt(line.amount)
+
     data = []
-    conditions = get_conditions(filters)
-    
-    # Get data by month
-    months = get_months(filters)
-    
-    for month in months:
-        row = {
-            "month": month,
-            "card_income": get_income(month, "بطاقة الإنخراط", conditions),
-            "other_income": get_income(month, "مداخيل أخرى", conditions),
-            "admin_expenses": get_expenses(month, "مصاريف إدارية", conditions),
-            "activity_expenses": get_expenses(month, "مصاريف الأنشطة", conditions),
-            "other_expenses": get_expenses(month, "مصاريف أخرى", conditions)
-        }
+    for month in sorted(totals):
+        row = {"month": month}
+        for fieldname in list(INCOME_COLUMNS.values()) + list(EXPENSE_COLUMNS.values()):
+            row[fieldname] = flt(totals[month].get(fieldname))
         
         # Calculate totals
         row["total_income"] = flt(row["card_income"]) + flt(row["other_income"])
@@ -158,63 +181,38 @@ def get_summary(data):
 
 def get_conditions(filters):
     """Build conditions based on filters"""
-    conditions = "docstatus = 1"
-    
-    if filters.get("academic_year"):
-        conditions += f" AND academic_year = '{filters.get('academic_year')}'"
-        
-    if filters.get("from_date"):
-        conditions += f" AND posting_date >= '{filters.get('from_date')}'"
-        
-    if filters.get("to_date"):
-        conditions += f" AND posting_date <= '{filters.get('to_date')}'"
-        
-    return conditions
+    return get_filter_conditions(filters, base="docstatus = 1")
 
-def get_months(filters):
-    """Get list of months based on filters"""
-    return frappe.db.sql("""
-        SELECT DISTINCT
-            DATE_FORMAT(posting_date, '%Y-%m') as month
-        FROM
-            `tabIncome_Entry`
-        WHERE
-            docstatus = 1
-            AND {conditions}
-        UNION
-        SELECT DISTINCT
-            DATE_FORMAT(posting_date, '%Y-%m') as month
-        FROM
-            `tabExpense_Entry`
-        WHERE
-            docstatus = 1
-            AND {conditions}
-        ORDER BY
-            month
-    """.format(conditions=get_conditions(filters)), as_dict=0)
-
-def get_income(month, type, conditions):
-    """Get income amount for a specific month and type"""
+def get_live_lines(filters, sealed_ranges=None):
+    """Get per-month, per-type totals for postings outside the sealed date ranges"""
+    conditions = get_conditions(filters)
+    
+    for idx, (sealed_from, sealed_to) in enumerate(sealed_ranges or []):
+        conditions.add(f"posting_date < %(sealed_from_{idx})s OR posting_date > %(sealed_to_{idx})s",
+            **{f"sealed_from_{idx}": sealed_from, f"sealed_to_{idx}": sealed_to})
+    
     return frappe.db.sql("""
         SELECT
+            DATE_FORMAT(posting_date, '%%Y-%%m') as period,
+            'Income' as category,
+            entry_type,
             IFNULL(SUM(amount), 0) as amount
         FROM
             `tabIncome_Entry`
         WHERE
-            DATE_FORMAT(posting_date, '%Y-%m') = %s
-            AND entry_type = %s
-            AND {conditions}
-    """.format(conditions=conditions), (month, type))[0][0]
-
-def get_expenses(month, type, conditions):
-    """Get expense amount for a specific month and type"""
-    return frappe.db.sql("""
+            {conditions}
+        GROUP BY
+            period, entry_type
+        UNION ALL
         SELECT
+            DATE_FORMAT(posting_date, '%%Y-%%m') as period,
+            'Expense' as category,
+            expense_type as entry_type,
             IFNULL(SUM(amount), 0) as amount
         FROM
             `tabExpense_Entry`
         WHERE
-            DATE_FORMAT(posting_date, '%Y-%m') = %s
-            AND expense_type = %s
-            AND {conditions}
-    """.format(conditions=conditions), (month, type))[0][0]
+            {conditions}
+        GROUP BY
+            period, expense_type
+    """.format(conditions=conditions.sql()), conditions.values, as_dict=1)
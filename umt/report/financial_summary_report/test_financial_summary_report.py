@@ -0,0 +1,101 @@
+import unittest
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, add_months, flt, get_first_day, getdate
+
+from umt.benchmarks import datagen
+from umt.benchmarks.report_queries import get_member_filters
+from umt.doctype.financial_period.financial_period import close_period, get_last_sealed_period, INCOME
+from umt.report.financial_summary_report.financial_summary_report import (
+    execute, INCOME_COLUMNS, EXPENSE_COLUMNS
+)
+
+class TestFinancialSummaryReport(FrappeTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        if get_last_sealed_period():
+            raise unittest.SkipTest("The site already has sealed financial periods")
+
+        frappe.local.conf.umt_disable_report_cache = 1
+        cls.academic_years = [frappe.get_doc("Academic Year", name)
+            for name in datagen.generate(scale=300, years=3)["academic_years"]]
+
+        # Seal the months up to the middle of the second year, the rest stays live
+        cls.sealed = []
+        month = get_first_day(cls.academic_years[0].start_date)
+        cls.sealed_until = add_days(add_months(cls.academic_years[1].start_date, 4), -1)
+        while getdate(month) < getdate(cls.sealed_until):
+            cls.sealed.append(close_period(month))
+            frappe.db.commit()
+            month = add_months(month, 1)
+
+    @classmethod
+    def tearDownClass(cls):
+        for period in reversed(getattr(cls, "sealed", [])):
+            period.reload()
+            period.cancel()
+            frappe.delete_doc("Financial_Period", period.name, force=True)
+        frappe.db.commit()
+
+        if hasattr(cls, "academic_years"):
+            datagen.cleanup()
+        frappe.local.conf.umt_disable_report_cache = 0
+        super().tearDownClass()
+
+    def get_filters(self):
+        first, second, last = self.academic_years[0], self.academic_years[1], self.academic_years[-1]
+        return [
+            # only sealed months, then sealed and live months together
+            {"from_date": first.start_date, "to_date": first.end_date},
+            {},
+            {"academic_year": second.name},
+            # months cut by the date filters are summed live even when sealed
+            {"from_date": add_days(first.start_date, 10), "to_date": add_days(second.start_date, 45)},
+            {"from_date": self.sealed_until},
+            {"to_date": add_days(self.sealed_until, -20), "academic_year": first.name},
+            {"from_date": second.start_date, "to_date": last.end_date, "academic_year": last.name}
+        ]
+
+    def test_sealed_periods_are_used(self):
+        self.assertTrue(self.sealed)
+        self.assertTrue(all(period.docstatus == 1 and period.lines for period in self.sealed))
+
+    def test_rows_match_reference(self):
+        for filters in self.get_filters():
+            _columns, data, _message, _chart, _summary = execute(filters)
+            self.assertEqual(normalize(data), get_reference_rows(frappe._dict(filters)), msg=filters)
+
+def normalize(data):
+    return [{key: flt(value, 2) if key != "month" else value for key, value in row.items()} for row in data]
+
+def get_reference_rows(filters):
+    """Rows summed from every submitted entry through frappe.get_all"""
+    totals = {}
+    for doctype, category, type_field in (
+            ("Income_Entry", INCOME, "entry_type"),
+            ("Expense_Entry", "Expense", "expense_type")):
+        entry_filters = get_member_filters(filters, docstatus=1)
+        if filters.get("academic_year"):
+            entry_filters["academic_year"] = filters.academic_year
+        if "membership_date" in entry_filters:
+            entry_filters["posting_date"] = entry_filters.pop("membership_date")
+
+        for entry in frappe.get_all(doctype, filters=entry_filters, fields=["posting_date", type_field, "amount"]):
+            month = totals.setdefault(entry.posting_date.strftime("%Y-%m"), {})
+            fieldname = (INCOME_COLUMNS if category == INCOME else EXPENSE_COLUMNS).get(entry.get(type_field))
+            if fieldname:
+                month[fieldname] = flt(month.get(fieldname)) + flt(entry.amount)
+
+    rows = []
+    for month in sorted(totals):
+        row = {"month": month}
+        for fieldname in list(INCOME_COLUMNS.values()) + list(EXPENSE_COLUMNS.values()):
+            row[fieldname] = flt(totals[month].get(fieldname))
+        row["total_income"] = row["card_income"] + row["other_income"]
+        row["total_expenses"] = row["admin_expenses"] + row["activity_expenses"] + row["other_expenses"]
+        row["balance"] = row["total_income"] - row["total_expenses"]
+        rows.append(row)
+
+    return normalize(rows)
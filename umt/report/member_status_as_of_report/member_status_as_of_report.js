@@ -0,0 +1,17 @@
+frappe.query_reports["Member Status As Of Report"] = {
+    filters: [
+        {
+            fieldname: "as_of",
+            label: __("في تاريخ"),
+            fieldtype: "Date",
+            default: frappe.datetime.get_today(),
+            reqd: 1
+        },
+        {
+            fieldname: "province",
+            label: __("الإقليم"),
+            fieldtype: "Link",
+            options: "Province"
+        }
+    ]
+};
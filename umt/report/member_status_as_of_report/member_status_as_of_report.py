@@ -0,0 +1,92 @@
+import frappe
+from frappe import _
+from frappe.utils import cint, getdate, today
+from umt.cache import cached_report
+from umt.status_engine import (
+    get_member_status_counts, get_card_status_counts,
+    STATUSES, ACTIVE, INACTIVE, EXPIRED, NOT_RENEWED
+)
+
+@cached_report("Member Status As Of Report", depends_on=["Member", "Membership_Card"])
+def execute(filters=None):
+    filters = frappe._dict(filters or {})
+    as_of = getdate(filters.get("as_of") or today())
+    
+    return get_columns(), get_data(as_of, filters.get("province"))
+
+def get_columns():
+    """Return columns for the report"""
+    return [
+        {
+            "fieldname": "province",
+            "label": _("الإقليم"),
+            "fieldtype": "Link",
+            "options": "Province",
+            "width": 150
+        },
+        {
+            "fieldname": "total_members",
+            "label": _("مجموع الأعضاء"),
+            "fieldtype": "Int",
+            "width": 120
+        },
+        {
+            "fieldname": "active_members",
+            "label": _("الأعضاء النشطاء"),
+            "fieldtype": "Int",
+            "width": 120
+        },
+        {
+            "fieldname": "inactive_members",
+            "label": _("الأعضاء غير النشطاء"),
+            "fieldtype": "Int",
+            "width": 120
+        },
+        {
+            "fieldname": "expired_members",
+            "label": _("العضويات المنتهية"),
+            "fieldtype": "Int",
+            "width": 120
+        },
+        {
+            "fieldname": "not_renewed_members",
+            "label": _("لم يجددوا بعد"),
+            "fieldtype": "Int",
+            "width": 120
+        },
+        {
+            "fieldname": "active_cards",
+            "label": _("البطاقات السارية"),
+            "fieldtype": "Int",
+            "width": 120
+        },
+        {
+            "fieldname": "expired_cards",
+            "label": _("البطاقات المنتهية"),
+            "fieldtype": "Int",
+            "width": 120
+        }
+    ]
+
+def get_data(as_of, province=None):
+    """Member and card status counts per province on `as_of`, from the status engine"""
+    members = get_member_status_counts(as_of, province)
+    cards = get_card_status_counts(as_of, province)
+    
+    empty = [0] * len(STATUSES)
+    data = []
+    for name in sorted(set(members) | set(cards)):
+        member_counts = members.get(name, empty)
+        card_counts = cards.get(name, empty)
+        data.append({
+            "province": name or _("غير محدد"),
+            "total_members": cint(sum(member_counts)),
+            "active_members": cint(member_counts[ACTIVE]),
+            "inactive_members": cint(member_counts[INACTIVE]),
+            "expired_members": cint(member_counts[EXPIRED]),
+            "not_renewed_members": cint(member_counts[NOT_RENEWED]),
+            "active_cards": cint(card_counts[ACTIVE]),
+            "expired_cards": cint(card_counts[EXPIRED])
+        })
+    
+    return data
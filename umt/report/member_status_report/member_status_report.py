@@ -1,6 +1,13 @@
 import frappe
 from frappe import _
+from frappe.utils import cint
+from umt.cache import cached_report
+from umt.query import get_filter_conditions
 
+PAID = "المؤداة"
+UNPAID = "غير المؤداة"
+
+@cached_report("Member Status Report", depends_on=["Member", "Membership_Card"])
 def execute(filters=None):
     columns = get_columns()
     data = get_data(filters)
@@ -13,8 +20,7 @@ def get_columns():
         {
             "fieldname": "province",
             "label": _("الإقليم"),
-            "fieldtype": "Link",
-            "options": "Province",
+            "fieldtype": "Data",
             "width": 150
         },
         {
@@ -58,20 +64,23 @@ def get_columns():
 def get_data(filters):
     """Get report data based on filters"""
     data = []
-    conditions = get_conditions(filters)
+    members = get_member_counts(filters)
+    cards = get_card_counts(filters)
     
     # Get data by province
-    provinces = frappe.get_all("Province", fields=["name"])
+    provinces = get_provinces()
+    provinces += sorted(province for province in members if province and province not in provinces)
     
     for province in provinces:
+        counts = members.get(province, {})
         row = {
-            "province": province.name,
-            "total_members": get_member_count(province.name, conditions),
-            "active_members": get_member_count(province.name, conditions + " AND membership_status = 'Active'"),
-            "inactive_members": get_member_count(province.name, conditions + " AND membership_status = 'Inactive'"),
-            "expired_members": get_member_count(province.name, conditions + " AND membership_status = 'Expired'"),
-            "paid_cards": get_card_count(province.name, conditions, "المؤداة"),
-            "unpaid_cards": get_card_count(province.name, conditions, "غير المؤداة")
+            "province": province,
+            "total_members": cint(counts.get("total_members")),
+            "active_members": cint(counts.get("active_members")),
+            "inactive_members": cint(counts.get("inactive_members")),
+            "expired_members": cint(counts.get("expired_members")),
+            "paid_cards": cint(cards.get((province, PAID))),
+            "unpaid_cards": cint(cards.get((province, UNPAID)))
         }
         data.append(row)
     
@@ -90,31 +99,48 @@ def get_data(filters):
     
     return data
 
-def get_conditions(filters):
-    """Build conditions based on filters"""
-    conditions = "1=1"
-    
-    if filters.get("academic_year"):
-        conditions += f" AND academic_year = '{filters.get('academic_year')}'"
-        
-    if filters.get("from_date"):
-        conditions += f" AND membership_date >= '{filters.get('from_date')}'"
-        
-    if filters.get("to_date"):
-        conditions += f" AND membership_date <= '{filters.get('to_date')}'"
-        
-    return conditions
+def get_provinces():
+    """Provinces offered by the Select field of Member"""
+    options = frappe.get_meta("Member").get_field("province").options or ""
+    return [province for province in options.split("\n") if province]
 
-def get_member_count(province, conditions):
-    """Get member count based on conditions"""
-    return frappe.db.count("Member", filters=f"province = '{province}' AND {conditions}")
+def get_conditions(filters, alias=""):
+    """Build conditions based on filters; Member has no academic year column"""
+    filters = frappe._dict(filters or {})
+    filters.pop("academic_year", None)
+    return get_filter_conditions(filters, date_column="membership_date", alias=alias)
 
-def get_card_count(province, conditions, payment_status):
-    """Get card count based on conditions and payment status"""
-    return frappe.db.count("Membership_Card",
-        filters=f"""
-            member IN (SELECT name FROM tabMember WHERE province = '{province}' AND {conditions})
-            AND payment_status = '{payment_status}'
-            AND status = 'Active'
-        """
-    )
+def get_member_counts(filters):
+    """Get member counts per province and status in one grouped query"""
+    conditions = get_conditions(filters)
+    
+    return {
+        row.province: row
+        for row in frappe.db.sql("""
+            SELECT
+                province,
+                COUNT(*) as total_members,
+                SUM(membership_status = 'Active') as active_members,
+                SUM(membership_status = 'Inactive') as inactive_members,
+                SUM(membership_status = 'Expired') as expired_members
+            FROM `tabMember`
+            WHERE {conditions}
+            GROUP BY province
+        """.format(conditions=conditions.sql()), conditions.values, as_dict=1)
+    }
+
+def get_card_counts(filters):
+    """Get active card counts per province and payment status in one grouped query"""
+    conditions = get_conditions(filters, alias="m.")
+    conditions.add("c.status = 'Active'")
+    
+    return {
+        (row.province, row.payment_status): row.count
+        for row in frappe.db.sql("""
+            SELECT m.province, c.payment_status, COUNT(*) as count
+            FROM `tabMembership_Card` c
+            INNER JOIN `tabMember` m ON m.name = c.member
+            WHERE {conditions}
+            GROUP BY m.province, c.payment_status
+        """.format(conditions=conditions.sql()), conditions.values, as_dict=1)
+    }
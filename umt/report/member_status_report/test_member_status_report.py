@@ -0,0 +1,42 @@
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from umt.benchmarks import datagen
+from umt.benchmarks.report_queries import get_reference_member_row
+from umt.report.member_status_report.member_status_report import execute
+
+class TestMemberStatusReport(FrappeTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        frappe.local.conf.umt_disable_report_cache = 1
+        cls.academic_years = datagen.generate(scale=300, years=3)["academic_years"]
+
+    @classmethod
+    def tearDownClass(cls):
+        datagen.cleanup()
+        frappe.local.conf.umt_disable_report_cache = 0
+        super().tearDownClass()
+
+    def get_filters(self):
+        first, last = [frappe.get_doc("Academic Year", name) for name in (self.academic_years[0], self.academic_years[-1])]
+        return [
+            {},
+            {"from_date": first.start_date, "to_date": first.end_date},
+            {"from_date": last.start_date},
+            {"to_date": first.end_date}
+        ]
+
+    def test_rows_match_reference(self):
+        for filters in self.get_filters():
+            _columns, data = execute(filters)
+            rows, total = data[:-1], data[-1] if data else None
+
+            for row in rows:
+                expected = get_reference_member_row(row["province"], frappe._dict(filters))
+                self.assertEqual({key: row[key] for key in expected}, expected, msg=(filters, row["province"]))
+
+            if total:
+                for key in ("total_members", "active_members", "inactive_members",
+                        "expired_members", "paid_cards", "unpaid_cards"):
+                    self.assertEqual(total[key], sum(row[key] for row in rows), msg=(filters, key))
@@ -0,0 +1,28 @@
+frappe.query_reports["Renewal Cohort Report"] = {
+    filters: [
+        {
+            fieldname: "academic_year",
+            label: __("السنة الدراسية"),
+            fieldtype: "Link",
+            options: "Academic Year",
+            default: frappe.defaults.get_default("current_academic_year"),
+            reqd: 1
+        },
+        {
+            fieldname: "province",
+            label: __("الإقليم"),
+            fieldtype: "Link",
+            options: "Province"
+        },
+        {
+            fieldname: "metric",
+            label: __("العرض"),
+            fieldtype: "Select",
+            options: [
+                { value: "Retention", label: __("نسبة الاحتفاظ") },
+                { value: "Members", label: __("عدد الأعضاء") }
+            ],
+            default: "Retention"
+        }
+    ]
+};
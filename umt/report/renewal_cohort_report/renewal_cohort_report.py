@@ -0,0 +1,134 @@
+import frappe
+from frappe import _
+from frappe.utils import cint, flt
+import numpy as np
+from umt.cohorts import get_cohorts, get_rates, ALL_PROVINCES
+
+# The cohort matrices are cached per academic year by umt.cohorts, with their
+# own per-year versions, so this report is not wrapped in cached_report.
+
+def execute(filters=None):
+    filters = frappe._dict(filters or {})
+    academic_year = filters.get("academic_year") or frappe.db.get_default("current_academic_year")
+    if not academic_year:
+        frappe.throw(_("يرجى اختيار السنة الدراسية"))
+
+    cohorts = get_cohorts(academic_year)
+    provinces = [filters.province] if filters.get("province") else [ALL_PROVINCES] + cohorts["provinces"]
+    counts = filters.get("metric") == "Members"
+
+    data = get_data(cohorts, provinces, counts)
+    matrices = cohorts["matrices"].get(filters.get("province") or ALL_PROVINCES)
+
+    return (get_columns(cohorts["years"], counts), data, None,
+        get_chart(cohorts["years"], matrices), get_summary(cohorts["years"], matrices))
+
+def get_columns(years, counts=False):
+    """Return columns for the report"""
+    columns = [
+        {
+            "fieldname": "province",
+            "label": _("الإقليم"),
+            "fieldtype": "Data",
+            "width": 150
+        },
+        {
+            "fieldname": "cohort",
+            "label": _("سنة الانخراط"),
+            "fieldtype": "Link",
+            "options": "Academic Year",
+            "width": 120
+        },
+        {
+            "fieldname": "cohort_size",
+            "label": _("عدد المنخرطين"),
+            "fieldtype": "Int",
+            "width": 120
+        }
+    ]
+
+    for idx, year in enumerate(years):
+        columns.append({
+            "fieldname": f"year_{idx}",
+            "label": year,
+            "fieldtype": "Int" if counts else "Percent",
+            "width": 110
+        })
+
+    return columns
+
+def get_data(cohorts, provinces, counts=False):
+    """One row per province and join year, with the cohort's members or retention in each year"""
+    data = []
+    for province in provinces:
+        matrices = cohorts["matrices"].get(province)
+        if not matrices:
+            continue
+
+        values = matrices["cohorts"] if counts else get_rates(matrices)["retention"]
+        sizes = np.diag(matrices["cohorts"])
+        for idx, year in enumerate(cohorts["years"]):
+            if not sizes[idx]:
+                continue
+
+            row = {
+                "province": _("جميع الأقاليم") if province is ALL_PROVINCES else province,
+                "cohort": year,
+                "cohort_size": cint(sizes[idx])
+            }
+            for col in range(idx, len(cohorts["years"])):
+                row[f"year_{col}"] = cint(values[idx, col]) if counts else flt(values[idx, col], 1)
+            data.append(row)
+
+    return data
+
+def get_chart(years, matrices):
+    """Generate chart data"""
+    if not matrices:
+        return None
+
+    rates = get_rates(matrices)
+    return {
+        "data": {
+            "labels": years[1:],
+            "datasets": [
+                {
+                    "name": _("نسبة التجديد"),
+                    "values": [flt(rate, 1) for rate in np.nan_to_num(rates["renewal"][1:])]
+                },
+                {
+                    "name": _("نسبة الانقطاع"),
+                    "values": [flt(rate, 1) for rate in np.nan_to_num(rates["churn"][1:])]
+                }
+            ]
+        },
+        "type": "line",
+        "colors": ["#28a745", "#dc3545"]
+    }
+
+def get_summary(years, matrices):
+    """Renewal and churn rates of the selected academic year"""
+    if not matrices or len(years) < 2:
+        return []
+
+    rates = get_rates(matrices)
+    renewal, churn = np.nan_to_num(rates["renewal"][-1]), np.nan_to_num(rates["churn"][-1])
+
+    return [
+        {
+            "value": cint(matrices["held"][-1]),
+            "label": _("الأعضاء المؤدون"),
+            "datatype": "Int"
+        },
+        {
+            "value": flt(renewal, 1),
+            "label": _("نسبة التجديد"),
+            "datatype": "Percent",
+            "indicator": "Green" if renewal >= 50 else "Red"
+        },
+        {
+            "value": flt(churn, 1),
+            "label": _("نسبة الانقطاع"),
+            "datatype": "Percent"
+        }
+    ]
@@ -1,8 +0,0 @@
-export default {
-    input: 'public/js/umt.js',
-    output: {
-        file: 'public/dist/js/umt.bundle.js',
-        format: 'iife',
-        name: 'umt'
-    }
-};
@@ -0,0 +1,345 @@
+import frappe
+from frappe.utils import cint, cstr
+import re
+
+from umt.cache import after_commit
+
+# Arabic letter variants folded onto a single form
+ARABIC_FOLDING = str.maketrans({
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+    "ؤ": "و", "ئ": "ي", "ى": "ي", "ة": "ه",
+    "٠": "0", "١": "1", "٢": "2", "٣": "3", "٤": "4",
+    "٥": "5", "٦": "6", "٧": "7", "٨": "8", "٩": "9"
+})
+
+# Harakat, tanween, superscript alef and tatweel
+ARABIC_MARKS = re.compile("[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED\u0640]")
+NON_WORD = re.compile(r"[\W_]+")
+NON_DIGIT = re.compile(r"\D+")
+
+# Ranking weight of a match per member field
+FIELD_WEIGHTS = {
+    "card_number": 8,
+    "phone": 6,
+    "full_name": 4,
+    "institution": 1
+}
+
+MIN_PREFIX_LENGTH = 3
+MAX_QUERY_WORDS = 5
+
+# Token rows read per query word. Rows come in token order from the
+# (token, member) index, so exact matches are read before longer tokens
+MAX_TOKEN_SCAN = 5000
+
+def normalize_arabic(text):
+    """Normalize text for matching: strip diacritics and tatweel, fold alef/hamza
+    variants, ta marbuta and alef maqsura, convert Arabic-Indic digits and lowercase."""
+    text = ARABIC_MARKS.sub("", cstr(text))
+    text = text.translate(ARABIC_FOLDING).lower()
+    return NON_WORD.sub(" ", text).strip()
+
+def normalize_phone(phone):
+    """Keep digits only and drop the international or trunk prefix"""
+    digits = NON_DIGIT.sub("", normalize_arabic(phone))
+    if digits.startswith("00212"):
+        digits = digits[5:]
+    elif digits.startswith("212"):
+        digits = digits[3:]
+    return digits.lstrip("0")
+
+def get_member_tokens(doc):
+    """Get (token, weight) pairs indexed for a member"""
+    tokens = {}
+
+    def add(token, weight):
+        if token and tokens.get(token, 0) < weight:
+            tokens[token] = weight
+
+    add(normalize_arabic(doc.get("card_number")).replace(" ", ""), FIELD_WEIGHTS["card_number"])
+    add(normalize_phone(doc.get("phone")), FIELD_WEIGHTS["phone"])
+
+    for fieldname in ("full_name", "institution"):
+        for word in normalize_arabic(doc.get(fieldname)).split():
+            add(word, FIELD_WEIGHTS[fieldname])
+
+    return tokens
+
+def update_search_index(doc, method=None):
+    """Member hook: rebuild the search tokens of a member"""
+    remove_from_search_index(doc)
+    insert_tokens({doc.name: get_member_tokens(doc)})
+
+def remove_from_search_index(doc, method=None):
+    """Member hook: drop the search tokens of a member"""
+    frappe.db.delete("Member_Search_Token", {"member": doc.name})
+
+def insert_tokens(member_tokens):
+    """Insert the tokens of several members in one statement"""
+    values = [
+        (frappe.generate_hash(length=12), member, token[:140], weight)
+        for member, tokens in member_tokens.items()
+        for token, weight in tokens.items()
+    ]
+
+    if values:
+        frappe.db.bulk_insert("Member_Search_Token", fields=["name", "member", "token", "weight"], values=values)
+
+def rebuild_search_index(batch_size=5000):
+    """Rebuild the token table for all members"""
+    frappe.db.sql("TRUNCATE `tabMember_Search_Token`")
+
+    last_name = ""
+    while True:
+        members = frappe.db.sql("""
+            SELECT name, full_name, card_number, phone, institution
+            FROM `tabMember`
+            WHERE name > %s
+            ORDER BY name
+            LIMIT %s
+        """, (last_name, batch_size), as_dict=1)
+
+        if not members:
+            break
+
+        insert_tokens({member.name: get_member_tokens(member) for member in members})
+        frappe.db.commit()
+        last_name = members[-1].name
+
+def search(query, limit=20):
+    """Rank members matching every word of `query` by weighted token matches.
+
+    Each query word is a prefix lookup on the (token, member) index, capped at
+    MAX_TOKEN_SCAN rows; exact token matches score twice as much as prefix
+    matches.
+    """
+    words = []
+    for word in normalize_arabic(query).split():
+        if word not in words and len(word) >= MIN_PREFIX_LENGTH:
+            words.append(word)
+    words = words[:MAX_QUERY_WORDS]
+
+    phone = normalize_phone(query)
+    if len(phone) >= 6 and phone not in words:
+        words = [phone]
+
+    if not words:
+        return []
+
+    subqueries = []
+    values = {"limit": min(cint(limit) or 20, 100)}
+
+    for idx, word in enumerate(words):
+        values[f"word_{idx}"] = word
+        values[f"prefix_{idx}"] = word + "%"
+        subqueries.append("""
+            SELECT member, {idx} as word_idx,
+                MAX(IF(token = %(word_{idx})s, 2, 1) * weight) as score
+            FROM (
+                SELECT member, token, weight
+                FROM `tabMember_Search_Token`
+                WHERE token LIKE %(prefix_{idx})s
+                ORDER BY token
+                LIMIT {scan}
+            ) tokens_{idx}
+            GROUP BY member
+        """.format(idx=idx, scan=MAX_TOKEN_SCAN))
+
+    matches = frappe.db.sql("""
+        SELECT member, SUM(score) as score
+        FROM ({subqueries}) matches
+        GROUP BY member
+        HAVING COUNT(*) = {word_count}
+        ORDER BY score DESC, member
+        LIMIT %(limit)s
+    """.format(subqueries=" UNION ALL ".join(subqueries), word_count=len(words)), values, as_dict=1)
+
+    if not matches:
+        return []
+
+    members = {
+        m.name: m
+        for m in frappe.get_all("Member",
+            filters={"name": ["in", [m.member for m in matches]]},
+            fields=["name", "full_name", "card_number", "phone", "institution", "province", "membership_status"]
+        )
+    }
+
+    results = []
+    for match in matches:
+        if match.member in members:
+            results.append({**members[match.member], "score": match.score})
+
+    return results
+
+@frappe.whitelist()
+def search_members(query, limit=20):
+    """Ranked member search over name, card number, phone and institution"""
+    frappe.has_permission("Member", "read", throw=True)
+    return search(query, limit)
+
+# Link field autocomplete served from redis sorted sets.
+# Every set holds entries "<normalized key>\0<member>\0<label>" with score 0, so
+# ZRANGEBYLEX returns prefix matches in key order without touching the database.
+
+AUTOCOMPLETE_KEY = "umt_member_autocomplete:{0}"
+AUTOCOMPLETE_SETS = ("card_number", "phone", "full_name")
+AUTOCOMPLETE_SEPARATOR = "\0"
+
+def get_autocomplete_entries(doc):
+    """Get the (set, entry) pairs indexed for a member"""
+    label = cstr(doc.get("full_name"))
+    keys = {
+        "card_number": [normalize_arabic(doc.get("card_number")).replace(" ", "")],
+        "phone": [normalize_phone(doc.get("phone"))],
+        "full_name": []
+    }
+
+    name = normalize_arabic(doc.get("full_name"))
+    if name:
+        # Full name plus every suffix starting at a word, so "الزهراء" finds "فاطمه الزهراء"
+        words = name.split()
+        keys["full_name"] = [" ".join(words[idx:]) for idx in range(len(words))]
+
+    return [
+        (set_name, AUTOCOMPLETE_SEPARATOR.join((key, doc.name, label)))
+        for set_name, set_keys in keys.items()
+        for key in set_keys if key
+    ]
+
+def update_autocomplete_index(doc, method=None):
+    """Member hook: replace the member's autocomplete entries once the save commits"""
+    previous = doc.get_doc_before_save()
+    removed = get_autocomplete_entries(previous) if previous else []
+    after_commit(apply_autocomplete_changes, removed, get_autocomplete_entries(doc))
+
+def remove_from_autocomplete_index(doc, method=None):
+    """Member hook: drop the member's autocomplete entries once the delete commits"""
+    after_commit(apply_autocomplete_changes, get_autocomplete_entries(doc), [])
+
+def apply_autocomplete_changes(removed, added):
+    """Remove and add (set, entry) pairs in one pipeline.
+
+    Called after commit, so that saves which roll back leave no suggestions behind.
+    """
+    cache = frappe.cache()
+    pipeline = cache.pipeline()
+    for set_name, entry in removed:
+        pipeline.zrem(cache.make_key(AUTOCOMPLETE_KEY.format(set_name)), entry)
+    for set_name, entry in added:
+        pipeline.zadd(cache.make_key(AUTOCOMPLETE_KEY.format(set_name)), {entry: 0})
+    pipeline.execute()
+
+def rebuild_autocomplete_index(batch_size=10000):
+    """Rebuild all autocomplete sets from the Member table.
+
+    Sets are filled under temporary keys and swapped in with RENAME, so lookups
+    keep being served from the old sets during the rebuild.
+    """
+    cache = frappe.cache()
+    keys = {set_name: cache.make_key(AUTOCOMPLETE_KEY.format(set_name)) for set_name in AUTOCOMPLETE_SETS}
+    temp_keys = {set_name: f"{key}:rebuild" for set_name, key in keys.items()}
+    cache.delete(*temp_keys.values())
+
+    last_name = ""
+    while True:
+        members = frappe.db.sql("""
+            SELECT name, full_name, card_number, phone
+            FROM `tabMember`
+            WHERE name > %s
+            ORDER BY name
+            LIMIT %s
+        """, (last_name, batch_size), as_dict=1)
+
+        if not members:
+            break
+
+        entries = {set_name: {} for set_name in AUTOCOMPLETE_SETS}
+        for member in members:
+            for set_name, entry in get_autocomplete_entries(member):
+                entries[set_name][entry] = 0
+
+        pipeline = cache.pipeline()
+        for set_name, mapping in entries.items():
+            if mapping:
+                pipeline.zadd(temp_keys[set_name], mapping)
+        pipeline.execute()
+
+        last_name = members[-1].name
+
+    pipeline = cache.pipeline()
+    for set_name in AUTOCOMPLETE_SETS:
+        if cache.exists(temp_keys[set_name]):
+            pipeline.rename(temp_keys[set_name], keys[set_name])
+        else:
+            pipeline.delete(keys[set_name])
+    pipeline.execute()
+
+def autocomplete(txt, limit=20):
+    """Get (member, label) prefix matches on card number, phone and normalized name"""
+    cache = frappe.cache()
+    lookups = [
+        ("card_number", normalize_arabic(txt).replace(" ", "")),
+        ("phone", normalize_phone(txt)),
+        ("full_name", normalize_arabic(txt))
+    ]
+
+    pipeline = cache.pipeline()
+    for set_name, prefix in lookups:
+        prefix = prefix.encode()
+        pipeline.zrangebylex(
+            cache.make_key(AUTOCOMPLETE_KEY.format(set_name)),
+            b"[" + prefix, b"[" + prefix + b"\xff",
+            start=0, num=limit
+        )
+
+    results = []
+    seen = set()
+    for (set_name, prefix), entries in zip(lookups, pipeline.execute()):
+        if not prefix:
+            continue
+        for entry in entries:
+            _key, member, label = entry.decode().split(AUTOCOMPLETE_SEPARATOR)
+            if member not in seen:
+                seen.add(member)
+                results.append((member, label))
+
+    return results[:limit]
+
+def can_use_autocomplete():
+    """The index ignores permissions: only use it for users who can read every member"""
+    if not frappe.has_permission("Member", "read"):
+        return False
+
+    from frappe.permissions import get_user_permissions
+    if get_user_permissions(frappe.session.user):
+        return False
+
+    cache = frappe.cache()
+    return bool(cache.exists(cache.make_key(AUTOCOMPLETE_KEY.format("full_name"))))
+
+@frappe.whitelist()
+@frappe.validate_and_sanitize_search_inputs
+def member_query(doctype, txt, searchfield, start, page_len, filters):
+    """Link field search for Member, registered in `standard_queries`"""
+    page_len = cint(page_len) or 20
+
+    if not filters and not cint(start) and txt and can_use_autocomplete():
+        return autocomplete(txt, page_len)
+
+    # Filtered or paged lookups, restricted users, or an index that is not built yet
+    txt = cstr(txt)
+    return frappe.get_list("Member",
+        filters=filters,
+        or_filters=[
+            ["name", "like", f"{txt}%"],
+            ["card_number", "like", f"{txt}%"],
+            ["phone", "like", f"{txt}%"],
+            ["full_name", "like", f"%{txt}%"]
+        ],
+        fields=["name", "full_name"],
+        order_by="name",
+        limit_start=start,
+        limit_page_length=page_len,
+        as_list=True
+    )
@@ -0,0 +1,257 @@
+import frappe
+from frappe import _
+from frappe.utils import add_to_date, cint, flt, now_datetime, scrub
+import gzip
+import json
+import os
+import shutil
+import time
+
+# Incremental snapshots of the UMT doctypes.
+# A chain starts with a Full snapshot of every row; each Incremental snapshot
+# holds the rows modified since the previous one plus the deletions recorded
+# in Deleted Document. Rows are written as gzipped JSON lines, CHUNK_SIZE rows
+# per file, under private/snapshots/<snapshot>/.
+
+SNAPSHOT_DIR = "snapshots"
+SNAPSHOT_LOCK_KEY = "umt_snapshot_lock"
+SNAPSHOT_LOCK_TTL = 3 * 3600
+
+CHUNK_SIZE = 50000
+DELETE_BATCH_SIZE = 5000
+
+# A new Full snapshot is taken once a chain reaches this length
+MAX_CHAIN_LENGTH = 30
+
+# Rows committed late with an older `modified` are caught by re-reading this
+# margin; restoring a row twice is harmless
+WATERMARK_OVERLAP_MINUTES = 10
+
+# Rebuildable indexes and catalogs of files on this server
+EXCLUDED_DOCTYPES = ("Member_Search_Token", "Member_Block_Key", "Backup_File", "Data_Snapshot")
+
+# Doctypes pruned or replaced with frappe.db.delete, which leaves no Deleted
+# Document: each snapshot lists their live names so a restore drops the rest
+NAME_SYNC_DOCTYPES = ("Activity_Entry", "Membership_Metric", "Member_Duplicate")
+
+def get_snapshot_path(name=None):
+    path = frappe.get_site_path("private", SNAPSHOT_DIR)
+    return os.path.join(path, name) if name else path
+
+def get_snapshot_doctypes():
+    """UMT doctypes included in snapshots, parents before child tables"""
+    doctypes = frappe.get_all("DocType",
+        filters={"module": "UMT", "issingle": 0, "is_virtual": 0, "name": ["not in", EXCLUDED_DOCTYPES]},
+        fields=["name", "istable"],
+        order_by="istable, name"
+    )
+    return [d.name for d in doctypes]
+
+def get_last_snapshot():
+    snapshots = frappe.get_all("Data_Snapshot", fields=["name", "watermark"], order_by="watermark desc", limit=1)
+    return snapshots[0] if snapshots else None
+
+def get_chain(name=None):
+    """Get the snapshots to replay to restore `name` (defaults to the latest), oldest first"""
+    if not name:
+        latest = get_last_snapshot()
+        if not latest:
+            frappe.throw(_("لا توجد لقطات بيانات"))
+        name = latest.name
+
+    chain = []
+    while name:
+        snapshot = frappe.db.get_value("Data_Snapshot", name,
+            ["name", "snapshot_type", "base_snapshot", "watermark"], as_dict=1)
+        if not snapshot:
+            frappe.throw(_("اللقطة {0} غير موجودة").format(name))
+
+        chain.append(snapshot)
+        name = snapshot.base_snapshot if snapshot.snapshot_type == "Incremental" else None
+
+    return list(reversed(chain))
+
+def take_snapshot(full=False):
+    """Write a snapshot of the rows changed since the last one.
+
+    A Full snapshot is taken when asked, when there is no previous snapshot, or
+    when the chain reached MAX_CHAIN_LENGTH. Returns the Data_Snapshot name.
+    """
+    cache = frappe.cache()
+    lock_key = cache.make_key(SNAPSHOT_LOCK_KEY)
+    if not cache.set(lock_key, 1, nx=True, ex=SNAPSHOT_LOCK_TTL):
+        frappe.throw(_("توجد لقطة بيانات قيد الإنشاء"))
+
+    try:
+        return write_snapshot(full)
+    finally:
+        cache.delete(lock_key)
+
+def write_snapshot(full):
+    start = time.monotonic()
+    previous = get_last_snapshot()
+    max_chain_length = cint(frappe.conf.get("umt_snapshot_max_chain_length")) or MAX_CHAIN_LENGTH
+    full = full or not previous or len(get_chain(previous.name)) >= max_chain_length
+
+    snapshot = frappe.get_doc({
+        "doctype": "Data_Snapshot",
+        "snapshot_type": "Full" if full else "Incremental",
+        "base_snapshot": None if full else previous.name,
+        "since": None if full else add_to_date(previous.watermark, minutes=-WATERMARK_OVERLAP_MINUTES),
+        "watermark": now_datetime()
+    }).insert(ignore_permissions=True)
+
+    path = get_snapshot_path(snapshot.name)
+    os.makedirs(path, exist_ok=True)
+
+    try:
+        export_snapshot(snapshot, path, full)
+    except Exception:
+        shutil.rmtree(path, ignore_errors=True)
+        raise
+
+    snapshot.db_set("duration", flt(time.monotonic() - start, 2))
+    frappe.db.commit()
+
+    return snapshot.name
+
+def export_snapshot(snapshot, path, full):
+    doctypes = get_snapshot_doctypes()
+    manifest = {"snapshot_type": snapshot.snapshot_type, "doctypes": {}, "deleted": None, "names": {}}
+
+    for doctype in doctypes:
+        manifest["doctypes"][doctype] = export_doctype(doctype, path, snapshot.since, snapshot.watermark)
+
+    deleted_count = 0
+    if not full:
+        deleted = frappe.db.sql("""
+            SELECT deleted_doctype as doctype, deleted_name as name
+            FROM `tabDeleted Document`
+            WHERE creation > %s AND creation <= %s
+            AND deleted_doctype IN %s
+        """, (snapshot.since, snapshot.watermark, tuple(doctypes)), as_dict=1)
+
+        if deleted:
+            manifest["deleted"] = "deleted.jsonl.gz"
+            write_chunk(os.path.join(path, manifest["deleted"]), deleted)
+        deleted_count = len(deleted)
+
+        for doctype in NAME_SYNC_DOCTYPES:
+            if doctype in doctypes:
+                file_name = f"{scrub(doctype)}-names.jsonl.gz"
+                write_chunk(os.path.join(path, file_name), frappe.db.sql_list(f"SELECT name FROM `tab{doctype}`"))
+                manifest["names"][doctype] = file_name
+
+    with open(os.path.join(path, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=1)
+
+    snapshot.db_set({
+        "row_count": sum(d["rows"] for d in manifest["doctypes"].values()),
+        "deleted_count": deleted_count,
+        "chunk_count": sum(len(d["files"]) for d in manifest["doctypes"].values()),
+        "file_size": sum(entry.stat().st_size for entry in os.scandir(path))
+    })
+
+def export_doctype(doctype, path, since, watermark):
+    """Write rows with `since` < modified <= `watermark` in chunks, walking the modified index"""
+    conditions = "modified <= %(watermark)s" + (" AND modified > %(since)s" if since else "")
+    values = {"watermark": watermark, "since": since, "limit": CHUNK_SIZE}
+    page = ""
+
+    files, rows_written = [], 0
+    while True:
+        rows = frappe.db.sql("""
+            SELECT * FROM `tab{doctype}`
+            WHERE {conditions}{page}
+            ORDER BY modified, name
+            LIMIT %(limit)s
+        """.format(doctype=doctype, conditions=conditions, page=page), values, as_dict=1)
+
+        if not rows:
+            break
+
+        file_name = f"{scrub(doctype)}-{len(files):05d}.jsonl.gz"
+        write_chunk(os.path.join(path, file_name), rows)
+        files.append(file_name)
+        rows_written += len(rows)
+
+        if len(rows) < CHUNK_SIZE:
+            break
+
+        page = " AND (modified > %(last_modified)s OR (modified = %(last_modified)s AND name > %(last_name)s))"
+        values.update({"last_modified": rows[-1].modified, "last_name": rows[-1].name})
+
+    return {"rows": rows_written, "files": files}
+
+def write_chunk(path, rows):
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, default=str, ensure_ascii=False))
+            f.write("\n")
+
+def read_chunk(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def restore_snapshot(name=None):
+    """Replay the chain ending at snapshot `name` (defaults to the latest) onto this site.
+
+    The Full snapshot at the start of the chain replaces the UMT tables, each
+    increment then upserts its rows and applies its deletions. Search and
+    duplicate indexes must be rebuilt afterwards (umt-rebuild-member-index).
+    """
+    chain = get_chain(name)
+    for snapshot in chain:
+        apply_snapshot(snapshot.name)
+    return [snapshot.name for snapshot in chain]
+
+def apply_snapshot(name):
+    path = get_snapshot_path(name)
+    with open(os.path.join(path, "manifest.json")) as f:
+        manifest = json.load(f)
+
+    if manifest["snapshot_type"] == "Full":
+        for doctype in manifest["doctypes"]:
+            frappe.db.delete(doctype)
+
+    # Deletions go first: a row deleted then created again under the same name
+    # within the window is restored by the upserts below
+    if manifest.get("deleted"):
+        for row in read_chunk(os.path.join(path, manifest["deleted"])):
+            if frappe.db.table_exists(row["doctype"]):
+                frappe.db.delete(row["doctype"], {"name": row["name"]})
+                for df in frappe.get_meta(row["doctype"]).get_table_fields():
+                    frappe.db.delete(df.options, {"parent": row["name"], "parenttype": row["doctype"]})
+
+    # Parents come before child tables in the manifest, so children removed
+    # with their parent row below are re-inserted from the child chunks
+    for doctype, info in manifest["doctypes"].items():
+        child_doctypes = [df.options for df in frappe.get_meta(doctype).get_table_fields()]
+        columns = set(frappe.db.get_table_columns(doctype))
+
+        for file_name in info["files"]:
+            replace_rows(doctype, read_chunk(os.path.join(path, file_name)), columns, child_doctypes)
+
+    for doctype, file_name in (manifest.get("names") or {}).items():
+        live_names = set(read_chunk(os.path.join(path, file_name)))
+        stale = [name for name in frappe.db.sql_list(f"SELECT name FROM `tab{doctype}`") if name not in live_names]
+        for idx in range(0, len(stale), DELETE_BATCH_SIZE):
+            frappe.db.delete(doctype, {"name": ["in", stale[idx:idx + DELETE_BATCH_SIZE]]})
+
+    frappe.db.commit()
+
+def replace_rows(doctype, rows, columns, child_doctypes=None):
+    """Delete then re-insert rows by name, keeping only columns the table still has"""
+    if not rows:
+        return
+
+    fields = [field for field in rows[0] if field in columns]
+    for idx in range(0, len(rows), DELETE_BATCH_SIZE):
+        batch = rows[idx:idx + DELETE_BATCH_SIZE]
+        names = [row["name"] for row in batch]
+
+        frappe.db.delete(doctype, {"name": ["in", names]})
+        for child_doctype in child_doctypes or []:
+            frappe.db.delete(child_doctype, {"parent": ["in", names], "parenttype": doctype})
+
+        frappe.db.bulk_insert(doctype, fields=fields, values=[tuple(row.get(field) for field in fields) for row in batch])
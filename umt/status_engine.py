@@ -0,0 +1,143 @@
+import frappe
+from frappe.utils import cint, getdate
+import numpy as np
+
+from umt.query import Conditions, equals
+
+# Membership and card statuses for any as-of date, computed in bulk.
+# Member.update_membership_status and MembershipCard.update_status evaluate one
+# document against today; the functions here apply the same rules
+# (get_membership_status and get_card_status) to NumPy date arrays, loaded in
+# chunks, so historical counts don't need the documents to be replayed.
+#
+# A member's renewal date on a past date is the issue date of their latest paid
+# card issued by then, which is what MembershipCard.on_update records as
+# last_renewal_date. is_active and cancellations are only known as they are now.
+
+PAID_STATUS = "المؤداة"
+CHUNK_SIZE = 50000
+
+STATUSES = ("Active", "Inactive", "Expired", "Cancelled", "Not Renewed")
+ACTIVE, INACTIVE, EXPIRED, CANCELLED, NOT_RENEWED = range(len(STATUSES))
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+def to_dates(values):
+    """datetime64[D] array of dates, date strings or None (NaT)"""
+    return np.array(values, dtype="datetime64[D]")
+
+def to_codes(statuses):
+    return np.array([STATUS_CODES.get(status, NOT_RENEWED) for status in statuses], dtype=np.int8)
+
+def add_years(dates, years=1):
+    """frappe.utils.add_years on a date array: Feb 29 becomes Feb 28 outside leap years"""
+    months = dates.astype("datetime64[M]")
+    day_offsets = dates - months.astype("datetime64[D]")
+    shifted = months + 12 * years
+    month_lengths = (shifted + 1).astype("datetime64[D]") - shifted.astype("datetime64[D]")
+    return shifted.astype("datetime64[D]") + np.minimum(day_offsets, month_lengths - np.timedelta64(1, "D"))
+
+def member_statuses(renewal_dates, is_active, as_of, current=None):
+    """Status codes of members on `as_of`, as get_membership_status computes them.
+
+    Members without a renewal date keep their `current` status code, or get
+    NOT_RENEWED when no current statuses are given.
+    """
+    as_of = np.datetime64(getdate(as_of), "D")
+    expiry_dates = add_years(renewal_dates, 1)
+
+    statuses = np.where(as_of > expiry_dates, EXPIRED,
+        np.where(np.asarray(is_active, dtype=bool), ACTIVE, INACTIVE)).astype(np.int8)
+
+    never_renewed = np.isnat(renewal_dates)
+    statuses[never_renewed] = NOT_RENEWED if current is None else np.asarray(current)[never_renewed]
+    return statuses
+
+def card_statuses(expiry_dates, current, as_of):
+    """Status codes of cards on `as_of`, as get_card_status computes them"""
+    as_of = np.datetime64(getdate(as_of), "D")
+    current = np.asarray(current)
+    return np.where(expiry_dates < as_of, EXPIRED,
+        np.where(current == CANCELLED, CANCELLED, ACTIVE)).astype(np.int8)
+
+def iter_member_chunks(as_of, province=None, chunk_size=CHUNK_SIZE):
+    """Members who had joined by `as_of` with their renewal date on that day, in chunks"""
+    conditions = Conditions("COALESCE(m.membership_date, DATE(m.creation)) <= %(as_of)s", as_of=getdate(as_of))
+    equals(conditions, "m.province", province)
+    conditions.add("m.name > %(last_name)s")
+
+    last_name = ""
+    while True:
+        conditions.values["last_name"] = last_name
+        rows = frappe.db.sql("""
+            SELECT m.name, m.province, m.is_active, (
+                SELECT MAX(c.issue_date) FROM `tabMembership_Card` c
+                WHERE c.member = m.name AND c.payment_status = %(paid)s AND c.issue_date <= %(as_of)s
+            )
+            FROM `tabMember` m
+            WHERE {conditions}
+            ORDER BY m.name
+            LIMIT {limit}
+        """.format(conditions=conditions.sql(), limit=cint(chunk_size)), dict(conditions.values, paid=PAID_STATUS))
+
+        if not rows:
+            break
+
+        names, provinces, is_active, renewal_dates = zip(*rows)
+        yield frappe._dict(
+            provinces=np.array([province or "" for province in provinces], dtype=object),
+            is_active=np.array(is_active, dtype=bool),
+            renewal_dates=to_dates(renewal_dates)
+        )
+        last_name = names[-1]
+
+def iter_card_chunks(as_of, province=None, chunk_size=CHUNK_SIZE):
+    """Cards issued by `as_of` with their member's province, in chunks"""
+    conditions = Conditions("c.issue_date <= %(as_of)s", as_of=getdate(as_of))
+    equals(conditions, "m.province", province)
+    conditions.add("c.name > %(last_name)s")
+
+    last_name = ""
+    while True:
+        conditions.values["last_name"] = last_name
+        rows = frappe.db.sql("""
+            SELECT c.name, m.province, c.expiry_date, c.status
+            FROM `tabMembership_Card` c
+            INNER JOIN `tabMember` m ON m.name = c.member
+            WHERE {conditions}
+            ORDER BY c.name
+            LIMIT {limit}
+        """.format(conditions=conditions.sql(), limit=cint(chunk_size)), conditions.values)
+
+        if not rows:
+            break
+
+        names, provinces, expiry_dates, statuses = zip(*rows)
+        yield frappe._dict(
+            provinces=np.array([province or "" for province in provinces], dtype=object),
+            expiry_dates=to_dates(expiry_dates),
+            statuses=to_codes(statuses)
+        )
+        last_name = names[-1]
+
+def count_by_province(counts, provinces, statuses):
+    """Add a chunk's status counts to `counts` (province -> counts per status code)"""
+    keys, inverse = np.unique(provinces, return_inverse=True)
+    matrix = np.zeros((len(keys), len(STATUSES)), dtype=np.int64)
+    np.add.at(matrix, (inverse, statuses), 1)
+    for key, row in zip(keys, matrix):
+        counts[key] = counts[key] + row if key in counts else row
+    return counts
+
+def get_member_status_counts(as_of, province=None, chunk_size=CHUNK_SIZE):
+    """Member counts per province and status on `as_of`"""
+    counts = {}
+    for chunk in iter_member_chunks(as_of, province, chunk_size):
+        count_by_province(counts, chunk.provinces, member_statuses(chunk.renewal_dates, chunk.is_active, as_of))
+    return counts
+
+def get_card_status_counts(as_of, province=None, chunk_size=CHUNK_SIZE):
+    """Card counts per province and status on `as_of`"""
+    counts = {}
+    for chunk in iter_card_chunks(as_of, province, chunk_size):
+        count_by_province(counts, chunk.provinces, card_statuses(chunk.expiry_dates, chunk.statuses, as_of))
+    return counts
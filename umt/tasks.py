@@ -1,14 +1,44 @@
 import frappe
 from frappe import _
 
-def daily():
-    """Daily scheduled tasks"""
-    pass
+# Daily tasks are registered one by one in hooks.py so that each runs as its
+# own scheduled job: a failing task doesn't skip the others, and the snapshot
+# export gets the long queue and its timeout.
+
+def record_membership_metrics():
+    """Snapshot per-province member and card counts for trend dashboards"""
+    from umt.doctype.membership_metric.membership_metric import record_daily_metrics
+
+    record_daily_metrics()
+
+def sync_backup_catalog():
+    """Catalog backups taken by the scheduler or bench and drop rotated ones"""
+    from umt.doctype.backup_file.backup_file import sync_backup_catalog
+
+    sync_backup_catalog()
+
+def take_data_snapshot():
+    """Export UMT rows changed since the last snapshot"""
+    from umt.snapshots import take_snapshot
+
+    take_snapshot()
 
 def weekly():
     """Weekly scheduled tasks"""
-    pass
+    prune_activity_stream()
+
+def prune_activity_stream():
+    """Drop activity stream entries past the retention period"""
+    from umt.doctype.activity_entry.activity_entry import prune_activities
+
+    prune_activities()
 
 def monthly():
     """Monthly scheduled tasks"""
-    pass
+    close_financial_periods()
+
+def close_financial_periods():
+    """Seal the previous month (and any month left open) into period snapshots"""
+    from umt.doctype.financial_period.financial_period import close_pending_periods
+
+    close_pending_periods()
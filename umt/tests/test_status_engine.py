@@ -0,0 +1,78 @@
+import random
+from datetime import date, timedelta
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import getdate, today
+
+from umt.doctype.member.member import get_membership_status
+from umt.doctype.membership_card.membership_card import get_card_status
+from umt import status_engine
+from umt.status_engine import STATUSES, STATUS_CODES, to_dates, to_codes
+
+CARD_STATUSES = ("Active", "Expired", "Cancelled")
+SAMPLES = 20000
+
+class TestStatusEngine(FrappeTestCase):
+    """The status engine against get_membership_status and get_card_status"""
+
+    def setUp(self):
+        self.rng = random.Random(42)
+
+    def random_date(self):
+        # Month ends and leap days are over-represented on purpose
+        if self.rng.random() < 0.2:
+            year = self.rng.randrange(2016, 2030)
+            return self.rng.choice([date(year, 3, 1) - timedelta(days=1), date(year, 12, 31), date(year, 1, 31)])
+        return date(2016, 1, 1) + timedelta(days=self.rng.randrange(14 * 365))
+
+    def assertMembersMatch(self, renewals, is_active, current, as_of):
+        engine = status_engine.member_statuses(to_dates(renewals), is_active, as_of, to_codes(current))
+        for renewal, active, status, code in zip(renewals, is_active, current, engine):
+            expected = get_membership_status(renewal, active, as_of, status)
+            self.assertEqual(STATUSES[code], expected, msg=(as_of, renewal, active, status))
+
+    def assertCardsMatch(self, expiries, statuses, as_of):
+        engine = status_engine.card_statuses(to_dates(expiries), to_codes(statuses), as_of)
+        for expiry, status, code in zip(expiries, statuses, engine):
+            self.assertEqual(STATUSES[code], get_card_status(expiry, status, as_of), msg=(as_of, expiry, status))
+
+    def test_add_years(self):
+        dates = [date(2024, 2, 29), date(2023, 2, 28), date(2024, 12, 31), date(2025, 1, 31)]
+        self.assertEqual(status_engine.add_years(to_dates(dates), 1).tolist(),
+            [date(2025, 2, 28), date(2024, 2, 28), date(2025, 12, 31), date(2026, 1, 31)])
+        self.assertEqual(status_engine.add_years(to_dates([date(2024, 2, 29)]), 4).tolist(), [date(2028, 2, 29)])
+
+    def test_member_statuses(self):
+        renewals = [self.random_date() if self.rng.random() > 0.1 else None for _idx in range(SAMPLES)]
+        is_active = [self.rng.random() > 0.2 for _idx in range(SAMPLES)]
+        current = [self.rng.choice(STATUSES[:3]) for _idx in range(SAMPLES)]
+
+        for as_of in [date(2024, 2, 29), date(2025, 2, 28), date(2025, 3, 1)] + [self.random_date() for _idx in range(5)]:
+            self.assertMembersMatch(renewals, is_active, current, as_of)
+
+    def test_member_renewed_on_leap_day(self):
+        renewals, is_active, current = [date(2024, 2, 29)], [True], ["Active"]
+        self.assertMembersMatch(renewals, is_active, current, date(2025, 2, 28))
+        self.assertMembersMatch(renewals, is_active, current, date(2025, 3, 1))
+
+    def test_never_renewed_keeps_current_status(self):
+        engine = status_engine.member_statuses(to_dates([None, None]), [True, False], today())
+        self.assertEqual(engine.tolist(), [STATUS_CODES["Not Renewed"]] * 2)
+        self.assertMembersMatch([None, None], [True, False], ["Cancelled", "Inactive"], today())
+
+    def test_card_statuses(self):
+        expiries = [self.random_date() for _idx in range(SAMPLES)]
+        statuses = [self.rng.choice(CARD_STATUSES) for _idx in range(SAMPLES)]
+
+        for as_of in [date(2024, 2, 29), self.random_date(), self.random_date()]:
+            self.assertCardsMatch(expiries, statuses, as_of)
+
+    def test_site_data(self):
+        members = frappe.db.sql("SELECT last_renewal_date, is_active, membership_status FROM `tabMember`")
+        if members:
+            self.assertMembersMatch(*[list(column) for column in zip(*members)], getdate(today()))
+
+        cards = frappe.db.sql("SELECT expiry_date, status FROM `tabMembership_Card` WHERE expiry_date IS NOT NULL")
+        if cards:
+            self.assertCardsMatch(*[list(column) for column in zip(*cards)], getdate(today()))
@@ -0,0 +1,142 @@
+import frappe
+from frappe.utils import cint, getdate, today, get_url
+import base64
+import hashlib
+import hmac
+import pickle
+
+# Public membership card verification.
+# Cards carry a signed token "<card number>.<signature>" (printed as a QR
+# code) so card numbers cannot be enumerated through the endpoint. Lookups
+# are served from a redis hash of card number -> card state, kept fresh by the
+# Membership_Card hooks, with the card_number index as the fallback.
+
+VERIFY_CACHE_KEY = "umt_card_verify"
+VERIFY_METHOD = "/api/method/umt.api.verify_card"
+SIGNATURE_BYTES = 12
+PAID_STATUS = "المؤداة"
+
+DEFAULT_RATE_LIMIT = 600  # verifications per IP per minute
+
+def get_secret():
+    from frappe.utils.password import get_encryption_key
+    return (frappe.conf.get("umt_card_token_secret") or get_encryption_key()).encode()
+
+def sign(card_number):
+    digest = hmac.new(get_secret(), card_number.encode(), hashlib.sha256).digest()[:SIGNATURE_BYTES]
+    return base64.urlsafe_b64encode(digest).decode().rstrip("=")
+
+def get_card_token(card_number):
+    return f"{card_number}.{sign(card_number)}"
+
+def parse_card_token(token):
+    """Card number of a token, or None when the signature does not match"""
+    card_number, _sep, signature = (token or "").strip().rpartition(".")
+    if card_number and hmac.compare_digest(signature, sign(card_number)):
+        return card_number
+
+def get_verify_url(card_number):
+    return get_url(f"{VERIFY_METHOD}?token={get_card_token(card_number)}")
+
+def get_card_qr(card_number, scale=3):
+    """PNG data URI of the QR code printed on the card"""
+    import pyqrcode
+    png = pyqrcode.create(get_verify_url(card_number)).png_as_base64_str(scale=scale)
+    return f"data:image/png;base64,{png}"
+
+def get_rate_limit():
+    return cint(frappe.conf.get("umt_verify_rate_limit")) or DEFAULT_RATE_LIMIT
+
+def load_card(card_number):
+    """State of the latest card issued under `card_number`, read through the card_number index"""
+    card = frappe.db.sql("""
+        SELECT status, payment_status, expiry_date
+        FROM `tabMembership_Card`
+        WHERE card_number = %s
+        ORDER BY issue_date DESC
+        LIMIT 1
+    """, (card_number,), as_dict=1)
+
+    if card:
+        return {
+            "status": card[0].status,
+            "payment_status": card[0].payment_status,
+            "expiry_date": str(card[0].expiry_date) if card[0].expiry_date else None
+        }
+
+def get_card_state(card_number):
+    """Cached card state; misses, including unknown cards, are loaded and cached"""
+    return frappe.cache().hget(VERIFY_CACHE_KEY, card_number, generator=lambda: load_card(card_number))
+
+def verify(token):
+    """Validity, status and expiry date of the card a token was issued for.
+
+    A card is valid while it is active, paid and not past its expiry date.
+    Bad signatures and unknown cards get the same answer.
+    """
+    card_number = parse_card_token(token)
+    card = get_card_state(card_number) if card_number else None
+    if not card:
+        return {"valid": False, "status": None, "expiry_date": None}
+
+    expired = bool(card["expiry_date"]) and getdate(card["expiry_date"]) < getdate(today())
+    status = "Expired" if expired and card["status"] == "Active" else card["status"]
+    return {
+        "valid": status == "Active" and card["payment_status"] == PAID_STATUS,
+        "status": status,
+        "expiry_date": card["expiry_date"]
+    }
+
+def update_card_cache(doc, method=None):
+    """Membership_Card hook: drop the card's entry now and reload it once committed"""
+    cache = frappe.cache()
+    card_numbers = {doc.card_number}
+    previous = doc.get_doc_before_save() if method != "on_trash" else None
+    if previous and previous.card_number:
+        card_numbers.add(previous.card_number)
+
+    for card_number in filter(None, card_numbers):
+        cache.hdel(VERIFY_CACHE_KEY, card_number)
+        frappe.db.after_commit.add(lambda card_number=card_number: prime_card(card_number))
+
+def prime_card(card_number):
+    frappe.cache().hset(VERIFY_CACHE_KEY, card_number, load_card(card_number))
+
+def rebuild_card_cache(batch_size=10000):
+    """Load the state of every card number into the hot cache, e.g. before an event"""
+    cache = frappe.cache()
+    key = cache.make_key(VERIFY_CACHE_KEY)
+    cache.delete_key(VERIFY_CACHE_KEY)
+
+    last_number = ""
+    while True:
+        card_numbers = frappe.db.sql("""
+            SELECT DISTINCT card_number FROM `tabMembership_Card`
+            WHERE card_number > %s
+            ORDER BY card_number
+            LIMIT %s
+        """, (last_number, batch_size), pluck=True)
+
+        if not card_numbers:
+            break
+
+        # Rows are ordered by issue date, so the latest card of a number wins
+        states = {}
+        for card in frappe.db.sql("""
+                SELECT card_number, status, payment_status, expiry_date
+                FROM `tabMembership_Card`
+                WHERE card_number IN %s
+                ORDER BY issue_date
+            """, (tuple(card_numbers),), as_dict=1):
+            states[card.card_number] = {
+                "status": card.status,
+                "payment_status": card.payment_status,
+                "expiry_date": str(card.expiry_date) if card.expiry_date else None
+            }
+
+        pipeline = cache.pipeline()
+        for card_number, state in states.items():
+            pipeline.hset(key, card_number, pickle.dumps(state))
+        pipeline.execute()
+
+        last_number = card_numbers[-1]
@@ -1,20 +1,25 @@
 import frappe
 from frappe import _
-from frappe.utils import add_months, getdate, today, flt
+from frappe.utils import add_months, add_days, getdate, today, flt
+from umt.doctype.financial_period.financial_period import get_period_totals
+from umt.doctype.membership_metric.membership_metric import get_metric_value, get_metric_series
+from umt.doctype.activity_entry.activity_entry import get_activities
+from umt.query import Conditions, month
+from umt.cache import render_fragment
+from umt.permissions import page_access, require_access
 
+QUICK_STATS_DEPENDS_ON = ["Member", "Membership_Card", "Income_Entry", "Expense_Entry", "Financial_Period"]
+
+@page_access("admin", "غير مصرح لك بالوصول إلى لوحة التحكم")
 def get_context(context):
     """Add admin dashboard data to the context"""
-    if not is_admin():
-        frappe.throw(_("غير مصرح لك بالوصول إلى لوحة التحكم"))
-    
-    context.quick_stats = get_quick_stats()
+    context.fragments = frappe._dict(
+        quick_stats=render_fragment("quick_stats",
+            lambda: {"quick_stats": get_quick_stats()}, QUICK_STATS_DEPENDS_ON, vary=today())
+    )
     context.recent_activities = get_recent_activities()
     return context
 
-def is_admin():
-    """Check if current user is admin"""
-    return frappe.session.user == 'Administrator' or 'System Manager' in frappe.get_roles()
-
 def get_quick_stats():
     """Get quick statistics for dashboard"""
     current_month = getdate(today())
@@ -70,80 +75,82 @@ def get_quick_stats():
 
 def get_recent_activities():
     """Get recent system activities"""
-    activities = []
-    
-    # Get member activities
-    member_activities = frappe.get_all(
-        "Member Log",
-        fields=["activity_type", "description", "creation as time"],
-        order_by="creation desc",
-        limit=5
-    )
-    
-    for activity in member_activities:
-        activities.append({
-            "icon": "user",
+    return [
+        {
+            "icon": activity.icon,
             "description": activity.description,
-            "time": format_datetime(activity.time)
-        })
-    
-    # Get financial activities
-    financial_activities = frappe.get_all(
-        "Payment Entry",
-        fields=["payment_type", "paid_amount", "creation as time"],
-        filters={"docstatus": 1},
-        order_by="creation desc",
-        limit=5
-    )
-    
-    for activity in financial_activities:
-        activities.append({
-            "icon": "money",
-            "description": _("{0}: {1} درهم").format(
-                activity.payment_type,
-                activity.paid_amount
-            ),
-            "time": format_datetime(activity.time)
-        })
-    
-    # Sort combined activities by time
-    activities.sort(key=lambda x: x["time"], reverse=True)
-    return activities[:10]
+            "time": format_datetime(activity.creation)
+        }
+        for activity in get_activities(limit=10)["activities"]
+    ]
+
+@frappe.whitelist()
+@require_access("admin", "غير مصرح لك بالوصول إلى لوحة التحكم")
+def get_activity_feed(cursor=None, limit=20):
+    """Get the next page of the global activity feed"""
+    return get_activities(cursor=cursor, limit=limit)
 
 def get_member_count(date):
     """Get total member count for a given date"""
+    if getdate(date) < getdate(today()):
+        count = get_metric_value("total_members", date)
+        if count is not None:
+            return count
+    
     return frappe.db.count("Member", filters={
-        "creation": ["<=", date],
-        "docstatus": 1
+        "creation": ["<", add_days(date, 1)]
     })
 
 def get_active_card_count(date):
     """Get active card count for a given date"""
+    if getdate(date) < getdate(today()):
+        count = get_metric_value("active_cards", date)
+        if count is not None:
+            return count
+    
     return frappe.db.count("Membership_Card", filters={
-        "creation": ["<=", date],
-        "status": "Active",
-        "docstatus": 1
+        "status": ["!=", "Cancelled"],
+        "issue_date": ["<=", date],
+        "expiry_date": [">=", date]
     })
 
+@frappe.whitelist()
+@require_access("admin", "غير مصرح لك بالوصول إلى لوحة التحكم")
+def get_membership_trends(from_date=None, to_date=None, interval="month"):
+    """Get member and active card trend series from the daily metric snapshots"""
+    to_date = to_date or today()
+    from_date = from_date or add_months(to_date, -12)
+    
+    return {
+        "members": get_metric_series("total_members", from_date, to_date, interval),
+        "active_cards": get_metric_series("active_cards", from_date, to_date, interval)
+    }
+
 def get_monthly_income(date):
     """Get total income for a given month"""
+    sealed = get_period_totals(date)
+    if sealed:
+        return flt(sealed.total_income)
+    
+    conditions = month(Conditions("docstatus = 1"), date)
     return flt(frappe.db.sql("""
         SELECT IFNULL(SUM(amount), 0)
         FROM `tabIncome_Entry`
-        WHERE MONTH(posting_date) = MONTH(%s)
-        AND YEAR(posting_date) = YEAR(%s)
-        AND docstatus = 1
-    """, (date, date))[0][0])
+        WHERE {conditions}
+    """.format(conditions=conditions.sql()), conditions.values)[0][0])
 
 def get_monthly_expenses(date):
     """Get total expenses for a given month"""
+    sealed = get_period_totals(date)
+    if sealed:
+        return flt(sealed.total_expenses)
+    
+    conditions = month(Conditions("docstatus = 1"), date)
     return flt(frappe.db.sql("""
         SELECT IFNULL(SUM(amount), 0)
         FROM `tabExpense_Entry`
-        WHERE MONTH(posting_date) = MONTH(%s)
-        AND YEAR(posting_date) = YEAR(%s)
-        AND docstatus = 1
-    """, (date, date))[0][0])
+        WHERE {conditions}
+    """.format(conditions=conditions.sql()), conditions.values)[0][0])
 
 def calculate_change(current, previous):
     """Calculate percentage change"""
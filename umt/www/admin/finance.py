@@ -1,25 +1,26 @@
 import frappe
 from frappe import _
 from frappe.utils import flt, today, add_months, getdate
+from umt.doctype.gl_entry.gl_entry import get_account_balance, get_balance_as_of
+from umt.query import Conditions, month
+from umt.cache import render_fragment
+from umt.permissions import page_access, require_access
 import json
 from datetime import datetime
 
+@page_access("finance", "غير مصرح لك بالوصول إلى صفحة الإدارة المالية")
 def get_context(context):
     """
     Prepare and return the context for the financial management page.
     
-    This function:
-    1. Validates user permissions
-    2. Retrieves financial summaries
-    3. Loads transaction data
-    4. Prepares supporting data (payment methods, years)
+    Access is checked by the page_access decorator. This function:
+    1. Retrieves financial summaries
+    2. Loads transaction data
+    3. Prepares supporting data (payment methods, years)
     
     Returns:
         dict: Context dictionary with all required data for the template
     """
-    if not has_finance_access():
-        frappe.throw(_("غير مصرح لك بالوصول إلى صفحة الإدارة المالية"))
-    
     current_date = getdate(today())
     
     # Prepare all required data
@@ -29,22 +30,28 @@ def get_context(context):
         "balance": get_current_balance(),
         "pending_count": get_pending_count(),
         "transactions": get_transactions(),
-        "payment_methods": get_payment_methods(),
-        "academic_years": get_academic_years()
+        "fragments": get_fragments()
     })
     
     return context
 
-def has_finance_access():
+def get_fragments():
     """
-    Check if current user has finance access permissions.
+    Render the payment method and academic year options.
+    
+    Both are identical for every admin with the same roles and language, so
+    they are served from the fragment cache until a payment method or an
+    academic year changes.
     
     Returns:
-        bool: True if user has required permissions, False otherwise
+        dict: Rendered HTML of each fragment
     """
-    allowed_roles = {"System Manager", "Finance Manager", "Finance User"}
-    user_roles = set(frappe.get_roles())
-    return bool(allowed_roles & user_roles)
+    return frappe._dict(
+        payment_method_options=render_fragment("payment_method_options",
+            lambda: {"payment_methods": get_payment_methods()}, ["Payment Method"]),
+        academic_year_options=render_fragment("academic_year_options",
+            lambda: {"academic_years": get_academic_years()}, ["Academic Year"])
+    )
 
 def get_monthly_total(doctype, date):
     """
@@ -57,37 +64,41 @@ def get_monthly_total(doctype, date):
     Returns:
         float: Total amount for the month
     """
+    conditions = month(Conditions("docstatus = 1", "status = 'Approved'"), date)
     return flt(frappe.db.sql("""
         SELECT IFNULL(SUM(amount), 0)
-        FROM `tab{0}`
-        WHERE MONTH(posting_date) = MONTH(%s)
-        AND YEAR(posting_date) = YEAR(%s)
-        AND docstatus = 1
-        AND status = 'Approved'
-    """.format(doctype), (date, date))[0][0])
+        FROM `tab{doctype}`
+        WHERE {conditions}
+    """.format(doctype=doctype, conditions=conditions.sql()), conditions.values)[0][0])
 
 def get_current_balance():
     """
-    Calculate current balance by subtracting total expenses from total income.
+    Get the current cash balance (income minus expenses).
+    
+    The balance is read from the running treasury account balance kept by
+    the general ledger, a single primary key lookup.
     
     Returns:
         float: Current balance
     """
-    total_income = flt(frappe.db.sql("""
-        SELECT IFNULL(SUM(amount), 0)
-        FROM `tabIncome_Entry`
-        WHERE docstatus = 1
-        AND status = 'Approved'
-    """)[0][0])
+    return get_account_balance()
+
+@frappe.whitelist()
+@require_access("finance", "غير مصرح لك بالوصول إلى البيانات المالية")
+def get_balance(date=None):
+    """
+    Get the cash balance at the end of a date.
     
-    total_expenses = flt(frappe.db.sql("""
-        SELECT IFNULL(SUM(amount), 0)
-        FROM `tabExpense_Entry`
-        WHERE docstatus = 1
-        AND status = 'Approved'
-    """)[0][0])
+    Args:
+        date (str, optional): Date to get the balance for, defaults to today
+    
+    Returns:
+        float: Balance as of the date
+    """
+    if not date or getdate(date) >= getdate(today()):
+        return get_account_balance()
     
-    return total_income - total_expenses
+    return get_balance_as_of(getdate(date))
 
 def get_pending_count():
     """
@@ -150,7 +161,7 @@ def get_payment_methods():
         list: List of payment method dictionaries
     """
     return frappe.get_all(
-        "Payment_Method",
+        "Payment Method",
         fields=["name", "description"],
         filters={"enabled": 1}
     )
@@ -163,12 +174,13 @@ def get_academic_years():
         list: List of academic year dictionaries
     """
     return frappe.get_all(
-        "Academic_Year",
+        "Academic Year",
         fields=["name", "year_name"],
         order_by="start_date desc"
     )
 
 @frappe.whitelist()
+@require_access("finance", "غير مصرح لك بتسجيل المعاملات المالية")
 def save_transaction(data):
     """
     Save a new financial transaction or update existing one.
@@ -214,6 +226,47 @@ def save_transaction(data):
         }
 
 @frappe.whitelist()
+@require_access("finance", "غير مصرح لك بتسجيل المداخيل")
+def bulk_post_income(rows, academic_year=None, posting_date=None, payment_date=None, entry_type=None):
+    """
+    Post a batch of income entries (e.g. card fees collected at a provincial meeting).
+    
+    Args:
+        rows (list): Rows with member, amount, payment_method and reference_number
+        academic_year (str, optional): Academic year, defaults to the current one
+        posting_date (str, optional): Posting date for the whole batch, defaults to today
+        payment_date (str, optional): Payment date for the whole batch, defaults to posting date
+        entry_type (str, optional): Income type, defaults to membership card fees
+    
+    Returns:
+        dict: Overall counts and a per-row result report
+    """
+    from umt.bulk_income import post_income_entries, CARD_ENTRY_TYPE
+    
+    frappe.has_permission("Income_Entry", "submit", throw=True)
+    
+    if isinstance(rows, str):
+        rows = json.loads(rows)
+    
+    results = post_income_entries(
+        rows,
+        academic_year=academic_year,
+        posting_date=posting_date,
+        payment_date=payment_date,
+        entry_type=entry_type or CARD_ENTRY_TYPE
+    )
+    posted = sum(1 for r in results if r["success"])
+    
+    return {
+        "success": posted == len(results),
+        "message": _("تم تسجيل {0} من أصل {1} مدخول").format(posted, len(results)),
+        "posted": posted,
+        "failed": len(results) - posted,
+        "results": results
+    }
+
+@frappe.whitelist()
+@require_access("finance", "غير مصرح لك بتعديل المعاملات المالية")
 def update_transaction_status(name, status):
     """
     Update the status of a financial transaction.
@@ -245,6 +298,7 @@ def update_transaction_status(name, status):
         }
 
 @frappe.whitelist()
+@require_access("finance", "غير مصرح لك بتصدير المعاملات المالية")
 def export_transactions():
     """
     Export financial transactions to Excel based on filters.
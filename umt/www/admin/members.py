@@ -1,22 +1,26 @@
 import frappe
 from frappe import _
 from frappe.utils import cstr
+from umt.cache import render_fragment
+from umt.permissions import page_access, require_access
 import json
 
+@page_access("admin", "غير مصرح لك بالوصول إلى صفحة إدارة الأعضاء")
 def get_context(context):
     """Add member management data to the context"""
-    if not is_admin():
-        frappe.throw(_("غير مصرح لك بالوصول إلى صفحة إدارة الأعضاء"))
-    
     context.members = get_members()
-    context.provinces = get_provinces()
-    context.academic_years = get_academic_years()
+    context.fragments = get_fragments()
     context.pagination = get_pagination()
     return context
 
-def is_admin():
-    """Check if current user is admin"""
-    return frappe.session.user == 'Administrator' or 'System Manager' in frappe.get_roles()
+def get_fragments():
+    """Render the province and academic year options, cached across admins"""
+    return frappe._dict(
+        province_options=render_fragment("province_options",
+            lambda: {"provinces": get_provinces()}, [], vary=frappe.get_meta("Member").modified),
+        academic_year_options=render_fragment("academic_year_options",
+            lambda: {"academic_years": get_academic_years()}, ["Academic Year"])
+    )
 
 def get_members(filters=None, limit_start=0, limit_page_length=25):
     """Get members list with filters"""
@@ -38,8 +42,9 @@ def get_members(filters=None, limit_start=0, limit_page_length=25):
     )
 
 def get_provinces():
-    """Get list of provinces"""
-    return frappe.get_all("Province", fields=["name"])
+    """Get list of provinces, the options of the Member province field"""
+    options = frappe.get_meta("Member").get_field("province").options or ""
+    return [frappe._dict(name=province) for province in options.split("\n") if province]
 
 def get_academic_years():
     """Get list of academic years"""
@@ -64,7 +69,7 @@ def get_pagination():
         active = 'active' if page == 1 else ''
         html.append(f'''
             <li class="page-item {active}">
-                <a class="page-link" href="#" onclick="changePage({page})">{page}</a>
+                <a class="page-link" href="#" onclick="return umt.members.changePage({page})">{page}</a>
             </li>
         ''')
     
@@ -72,6 +77,7 @@ def get_pagination():
     return ''.join(html)
 
 @frappe.whitelist()
+@require_access("admin", "غير مصرح لك بتعديل الأعضاء")
 def save_member(data):
     """Save or update member"""
     if isinstance(data, str):
@@ -97,11 +103,13 @@ def save_member(data):
         return {"success": False, "message": str(e)}
 
 @frappe.whitelist()
+@require_access("admin", "غير مصرح لك بالوصول إلى بيانات الأعضاء")
 def get_member(name):
     """Get member details"""
     return frappe.get_doc("Member", name)
 
 @frappe.whitelist()
+@require_access("admin", "غير مصرح لك بحذف الأعضاء")
 def delete_member(name):
     """Delete member"""
     try:
@@ -113,6 +121,7 @@ def delete_member(name):
         return {"success": False, "message": str(e)}
 
 @frappe.whitelist()
+@require_access("admin", "غير مصرح لك بتصدير الأعضاء")
 def export_members():
     """Export members to Excel"""
     from frappe.utils.xlsxutils import make_xlsx
@@ -158,3 +167,28 @@ def export_members():
     frappe.response['filename'] = 'members_export.xlsx'
     frappe.response['filecontent'] = xlsx_file.getvalue()
     frappe.response['type'] = 'binary'
+
+@frappe.whitelist()
+@require_access("admin", "غير مصرح لك بطباعة البطاقات")
+def export_cards(filters=None, output_format="pdf"):
+    """Queue printing of the cards matching the filters as one PDF or a ZIP of PDFs"""
+    from umt.cards import start_card_export
+    
+    try:
+        job_id = start_card_export(filters, output_format)
+        return {
+            "success": True,
+            "message": _("تم إطلاق طباعة البطاقات"),
+            "job_id": job_id
+        }
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), _("خطأ في طباعة البطاقات"))
+        return {"success": False, "message": str(e)}
+
+@frappe.whitelist()
+@require_access("admin", "غير مصرح لك بطباعة البطاقات")
+def get_card_export_status(job_id):
+    """Get the status of a card printing job"""
+    from umt.cards import get_status
+    
+    return get_status(job_id)
@@ -3,34 +3,59 @@ from frappe import _
 import json
 from typing import Dict, List, Optional, Union
 import os
-from datetime import datetime
-from frappe.utils import cint, get_site_name
-from frappe.utils.backups import backup
+from frappe.utils import cint, flt, get_site_name, format_datetime
+from frappe.utils.response import send_private_file
+from umt.backups import start_backup, get_status
+from umt.doctype.backup_file.backup_file import get_backups, get_backup_path
+from umt.cache import render_fragment
+from umt.permissions import has_settings_access, page_access, require_access
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
+@page_access("settings", "غير مصرح لك بالوصول إلى صفحة الإعدادات")
 def get_context(context: Dict) -> Dict:
     """
     Prepare and return the context for the settings management page.
+
+    Only the general and security tabs, both read from System Settings, are
+    rendered with the page. The other panels are fetched by `get_panel` when
+    their tab is first opened.
     """
-    if not has_settings_access():
-        frappe.throw(_("غير مصرح لك بالوصول إلى صفحة الإعدادات"))
-    
     context.update({
         "settings": get_system_settings(),
-        "languages": get_languages(),
-        "payment_methods": get_payment_methods(),
-        "notifications": get_notification_settings(),
-        "backups": get_backup_list(),
-        "last_backup_date": get_last_backup_date()
+        "languages": get_languages()
     })
     
     return context
 
-def has_settings_access() -> bool:
-    """Check if current user has settings management access permissions."""
-    return frappe.has_permission("System Settings", "write")
+def get_backups_context() -> Dict:
+    """Get the backup list and last backup date for the backups panel."""
+    backups = get_backup_list()
+    return {
+        "backups": backups,
+        "last_backup_date": backups[0]["date"] if backups else None
+    }
+
+# Lazily loaded panels: (fragment, context builder, doctypes the fragment is built from)
+PANELS = {
+    "payment": ("settings_payment_methods", lambda: {"payment_methods": get_payment_methods()}, ["Payment Method"]),
+    "notifications": ("settings_notifications", lambda: {"notifications": get_notification_settings()}, ["Notification Settings"]),
+    "backup": ("settings_backups", get_backups_context, ["Backup_File"])
+}
+
+@frappe.whitelist()
+@require_access("settings", "غير مصرح لك بالوصول إلى صفحة الإعدادات")
+def get_panel(panel: str) -> Dict:
+    """Render a settings panel on demand, from the fragment cache when unchanged."""
+    if panel not in PANELS:
+        frappe.throw(_("لوحة إعدادات غير معروفة: {0}").format(panel))
+
+    fragment, get_panel_context, depends_on = PANELS[panel]
+    return {
+        "panel": panel,
+        "html": render_fragment(fragment, get_panel_context, depends_on)
+    }
 
 def get_system_settings() -> Dict:
     """Retrieve current system settings."""
@@ -87,28 +112,23 @@ def get_notification_settings() -> List[Dict]:
     ]
 
 def get_backup_list() -> List[Dict]:
-    """Get list of available backups."""
-    site_path = frappe.get_site_path()
-    backup_path = os.path.join(site_path, "private", "backups")
-    backups = []
-    
-    if os.path.exists(backup_path):
-        for file in os.listdir(backup_path):
-            if file.endswith(".sql.gz"):
-                file_path = os.path.join(backup_path, file)
-                stat = os.stat(file_path)
-                backups.append({
-                    "name": file,
-                    "date": datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M"),
-                    "size": format_size(stat.st_size)
-                })
-    
-    return sorted(backups, key=lambda x: x["date"], reverse=True)
+    """Get list of available database backups from the backup catalog."""
+    return [
+        {
+            "name": backup_file.name,
+            "date": format_datetime(backup_file.backup_date, "yyyy-MM-dd HH:mm"),
+            "size": format_size(backup_file.file_size or 0),
+            "stats": _("{0} ث - {1} م.ب/ث ({2})").format(
+                flt(backup_file.duration, 1), flt(backup_file.throughput, 1), _(backup_file.compression_mode)
+            ) if backup_file.duration else None
+        }
+        for backup_file in get_backups("Database")
+    ]
 
 def get_last_backup_date() -> Optional[str]:
     """Get the date of the last backup."""
-    backups = get_backup_list()
-    return backups[0]["date"] if backups else None
+    backups = get_backups("Database", limit=1)
+    return format_datetime(backups[0].backup_date, "yyyy-MM-dd HH:mm") if backups else None
 
 def format_size(size: int) -> str:
     """Format file size in human-readable format."""
@@ -119,11 +139,9 @@ def format_size(size: int) -> str:
     return f"{size:.1f} TB"
 
 @frappe.whitelist()
+@require_access("settings", "غير مصرح لك بتعديل الإعدادات")
 def save_settings(settings: Union[str, Dict]) -> Dict:
     """Save system settings."""
-    if not has_settings_access():
-        frappe.throw(_("غير مصرح لك بتعديل الإعدادات"))
-        
     if isinstance(settings, str):
         settings = json.loads(settings)
     
@@ -145,8 +163,9 @@ def save_settings(settings: Union[str, Dict]) -> Dict:
         sys_settings.force_user_to_reset_password = security.get("force_password_reset")
         sys_settings.save()
         
-        # Update notification settings
-        update_notification_settings(settings.get("notifications", []))
+        # Update notification settings, sent only once their panel was loaded
+        if "notifications" in settings:
+            update_notification_settings(settings.get("notifications") or [])
         
         frappe.clear_cache()
         
@@ -162,11 +181,9 @@ def save_settings(settings: Union[str, Dict]) -> Dict:
         }
 
 @frappe.whitelist()
+@require_access("settings", "غير مصرح لك بتعديل طرق الدفع")
 def save_payment_method(data: Union[str, Dict]) -> Dict:
     """Save a payment method."""
-    if not has_settings_access():
-        frappe.throw(_("غير مصرح لك بتعديل طرق الدفع"))
-        
     if isinstance(data, str):
         data = json.loads(data)
     
@@ -196,11 +213,9 @@ def save_payment_method(data: Union[str, Dict]) -> Dict:
         }
 
 @frappe.whitelist()
+@require_access("settings", "غير مصرح لك بتعديل طرق الدفع")
 def toggle_payment_method(name: str, enabled: bool) -> Dict:
     """Toggle payment method status."""
-    if not has_settings_access():
-        frappe.throw(_("غير مصرح لك بتعديل طرق الدفع"))
-        
     try:
         doc = frappe.get_doc("Payment Method", name)
         doc.enabled = enabled
@@ -218,17 +233,19 @@ def toggle_payment_method(name: str, enabled: bool) -> Dict:
         }
 
 @frappe.whitelist()
-def create_backup() -> Dict:
-    """Create a new system backup."""
-    if not has_settings_access():
-        frappe.throw(_("غير مصرح لك بإنشاء نسخة احتياطية"))
-        
+@require_access("settings", "غير مصرح لك بإنشاء نسخة احتياطية")
+def create_backup(compression_mode: str = "Standard", with_files: int = 0) -> Dict:
+    """Queue a new system backup.
+
+    The backup runs as a background job; progress is pushed over realtime and
+    can be polled with get_backup_status.
+    """
     try:
-        backup_manager = backup(ignore_files=False, force=True)
+        job_id = start_backup(compression_mode, cint(with_files))
         return {
             "success": True,
-            "message": _("تم إنشاء النسخة الاحتياطية بنجاح"),
-            "backup_path": backup_manager.backup_path_db
+            "message": _("تم إطلاق إنشاء النسخة الاحتياطية"),
+            "job_id": job_id
         }
     except Exception as e:
         frappe.log_error(frappe.get_traceback(), _("خطأ في إنشاء النسخة الاحتياطية"))
@@ -238,32 +255,34 @@ def create_backup() -> Dict:
         }
 
 @frappe.whitelist()
-def download_backup(name: str) -> None:
-    """Download a backup file."""
-    if not has_settings_access():
-        frappe.throw(_("غير مصرح لك بتحميل النسخ الاحتياطية"))
-    
-    backup_path = os.path.join(frappe.get_site_path(), "private", "backups", name)
-    
-    if os.path.exists(backup_path):
-        with open(backup_path, "rb") as f:
-            frappe.response["filename"] = os.path.basename(backup_path)
-            frappe.response["filecontent"] = f.read()
-            frappe.response["type"] = "download"
-    else:
+@require_access("settings", "غير مصرح لك بالوصول إلى النسخ الاحتياطية")
+def get_backup_status() -> Optional[Dict]:
+    """Get the status of the running or last backup job."""
+    return get_status()
+
+@frappe.whitelist()
+@require_access("settings", "غير مصرح لك بتحميل النسخ الاحتياطية")
+def download_backup(name: str):
+    """Download a backup file.
+
+    The file is streamed from disk in chunks, or handed off to nginx with
+    X-Accel-Redirect when the proxy asks for it, so it is never loaded into
+    worker memory.
+    """
+    backup_path = get_backup_path(name)
+
+    if not os.path.exists(backup_path):
         frappe.throw(_("ملف النسخة الاحتياطية غير موجود"))
 
+    return send_private_file(os.path.join("backups", os.path.basename(backup_path)))
+
 @frappe.whitelist()
+@require_access("settings", "غير مصرح لك بحذف النسخ الاحتياطية")
 def delete_backup(name: str) -> Dict:
     """Delete a backup file."""
-    if not has_settings_access():
-        frappe.throw(_("غير مصرح لك بحذف النسخ الاحتياطية"))
-        
     try:
-        backup_path = os.path.join(frappe.get_site_path(), "private", "backups", name)
-        
-        if os.path.exists(backup_path):
-            os.remove(backup_path)
+        if frappe.db.exists("Backup_File", name):
+            frappe.delete_doc("Backup_File", name, ignore_permissions=True)
             return {
                 "success": True,
                 "message": _("تم حذف النسخة الاحتياطية بنجاح")
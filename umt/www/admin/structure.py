@@ -3,16 +3,18 @@ from frappe import _
 import json
 from frappe.utils import cstr
 from typing import Dict, List, Optional, Union
+from umt.cache import render_fragment
+from umt.permissions import page_access, require_access
 
+@page_access("structure", "غير مصرح لك بالوصول إلى صفحة إدارة الهياكل")
 def get_context(context: Dict) -> Dict:
     """
     Prepare and return the context for the structure management page.
     
-    This function:
-    1. Validates user permissions
-    2. Retrieves organizational structure data
-    3. Loads roles and permissions
-    4. Prepares statistics
+    Access is checked by the page_access decorator. This function:
+    1. Retrieves organizational structure data
+    2. Loads roles and permissions
+    3. Prepares statistics
     
     Args:
         context (Dict): Base context dictionary
@@ -20,15 +22,9 @@ def get_context(context: Dict) -> Dict:
     Returns:
         Dict: Enhanced context with structure management data
     """
-    if not has_structure_access():
-        frappe.throw(_("غير مصرح لك بالوصول إلى صفحة إدارة الهياكل"))
-    
     # Prepare all required data
     context.update({
-        "organization_tree": get_organization_tree(),
-        "provinces": get_provinces(),
-        "roles": get_roles(),
-        "permissions": get_permissions(),
+        "fragments": get_fragments(),
         "province_count": get_structure_count("Province"),
         "office_count": get_structure_count("Office"),
         "position_count": get_structure_count("Position"),
@@ -37,16 +33,29 @@ def get_context(context: Dict) -> Dict:
     
     return context
 
-def has_structure_access() -> bool:
+def get_fragments() -> Dict:
     """
-    Check if current user has structure management access permissions.
+    Render the sections shared by all structure managers.
+    
+    The organization tree, provinces table, roles list and permissions are
+    served from the fragment cache until one of the doctypes they are built
+    from changes. Organization_Structure, Province, Office and Permission are
+    not doctypes of this app and have no version hooks, so what is read from
+    them is only refreshed when the fragment expires.
     
     Returns:
-        bool: True if user has required permissions, False otherwise
+        Dict: Rendered HTML of each fragment
     """
-    allowed_roles = {"System Manager", "Structure Manager", "HR Manager"}
-    user_roles = set(frappe.get_roles())
-    return bool(allowed_roles & user_roles)
+    return frappe._dict(
+        organization_tree=render_fragment("organization_tree",
+            lambda: {"organization_tree": get_organization_tree()}, []),
+        structure_provinces=render_fragment("structure_provinces",
+            lambda: {"provinces": get_provinces()}, ["Member"]),
+        structure_roles=render_fragment("structure_roles",
+            lambda: {"roles": get_roles()}, ["Role", "User"]),
+        structure_permissions=render_fragment("structure_permissions",
+            lambda: {"permissions": get_permissions()}, [])
+    )
 
 def get_organization_tree() -> List[Dict]:
     """
@@ -178,6 +187,7 @@ def get_vacant_positions_count() -> int:
     return frappe.db.count("Position", {"status": "Vacant"})
 
 @frappe.whitelist()
+@require_access("structure", "غير مصرح لك بالوصول إلى الهياكل")
 def get_parent_structures() -> List[Dict]:
     """
     Get list of structures that can be parents.
@@ -192,6 +202,7 @@ def get_parent_structures() -> List[Dict]:
     )
 
 @frappe.whitelist()
+@require_access("structure", "غير مصرح لك بتعديل الهياكل")
 def save_structure(data: Union[str, Dict]) -> Dict:
     """
     Save a new structure or update existing one.
@@ -232,6 +243,7 @@ def save_structure(data: Union[str, Dict]) -> Dict:
         }
 
 @frappe.whitelist()
+@require_access("structure", "غير مصرح لك بتعديل الأدوار")
 def save_role(data: Union[str, Dict]) -> Dict:
     """
     Save a new role or update existing one.
@@ -279,6 +291,7 @@ def save_role(data: Union[str, Dict]) -> Dict:
         }
 
 @frappe.whitelist()
+@require_access("structure", "غير مصرح لك بالوصول إلى الهياكل")
 def get_province(name: str) -> Dict:
     """
     Get province details.
@@ -292,6 +305,7 @@ def get_province(name: str) -> Dict:
     return frappe.get_doc("Province", name).as_dict()
 
 @frappe.whitelist()
+@require_access("structure", "غير مصرح لك بحذف الأقاليم")
 def delete_province(name: str) -> Dict:
     """
     Delete a province if it has no dependencies.
@@ -324,6 +338,7 @@ def delete_province(name: str) -> Dict:
         }
 
 @frappe.whitelist()
+@require_access("structure", "غير مصرح لك بالوصول إلى الأدوار")
 def get_role(name: str) -> Dict:
     """
     Get role details including permissions.
@@ -342,6 +357,7 @@ def get_role(name: str) -> Dict:
     }
 
 @frappe.whitelist()
+@require_access("structure", "غير مصرح لك بحذف الأدوار")
 def delete_role(name: str) -> Dict:
     """
     Delete a role if it has no users assigned.
@@ -1,11 +1,12 @@
 import frappe
 from frappe import _
+from umt.doctype.activity_entry.activity_entry import get_activities
 
 def get_context(context):
     """Add member data to the context"""
     if frappe.session.user != 'Guest':
         context.member = get_member_info()
-        context.activities = get_recent_activities()
+        context.activities, context.activity_cursor = get_recent_activities(context.member)
     return context
 
 def get_member_info():
@@ -24,46 +25,29 @@ def get_member_info():
         return member[0]
     return None
 
-def get_recent_activities():
-    """Get recent activities for the member"""
-    user = frappe.session.user
-    activities = []
-    
-    # Get membership activities
-    membership_logs = frappe.get_all(
-        "Member Log",
-        filters={"member": get_member_info().name},
-        fields=["date", "activity_type", "description"],
-        order_by="date desc",
-        limit=5
-    )
+def get_recent_activities(member=None):
+    """Get recent activities for the member, and the cursor of the next page"""
+    member = member or get_member_info()
+    if not member:
+        return [], None
     
-    # Get payment activities
-    payment_logs = frappe.get_all(
-        "Payment Entry",
-        filters={"member": get_member_info().name},
-        fields=["posting_date as date", "payment_type", "amount"],
-        order_by="posting_date desc",
-        limit=5
-    )
-    
-    # Format payment activities
-    for payment in payment_logs:
-        activities.append({
-            "date": payment.date,
-            "description": _("دفع {0} درهم - {1}").format(
-                payment.amount,
-                payment.payment_type
-            )
-        })
+    page = get_activities(member=member.name, limit=5)
+    return [
+        {
+            "date": activity.creation,
+            "description": activity.description
+        }
+        for activity in page["activities"]
+    ], page["next_cursor"]
+
+@frappe.whitelist()
+def get_activity_timeline(cursor=None, limit=20):
+    """Get the next page of the logged-in member's activity timeline"""
+    if frappe.session.user == 'Guest':
+        frappe.throw(_("يرجى تسجيل الدخول أولاً"))
     
-    # Format membership activities
-    for log in membership_logs:
-        activities.append({
-            "date": log.date,
-            "description": log.description
-        })
+    member = get_member_info()
+    if not member:
+        return {"activities": [], "next_cursor": None}
     
-    # Sort combined activities by date
-    activities.sort(key=lambda x: x["date"], reverse=True)
-    return activities[:5]
+    return get_activities(member=member.name, cursor=cursor, limit=limit)
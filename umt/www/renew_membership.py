@@ -1,6 +1,7 @@
 import frappe
 from frappe import _
 from frappe.utils import flt, today, add_years
+from umt.doctype.activity_entry.activity_entry import add_activity
 
 def get_context(context):
     """Add renewal data to the context"""
@@ -87,6 +88,9 @@ def submit_renewal(payment_method, transaction_ref=None, receipt=None):
     # Create payment entry
     create_payment_entry(renewal)
     
+    add_activity("Renewal", _("طلب تجديد العضوية - {0}").format(renewal.name),
+        member=member.name, reference_doctype=renewal.doctype, reference_name=renewal.name, icon="refresh")
+    
     return {"message": _("تم تقديم طلب التجديد بنجاح")}
 
 def create_payment_entry(renewal):